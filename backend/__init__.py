@@ -1,18 +1,88 @@
 from flask import Flask
 from flask_cors import CORS
+from dotenv import load_dotenv
+import gc
+import os
 from backend.routes.players import players_bp
+from backend.routes.monitoring import monitoring_bp
+from backend.routes.rankings import rankings_bp
+from backend.routes.lineups import lineups_bp
+from backend.routes.stats import stats_bp
+from backend.repositories import REPOSITORIES
+from backend.services.ranking_service import ranking_service
+from backend.services.similarity_service import similarity_service
+from backend.services.search_service import search_service
+from backend.utils.cache import response_cache
+from backend.utils import metrics
+from backend.utils.serialization import FastJSONProvider
 
 def create_app(config=None):
+    load_dotenv()
+    
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     
     # Configure CORS
     CORS(app)
     
+    # Configure database connection and pool from the environment
+    app.config.from_mapping(
+        DB_HOST=os.getenv('DB_HOST', 'localhost'),
+        DB_PORT=int(os.getenv('DB_PORT', '27017')),
+        DB_NAME=os.getenv('DB_NAME', 'basketball_rankings'),
+        DB_USER=os.getenv('DB_USER'),
+        DB_PASSWORD=os.getenv('DB_PASSWORD'),
+        MONGO_MAX_POOL_SIZE=int(os.getenv('MONGO_MAX_POOL_SIZE', '100')),
+        MONGO_MIN_POOL_SIZE=int(os.getenv('MONGO_MIN_POOL_SIZE', '0')),
+        MONGO_CONNECT_TIMEOUT_MS=int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', '20000')),
+        MONGO_SERVER_SELECTION_TIMEOUT_MS=int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', '30000')),
+        MONGO_WAIT_QUEUE_TIMEOUT_MS=os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS'),
+        MONGO_COMPRESSORS=os.getenv('MONGO_COMPRESSORS'),
+        PLAYER_REPOSITORY=os.getenv('PLAYER_REPOSITORY', 'mongodb'),
+        SQLITE_PATH=os.getenv('SQLITE_PATH', 'basketball_rankings.sqlite3'),
+        WARM_INDEXES=os.getenv('WARM_INDEXES', 'true').lower() == 'true',
+        RESPONSE_CACHE_MAX_ENTRIES=int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '1024')),
+        RESPONSE_CACHE_TTL=float(os.getenv('RESPONSE_CACHE_TTL', '60')),
+        METRICS_ENABLED=os.getenv('METRICS_ENABLED', 'true').lower() == 'true',
+        SERVER_TIMING=os.getenv('SERVER_TIMING', 'true').lower() == 'true'
+    )
+    
     # Register blueprints
     app.register_blueprint(players_bp)
+    app.register_blueprint(monitoring_bp)
+    app.register_blueprint(rankings_bp)
+    app.register_blueprint(lineups_bp)
+    app.register_blueprint(stats_bp)
     
     # Apply configuration if provided
     if config:
         app.config.update(config)
     
+    if app.config['PLAYER_REPOSITORY'] not in REPOSITORIES:
+        raise ValueError(
+            f"Invalid PLAYER_REPOSITORY: {app.config['PLAYER_REPOSITORY']}. "
+            f"Must be one of {', '.join(REPOSITORIES)}"
+        )
+    
+    response_cache.configure(
+        max_entries=app.config['RESPONSE_CACHE_MAX_ENTRIES'],
+        ttl=app.config['RESPONSE_CACHE_TTL']
+    )
+    
+    # Time each request's stages for Server-Timing and /api/metrics
+    metrics.init_app(app)
+    
+    # Register database handlers
+    from backend import db
+    app.teardown_appcontext(db.close_db)
+    
+    # Build in-memory indexes up front instead of on the first request
+    if app.config['WARM_INDEXES'] and not app.testing:
+        with app.app_context():
+            for service in (ranking_service, similarity_service, search_service):
+                service.ensure_loaded()
+        # The indexes live as long as the process, so stop the collector
+        # from rescanning them on every full collection
+        gc.freeze()
+    
     return app
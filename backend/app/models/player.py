@@ -1,5 +1,5 @@
 from datetime import datetime
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field
 from typing import Dict, Optional
 from enum import Enum
 
@@ -17,12 +17,6 @@ class Stats(BaseModel):
     speed: int = Field(..., ge=0, le=100)
     finishing: int = Field(..., ge=0, le=100)
 
-    @validator('*')
-    def validate_stat_range(cls, v):
-        if not 0 <= v <= 100:
-            raise ValueError('Stat must be between 0 and 100')
-        return v
-
 class DefensiveStats(BaseModel):
     perimeter_defense: int = Field(..., ge=0, le=100)
     interior_defense: int = Field(..., ge=0, le=100)
@@ -30,12 +24,6 @@ class DefensiveStats(BaseModel):
     block: int = Field(..., ge=0, le=100)
     rebounding: int = Field(..., ge=0, le=100)
 
-    @validator('*')
-    def validate_stat_range(cls, v):
-        if not 0 <= v <= 100:
-            raise ValueError('Stat must be between 0 and 100')
-        return v
-
 class Player:
     def __init__(self, **kwargs):
         self.id = kwargs.get('id')
@@ -0,0 +1,265 @@
+"""
+Asynchronous ASGI variant of the API
+
+Serves the player CRUD, listing, batch and comparison routes under
+/api/players and the /api/stats routes with Starlette and the Motor
+driver, so one process can keep many MongoDB round trips in flight. Validation, scoring, paging and
+the stats aggregates are shared with the Flask app; routes backed by the
+Flask app's in-process indexes (search, rank, similar, percentiles) and
+the response cache stay on the Flask app.
+
+Run with:
+    uvicorn --factory backend.asgi:create_async_app --port 5003
+"""
+import os
+from contextlib import asynccontextmanager
+from http import HTTPStatus
+from typing import Dict, Optional
+from bson.errors import InvalidId
+from dotenv import load_dotenv
+from marshmallow import ValidationError
+from mongoengine.errors import DoesNotExist
+from pymongo import DESCENDING
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse as StarletteJSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+from .async_db import create_async_client, get_async_db
+from .repositories.mongo import page_query
+from .services.async_player_service import AsyncPlayerService
+from .services.async_stats_service import AsyncStatsService
+from .services.player_service import PlayerService
+from .utils.ingest import parse_players_payload
+from .utils.serialization import PLAYER_PROJECTION, json_bytes, player_row
+from .utils.validators import format_validation_errors
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+class JSONResponse(StarletteJSONResponse):
+    """JSON response encoded like the Flask app's"""
+
+    def render(self, content) -> bytes:
+        return json_bytes(content)
+
+def _error(message: str, status: HTTPStatus) -> JSONResponse:
+    return JSONResponse({'error': message}, status_code=status)
+
+def _wants_stream(request: Request) -> bool:
+    """Whether the client asked for a streamed NDJSON listing"""
+    if request.query_params.get('stream', '').lower() in ('1', 'true'):
+        return True
+    accept = parse_accept_header(request.headers.get('accept'), MIMEAccept)
+    return accept.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+async def _json_body(request: Request):
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+async def list_or_create_players(request: Request):
+    """List all players or create a new one"""
+    players = request.app.state.player_service
+    if request.method == 'POST':
+        try:
+            new_player = await players.create_player(await _json_body(request))
+            return JSONResponse(new_player, status_code=HTTPStatus.CREATED)
+        except ValidationError as e:
+            return JSONResponse({'errors': format_validation_errors(e.messages)}, status_code=HTTPStatus.BAD_REQUEST)
+        except Exception as e:
+            return _error(str(e), HTTPStatus.INTERNAL_SERVER_ERROR)
+
+    try:
+        args = request.query_params
+
+        # Fetch a batch of players by ID with one query instead of a page
+        if 'ids' in args:
+            return JSONResponse(await players.get_players([player_id for player_id in args['ids'].split(',') if player_id]))
+
+        per_page = int(args.get('per_page', 20))
+        sort_by = args.get('sort_by', 'overall_score')
+        order = args.get('order', 'desc')
+        filters = {field: args[field] for field in ('position', 'team', 'name') if field in args}
+
+        # Stream every matching row as NDJSON instead of building one page
+        if _wants_stream(request):
+            direction = PlayerService._sort_direction(sort_by, order)
+            query, sort = page_query(filters, sort_by, direction == DESCENDING)
+            cursor = (
+                players.db.players.find(query, PLAYER_PROJECTION)
+                .sort(sort)
+                .batch_size(request.app.state.settings['STREAM_BATCH_SIZE'])
+            )
+
+            async def rows():
+                async for doc in cursor:
+                    yield json_bytes(player_row(doc)) + b'\n'
+
+            return StreamingResponse(rows(), media_type=NDJSON_MIMETYPE)
+
+        result = await players.list_players(
+            per_page=per_page,
+            cursor=args.get('cursor'),
+            sort_by=sort_by,
+            order=order,
+            filters=filters
+        )
+        return JSONResponse(result)
+
+    except ValueError as e:
+        return _error(str(e), HTTPStatus.BAD_REQUEST)
+    except Exception as e:
+        return _error('Internal server error', HTTPStatus.INTERNAL_SERVER_ERROR)
+
+async def bulk_create_players(request: Request):
+    """Create players from a JSON array, NDJSON or CSV body"""
+    try:
+        mimetype = request.headers.get('content-type', '').split(';')[0].strip()
+        records, parse_errors = parse_players_payload((await request.body()).decode(), mimetype)
+        result = await request.app.state.player_service.create_players(
+            records,
+            chunk_size=request.app.state.settings['BULK_INSERT_CHUNK_SIZE']
+        )
+
+        # Parse failures are more useful to the client than schema errors
+        errors = {**result['errors'], **parse_errors}
+        inserted = sum(1 for player_id in result['inserted_ids'] if player_id)
+
+        if not errors:
+            status = HTTPStatus.CREATED
+        elif inserted:
+            status = HTTPStatus.MULTI_STATUS
+        else:
+            status = HTTPStatus.BAD_REQUEST
+
+        return JSONResponse({
+            'inserted': inserted,
+            'failed': len(errors),
+            'ids': result['inserted_ids'],
+            'errors': [
+                {'index': index, 'errors': format_validation_errors(errors[index])}
+                for index in sorted(errors)
+            ]
+        }, status_code=status)
+
+    except ValueError as e:
+        return _error(str(e), HTTPStatus.BAD_REQUEST)
+    except Exception as e:
+        return _error('Internal server error', HTTPStatus.INTERNAL_SERVER_ERROR)
+
+async def compare_players(request: Request):
+    """Compare players attribute by attribute, fetched with one query"""
+    try:
+        data = await _json_body(request)
+        ids = data.get('ids') if isinstance(data, dict) else None
+        if not isinstance(ids, list):
+            raise ValueError("ids must be a list of player IDs")
+        return JSONResponse(await request.app.state.player_service.compare_players(ids))
+
+    except ValueError as e:
+        return _error(str(e), HTTPStatus.BAD_REQUEST)
+    except Exception as e:
+        return _error('Internal server error', HTTPStatus.INTERNAL_SERVER_ERROR)
+
+async def player_detail(request: Request):
+    """Get, update or delete a single player"""
+    players = request.app.state.player_service
+    player_id = request.path_params['player_id']
+    try:
+        if request.method == 'GET':
+            return JSONResponse(await players.get_player(player_id))
+        if request.method == 'DELETE':
+            await players.delete_player(player_id)
+            return Response(status_code=HTTPStatus.NO_CONTENT)
+
+        player_data = await _json_body(request)
+        if not player_data:
+            return _error('No data provided', HTTPStatus.BAD_REQUEST)
+        return JSONResponse(await players.update_player(player_id, player_data))
+
+    except InvalidId:
+        return _error('Invalid player ID format', HTTPStatus.BAD_REQUEST)
+    except DoesNotExist:
+        return _error('Player not found', HTTPStatus.NOT_FOUND)
+    except ValidationError as e:
+        return JSONResponse(
+            {'error': 'Validation error', 'details': format_validation_errors(e.messages)},
+            status_code=HTTPStatus.BAD_REQUEST
+        )
+    except Exception as e:
+        return _error('Internal server error', HTTPStatus.INTERNAL_SERVER_ERROR)
+
+async def get_overview(request: Request):
+    """Get league-wide player statistics"""
+    try:
+        return JSONResponse(await request.app.state.stats_service.overview())
+    except Exception as e:
+        return _error('Internal server error', HTTPStatus.INTERNAL_SERVER_ERROR)
+
+async def get_team_stats(request: Request):
+    """Get per-team player statistics"""
+    try:
+        return JSONResponse({'teams': await request.app.state.stats_service.teams()})
+    except Exception as e:
+        return _error('Internal server error', HTTPStatus.INTERNAL_SERVER_ERROR)
+
+async def get_distributions(request: Request):
+    """Get per-attribute value histograms, optionally for one position"""
+    try:
+        position = request.query_params.get('position')
+        result = await request.app.state.stats_service.distributions(position.upper() if position else None)
+        return JSONResponse(result)
+    except ValueError as e:
+        return _error(str(e), HTTPStatus.BAD_REQUEST)
+    except Exception as e:
+        return _error('Internal server error', HTTPStatus.INTERNAL_SERVER_ERROR)
+
+async def health_check(request: Request):
+    """Report liveness"""
+    return JSONResponse({'status': 'healthy', 'message': 'Basketball Player Ranking API is running'})
+
+routes = [
+    Route('/api/health', health_check, methods=['GET']),
+    Route('/api/players', list_or_create_players, methods=['GET', 'POST']),
+    Route('/api/players/bulk', bulk_create_players, methods=['POST']),
+    Route('/api/players/compare', compare_players, methods=['POST']),
+    Route('/api/players/{player_id}', player_detail, methods=['GET', 'PUT', 'DELETE']),
+    Route('/api/stats/overview', get_overview, methods=['GET']),
+    Route('/api/stats/teams', get_team_stats, methods=['GET']),
+    Route('/api/stats/distributions', get_distributions, methods=['GET'])
+]
+
+def create_async_app(config: Optional[Dict] = None) -> Starlette:
+    """
+    Create the ASGI app
+
+    Args:
+        config: Settings overriding the environment, with the same names as
+            the Flask app's config (DB_NAME, MONGO_MAX_POOL_SIZE, ...)
+    """
+    load_dotenv()
+
+    settings = {
+        'DB_NAME': os.getenv('DB_NAME', 'basketball_rankings'),
+        'STREAM_BATCH_SIZE': int(os.getenv('STREAM_BATCH_SIZE', '1000')),
+        'BULK_INSERT_CHUNK_SIZE': int(os.getenv('BULK_INSERT_CHUNK_SIZE', '5000'))
+    }
+    settings.update(config or {})
+
+    @asynccontextmanager
+    async def lifespan(app):
+        # Motor clients are bound to the event loop they are created on
+        client = create_async_client(settings)
+        db = get_async_db(client, settings)
+        app.state.stats_service = AsyncStatsService(db)
+        app.state.player_service = AsyncPlayerService(db, app.state.stats_service)
+        try:
+            yield
+        finally:
+            client.close()
+
+    app = Starlette(routes=routes, lifespan=lifespan)
+    app.state.settings = settings
+    return app
@@ -0,0 +1,22 @@
+import os
+from typing import Dict
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from .db import client_options
+from .utils.metrics import command_metrics
+
+def create_async_client(settings: Dict) -> AsyncIOMotorClient:
+    """
+    Create a Motor client from the same settings as the sync client
+    
+    Args:
+        settings: DB_* and MONGO_* settings; missing ones fall back to the
+            environment
+    """
+    def setting(name, default=None):
+        return settings[name] if name in settings else os.getenv(name, default)
+    
+    return AsyncIOMotorClient(event_listeners=[command_metrics], **client_options(setting))
+
+def get_async_db(client: AsyncIOMotorClient, settings: Dict) -> AsyncIOMotorDatabase:
+    """Return the application database on client"""
+    return client[settings.get('DB_NAME') or os.getenv('DB_NAME', 'basketball_rankings')]
@@ -1,21 +1,193 @@
-from pymongo import MongoClient
-from flask import current_app, g
+from pymongo import MongoClient, monitoring
+from flask import current_app, g, has_app_context
 import os
+import threading
+import time
+from .utils.metrics import command_metrics
+
+# Process-wide client shared by every request; created lazily per process
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+def _setting(name, default=None):
+    """Read a database setting from the app config, falling back to the environment"""
+    if has_app_context() and name in current_app.config:
+        return current_app.config[name]
+    return os.getenv(name, default)
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Collect connection pool statistics for monitoring"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connections_open = 0
+            self.checked_out = 0
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.wait_time_total = 0.0
+            self.wait_time_max = 0.0
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'connections_open': self.connections_open,
+                'checked_out': self.checked_out,
+                'checkouts': self.checkouts,
+                'checkout_failures': self.checkout_failures,
+                'wait_time_total_ms': round(self.wait_time_total * 1000, 3),
+                'wait_time_max_ms': round(self.wait_time_max * 1000, 3),
+                'wait_time_avg_ms': round(self.wait_time_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0
+            }
+
+    def _record_wait(self):
+        started = getattr(self._local, 'started', None)
+        self._local.started = None
+        return time.perf_counter() - started if started is not None else 0.0
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        waited = self._record_wait()
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+
+    def connection_check_out_failed(self, event):
+        waited = self._record_wait()
+        with self._lock:
+            self.checkout_failures += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_open -= 1
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+pool_stats = PoolStatsListener()
+
+def client_options(setting=_setting):
+    """
+    MongoClient keyword arguments from the DB_* and MONGO_* settings
+    
+    Args:
+        setting: Function looking up a setting by name, with a default
+    """
+    options = {
+        'host': setting('DB_HOST', 'localhost'),
+        'port': int(setting('DB_PORT', 27017)),
+        'username': setting('DB_USER'),
+        'password': setting('DB_PASSWORD'),
+        'maxPoolSize': int(setting('MONGO_MAX_POOL_SIZE', 100)),
+        'minPoolSize': int(setting('MONGO_MIN_POOL_SIZE', 0)),
+        'connectTimeoutMS': int(setting('MONGO_CONNECT_TIMEOUT_MS', 20000)),
+        'serverSelectionTimeoutMS': int(setting('MONGO_SERVER_SELECTION_TIMEOUT_MS', 30000))
+    }
+    wait_queue_timeout = setting('MONGO_WAIT_QUEUE_TIMEOUT_MS')
+    if wait_queue_timeout:
+        options['waitQueueTimeoutMS'] = int(wait_queue_timeout)
+    compressors = setting('MONGO_COMPRESSORS')
+    if compressors:
+        options['compressors'] = compressors
+    return options
+
+def _create_client():
+    """Create a MongoClient configured from the app config or environment"""
+    return MongoClient(event_listeners=[pool_stats, command_metrics], **client_options())
+
+def get_client():
+    """
+    Return the process-wide MongoClient, creating it on first use
+    
+    A client inherited across fork() is never reused: the child creates
+    its own, since PyMongo clients are not fork-safe.
+    """
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                pool_stats.reset()
+                _client = _create_client()
+                _client_pid = os.getpid()
+    return _client
+
+def use_client(client):
+    """
+    Make client this process's shared client, closing any previous one
+
+    Lets tools such as the benchmark suite run against an in-memory
+    stand-in with the same API as MongoClient.
+    """
+    global _client, _client_pid
+    with _client_lock:
+        if _client is not None and _client is not client and _client_pid == os.getpid():
+            _client.close()
+        _client = client
+        _client_pid = os.getpid()
+
+def _forget_client_after_fork():
+    global _client, _client_pid, _client_lock
+    _client = None
+    _client_pid = None
+    _client_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_client_after_fork)
 
 def get_db():
     """Return database connection"""
+    if not has_app_context():
+        return get_client()[_setting('DB_NAME', 'basketball_rankings')]
     if 'db' not in g:
-        client = MongoClient(
-            host=os.getenv('DB_HOST', 'localhost'),
-            port=int(os.getenv('DB_PORT', 27017)),
-            username=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD')
-        )
-        g.db = client[os.getenv('DB_NAME', 'basketball_rankings')]
+        g.db = get_client()[_setting('DB_NAME', 'basketball_rankings')]
     return g.db
 
 def close_db(e=None):
-    """Close database connection"""
-    db = g.pop('db', None)
-    if db is not None:
-        db.client.close()
+    """Release the request's database handle; pooled connections stay open"""
+    g.pop('db', None)
+
+def close_client():
+    """Close the process-wide client and its connection pool"""
+    global _client, _client_pid
+    with _client_lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+
+def get_pool_stats():
+    """Return connection pool statistics for this process"""
+    stats = pool_stats.snapshot()
+    stats['max_pool_size'] = _client.options.pool_options.max_pool_size if _client is not None else None
+    return stats
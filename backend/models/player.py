@@ -1,4 +1,9 @@
-from datetime import datetime
+import sys
+from array import array
+from datetime import datetime, timezone
+from ..services.scoring_service import (
+    OFFENSE_FIELDS, DEFENSE_FIELDS, STAT_FIELDS, POSITIONS, POSITION_CODES
+)
 
 class Player:
     def __init__(self, **kwargs):
@@ -9,6 +14,7 @@ class Player:
         self.offense = kwargs['offense']
         self.defense = kwargs['defense']
         self.overall_score = kwargs.get('overall_score', 0.0)
+        self.position_weighted_score = kwargs.get('position_weighted_score')
         self.created_at = kwargs.get('created_at', datetime.utcnow())
         self.updated_at = kwargs.get('updated_at', datetime.utcnow())
         
@@ -51,6 +57,101 @@ class Player:
             'offense': self.offense,
             'defense': self.defense,
             'overall_score': self.overall_score,
+            'position_weighted_score': self.position_weighted_score,
             'created_at': self.created_at,
             'updated_at': self.updated_at
-        }
\ No newline at end of file
+        }
+
+class CompactPlayer:
+    """
+    Memory-compact, read-only player representation
+    
+    Meant for large in-memory collections (caches, indexes). The ten stats
+    are packed into one array('B') in STAT_FIELDS order, the position is
+    stored as its code, team names are interned and timestamps are kept as
+    POSIX floats. dict() returns the same shape as Player.dict().
+    """
+
+    __slots__ = (
+        'id', 'name', 'team', 'position_code', 'stats',
+        'overall_score', 'position_weighted_score', '_created_at', '_updated_at'
+    )
+
+    def __init__(self, id, name, team, position, stats, overall_score=0.0,
+                 position_weighted_score=None, created_at=None, updated_at=None):
+        self.id = id
+        self.name = name
+        self.team = sys.intern(team)
+        self.position_code = POSITION_CODES[position]
+        self.stats = array('B', stats)
+        if len(self.stats) != len(STAT_FIELDS):
+            raise ValueError(f"Expected {len(STAT_FIELDS)} stats, got {len(self.stats)}")
+        self.overall_score = overall_score
+        self.position_weighted_score = position_weighted_score
+        self._created_at = _to_timestamp(created_at)
+        self._updated_at = _to_timestamp(updated_at)
+
+    @classmethod
+    def from_doc(cls, doc):
+        """Build from a players collection document or Player.dict()"""
+        player_id = doc.get('id', doc.get('_id'))
+        return cls(
+            id=str(player_id) if player_id is not None else None,
+            name=doc['name'],
+            team=doc['team'],
+            position=doc['position'],
+            stats=[doc['offense'][field] for field in OFFENSE_FIELDS] +
+                  [doc['defense'][field] for field in DEFENSE_FIELDS],
+            overall_score=doc.get('overall_score', 0.0),
+            position_weighted_score=doc.get('position_weighted_score'),
+            created_at=doc.get('created_at'),
+            updated_at=doc.get('updated_at')
+        )
+
+    @property
+    def position(self):
+        return POSITIONS[self.position_code]
+
+    @property
+    def offense(self):
+        return dict(zip(OFFENSE_FIELDS, self.stats[:len(OFFENSE_FIELDS)]))
+
+    @property
+    def defense(self):
+        return dict(zip(DEFENSE_FIELDS, self.stats[len(OFFENSE_FIELDS):]))
+
+    @property
+    def created_at(self):
+        return _from_timestamp(self._created_at)
+
+    @property
+    def updated_at(self):
+        return _from_timestamp(self._updated_at)
+
+    def dict(self):
+        """Convert to the same dictionary shape as Player.dict()"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'team': self.team,
+            'position': self.position,
+            'offense': self.offense,
+            'defense': self.defense,
+            'overall_score': self.overall_score,
+            'position_weighted_score': self.position_weighted_score,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
+
+def _to_timestamp(value):
+    # Naive datetimes are UTC throughout the app (datetime.utcnow)
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def _from_timestamp(value):
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
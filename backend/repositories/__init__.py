@@ -0,0 +1,59 @@
+import threading
+from .base import PlayerRepository
+from .memory import InMemoryPlayerRepository
+from .mongo import MongoPlayerRepository
+from .sqlite import SQLitePlayerRepository
+
+# Values of the PLAYER_REPOSITORY setting
+REPOSITORIES = ('mongodb', 'sqlite', 'memory')
+
+# Process-wide repositories, one per backend and location
+_repositories = {}
+_repositories_lock = threading.Lock()
+
+def create_repository(kind: str, sqlite_path: str = 'basketball_rankings.sqlite3') -> PlayerRepository:
+    """
+    Create a player repository
+
+    Args:
+        kind: mongodb, sqlite or memory
+        sqlite_path: Database file of the sqlite repository
+
+    Raises:
+        ValueError: If kind is unknown
+    """
+    if kind == 'mongodb':
+        return MongoPlayerRepository()
+    if kind == 'sqlite':
+        return SQLitePlayerRepository(sqlite_path)
+    if kind == 'memory':
+        return InMemoryPlayerRepository()
+    raise ValueError(f"Invalid player repository: {kind}. Must be one of {', '.join(REPOSITORIES)}")
+
+def get_player_repository() -> PlayerRepository:
+    """
+    Return the repository selected by the PLAYER_REPOSITORY setting
+
+    Read from the app config, falling back to the environment, like the
+    database settings. The MongoDB repository (the default) uses the
+    process-wide client of get_db(); the sqlite repository opens
+    SQLITE_PATH.
+    """
+    from ..db import _setting
+
+    kind = _setting('PLAYER_REPOSITORY', 'mongodb')
+    key = (kind, _setting('SQLITE_PATH', 'basketball_rankings.sqlite3') if kind == 'sqlite' else None)
+    repository = _repositories.get(key)
+    if repository is None:
+        with _repositories_lock:
+            repository = _repositories.get(key)
+            if repository is None:
+                repository = _repositories[key] = create_repository(kind, key[1])
+    return repository
+
+def close_repositories():
+    """Close and forget every process-wide repository"""
+    with _repositories_lock:
+        for repository in _repositories.values():
+            repository.close()
+        _repositories.clear()
@@ -0,0 +1,275 @@
+import re
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+from bson import ObjectId
+from ..services.scoring_service import ScoringService, STAT_FIELDS
+
+# Aggregate documents of one team have IDs with this prefix
+TEAM_SCOPE_PREFIX = 'team:'
+
+# Sort keys every listing is tie-broken on, then on _id: (value, _id)
+Keyset = Tuple[object, ObjectId]
+
+class HistoryEvent(NamedTuple):
+    """One overall_score change in the rank history log"""
+    seq: int
+    timestamp: datetime
+    player_id: ObjectId
+    # Score after the change, None once the player is deleted
+    score: Optional[float]
+    # Overall rank right after the change, when it was known
+    rank: Optional[int]
+
+class Checkpoint(NamedTuple):
+    """Every player's overall score as of history event seq, packed by HistoryService"""
+    seq: int
+    timestamp: datetime
+    data: bytes
+
+# (timestamp, player_id, score, rank) of an event about to be appended
+HistoryEntry = Tuple[datetime, ObjectId, Optional[float], Optional[int]]
+
+def scope_team(scope: str) -> Optional[str]:
+    """Team an aggregate document belongs to, or None for league and position documents"""
+    return scope[len(TEAM_SCOPE_PREFIX):] if scope.startswith(TEAM_SCOPE_PREFIX) else None
+
+def project(doc: Dict, fields: Optional[Iterable[str]]) -> Dict:
+    """Copy of doc restricted to fields (and _id), one level deep"""
+    if fields is None:
+        return {key: dict(value) if isinstance(value, dict) else value for key, value in doc.items()}
+    projected = {'_id': doc['_id']}
+    for field in fields:
+        if field in doc:
+            value = doc[field]
+            projected[field] = dict(value) if isinstance(value, dict) else value
+    return projected
+
+def increment(doc: Dict, inc: Dict[str, float]):
+    """Apply a MongoDB-style $inc with dotted keys to a nested document in place"""
+    for key, value in inc.items():
+        *parents, leaf = key.split('.')
+        target = doc
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[leaf] = target.get(leaf, 0) + value
+
+def matches_name(name: str, needle: str) -> bool:
+    """Case-insensitive substring match, like the MongoDB name filter"""
+    return needle.casefold() in name.casefold()
+
+class PlayerRepository(ABC):
+    """
+    Storage for player documents and the stats aggregates derived from them
+
+    Documents are plain dicts with an ObjectId _id, the shape stored in
+    the MongoDB players collection, so services work the same on every
+    backend. Methods taking fields return only those fields plus _id;
+    None returns the whole document. Listing filters are the position,
+    team and name (case-insensitive substring) filters of the API.
+
+    Aggregates are the StatsService documents keyed by scope (league,
+    team:<team>, position:<position>); increments use MongoDB $inc dotted
+    keys. The rank history is an append-only log of HistoryEvents numbered
+    by seq, plus the HistoryService checkpoints taken along it.
+    """
+
+    name = None
+
+    @abstractmethod
+    def insert(self, doc: Dict) -> ObjectId:
+        """Store a new player, setting doc['_id'], and return its ID"""
+
+    @abstractmethod
+    def insert_many(self, docs: List[Dict]) -> Dict[int, str]:
+        """
+        Store new players in one batch, setting each doc['_id']
+
+        Returns:
+            Error messages of the rows that were not stored, keyed by
+            position in docs
+        """
+
+    @abstractmethod
+    def get(self, player_id: ObjectId, fields: Optional[Iterable[str]] = None) -> Optional[Dict]:
+        """Get one player, or None if there is no such player"""
+
+    @abstractmethod
+    def get_many(self, player_ids: Sequence[ObjectId], fields: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Get the players with the given IDs that exist, in any order"""
+
+    @abstractmethod
+    def find(
+        self,
+        filters: Optional[Dict] = None,
+        sort_by: str = 'overall_score',
+        descending: bool = True,
+        after: Optional[Keyset] = None,
+        limit: Optional[int] = None,
+        fields: Optional[Iterable[str]] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Dict]:
+        """
+        Iterate over the players matching filters, sorted on (sort_by, _id)
+
+        Args:
+            filters: Optional position, team and name filters
+            sort_by: Field to sort on
+            descending: Sort direction, for both sort_by and _id
+            after: Only return players strictly after this (value, _id)
+                keyset in sort order
+            limit: Maximum number of players to return
+            fields: Fields to return
+            batch_size: Number of players fetched per round trip
+        """
+
+    @abstractmethod
+    def scan(self, fields: Optional[Iterable[str]] = None, batch_size: int = 10000) -> Iterator[Dict]:
+        """Iterate over every player in storage order"""
+
+    @abstractmethod
+    def update(self, player_id: ObjectId, values: Dict) -> Optional[Dict]:
+        """Set top-level fields of a player and return the updated player, or None if there is no such player"""
+
+    @abstractmethod
+    def delete(self, player_id: ObjectId) -> Optional[Dict]:
+        """Delete a player and return it, or None if there is no such player"""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored players"""
+
+    def position_leaderboard(self, position: str, limit: int) -> List[Dict]:
+        """
+        Players at a position by position_weighted_score, highest first
+
+        Ties are broken on ascending _id. Returns _id, name, team and
+        position_weighted_score; players without a position-weighted score
+        are left out.
+        """
+        docs = [
+            doc for doc in self.scan(('name', 'team', 'position', 'position_weighted_score'))
+            if doc.get('position') == position and doc.get('position_weighted_score') is not None
+        ]
+        docs.sort(key=lambda doc: (-doc['position_weighted_score'], doc['_id'].binary))
+        for doc in docs[:limit]:
+            del doc['position']
+        return docs[:limit]
+
+    def text_search(self, query: str, limit: int) -> List[Dict]:
+        """
+        Players whose name or team contains any word of query
+
+        Ranked by the number of matching words, then by overall score.
+        Returns _id, name, team, position and overall_score. The MongoDB
+        repository runs this through its text index instead.
+        """
+        words = set(re.findall(r'\w+', query.casefold()))
+        if not words:
+            return []
+        scored = []
+        for doc in self.scan(('name', 'team', 'position', 'overall_score')):
+            text = set(re.findall(r'\w+', f"{doc.get('name') or ''} {doc.get('team') or ''}".casefold()))
+            score = len(words & text)
+            if score:
+                scored.append((score, doc))
+        scored.sort(key=lambda item: (-item[0], -(item[1].get('overall_score') or 0)))
+        return [doc for _, doc in scored[:limit]]
+
+    @abstractmethod
+    def get_aggregates(self, scopes: Iterable[str], fields: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        """Get the aggregate documents of the given scopes that exist, keyed by scope"""
+
+    @abstractmethod
+    def team_aggregates(self) -> List[Dict]:
+        """Aggregate documents of every team that still has players, sorted by team"""
+
+    @abstractmethod
+    def increment_aggregates(self, increments: Dict[str, Dict[str, float]]):
+        """Apply $inc-style increments per scope, creating missing aggregate documents"""
+
+    @abstractmethod
+    def replace_aggregates(self, aggregates: Dict[str, Dict]):
+        """Replace every aggregate document with the given ones"""
+
+    @abstractmethod
+    def append_history(self, entries: Sequence[HistoryEntry]) -> int:
+        """Append events to the rank history log and return the seq of the last one"""
+
+    @abstractmethod
+    def last_history_seq(self) -> int:
+        """Seq of the newest history event, 0 while the log is empty"""
+
+    @abstractmethod
+    def history_events(self, after_seq: int, through_seq: Optional[int] = None) -> Iterator[HistoryEvent]:
+        """Iterate over the history events after after_seq (up to through_seq), in seq order"""
+
+    @abstractmethod
+    def player_history(
+        self,
+        player_id: ObjectId,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[HistoryEvent]:
+        """History events of one player between since and until (inclusive), in seq order"""
+
+    @abstractmethod
+    def save_checkpoint(self, checkpoint: Checkpoint):
+        """Store a checkpoint, replacing any earlier one with the same seq"""
+
+    @abstractmethod
+    def latest_checkpoint(self, until: Optional[datetime] = None) -> Optional[Checkpoint]:
+        """The checkpoint with the highest seq taken at or before until, or None"""
+
+    def aggregate_groups(self) -> Tuple[Iterable[Dict], Iterable[Dict]]:
+        """
+        Player counts for rebuilding the stats aggregates
+
+        Returns:
+            Tuple of (player count and overall score sum per team and
+            position, player count per team, position, attribute and
+            value), in the shape of the StatsService aggregation pipelines
+        """
+        docs = list(self.scan(('team', 'position', 'overall_score', 'offense', 'defense')))
+        if not docs:
+            return [], []
+
+        # Count with bincount over (group, attribute, value) cells; stats
+        # are validated ints from 0 to 100
+        keys = {}
+        codes = np.fromiter(
+            (keys.setdefault((doc.get('team'), doc.get('position')), len(keys)) for doc in docs),
+            dtype=np.int64, count=len(docs)
+        )
+        scores = np.fromiter((doc.get('overall_score') or 0 for doc in docs), dtype=np.float64, count=len(docs))
+        counts = np.bincount(codes, minlength=len(keys)).tolist()
+        score_sums = np.bincount(codes, weights=scores, minlength=len(keys)).tolist()
+
+        width = len(STAT_FIELDS) * 101
+        matrix = ScoringService.stats_matrix(docs).astype(np.int64)
+        cells = codes[:, None] * width + np.arange(len(STAT_FIELDS)) * 101 + matrix
+        histogram = np.bincount(cells.ravel(), minlength=len(keys) * width)
+
+        groups = [
+            {'_id': {'team': team, 'position': position}, 'count': counts[code], 'overall_score_sum': score_sums[code]}
+            for (team, position), code in keys.items()
+        ]
+        cells = np.flatnonzero(histogram)
+        cell_codes, rest = np.divmod(cells, width)
+        fields, cell_values = np.divmod(rest, 101)
+        teams_positions = list(keys)
+        values = [
+            {
+                '_id': {'team': teams_positions[code][0], 'position': teams_positions[code][1],
+                        'field': STAT_FIELDS[field], 'value': value},
+                'count': count
+            }
+            for code, field, value, count in zip(
+                cell_codes.tolist(), fields.tolist(), cell_values.tolist(), histogram[cells].tolist()
+            )
+        ]
+        return groups, values
+
+    def close(self):
+        """Release connections held by the repository"""
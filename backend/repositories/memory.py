@@ -0,0 +1,236 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+from bson import ObjectId
+from .base import (
+    Checkpoint, HistoryEntry, HistoryEvent, Keyset, PlayerRepository, increment, matches_name, project, scope_team
+)
+
+# Fields kept in sorted (value, _id) key lists for listings
+INDEXED_FIELDS = ('overall_score', 'name')
+
+class InMemoryPlayerRepository(PlayerRepository):
+    """
+    Players and aggregates in process memory
+
+    For tests and single-process deployments that do not need the data to
+    outlive the process. Listings walk sorted (value, _id) key lists of
+    the sort field, so a page costs a binary search plus the players it
+    skips over for filters. Documents are copied in and out, so callers
+    never share state with the store.
+    """
+
+    name = 'memory'
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # Documents keyed by the 12 bytes of their _id, which the key lists hold
+        self._players = {}
+        self._keys = {field: [] for field in INDEXED_FIELDS}
+        self._aggregates = {}
+        # History events in seq order (event seq n at index n - 1), the
+        # indexes of each player's events and checkpoints keyed by seq
+        self._history: List[HistoryEvent] = []
+        self._player_history: Dict[bytes, List[int]] = {}
+        self._checkpoints: Dict[int, Checkpoint] = {}
+
+    @staticmethod
+    def _key(doc: Dict, field: str):
+        return (doc.get(field), doc['_id'].binary)
+
+    def _index(self, doc: Dict):
+        for field, keys in self._keys.items():
+            insort(keys, self._key(doc, field))
+
+    def _unindex(self, doc: Dict):
+        for field, keys in self._keys.items():
+            key = self._key(doc, field)
+            del keys[bisect_left(keys, key)]
+
+    def insert(self, doc: Dict) -> ObjectId:
+        doc.setdefault('_id', ObjectId())
+        with self._lock:
+            if doc['_id'].binary in self._players:
+                raise ValueError(f"Duplicate player ID {doc['_id']}")
+            stored = project(doc, None)
+            self._players[doc['_id'].binary] = stored
+            self._index(stored)
+        return doc['_id']
+
+    def insert_many(self, docs: List[Dict]) -> Dict[int, str]:
+        errors = {}
+        with self._lock:
+            added = []
+            for index, doc in enumerate(docs):
+                doc.setdefault('_id', ObjectId())
+                if doc['_id'].binary in self._players:
+                    errors[index] = f"Duplicate player ID {doc['_id']}"
+                    continue
+                stored = project(doc, None)
+                self._players[doc['_id'].binary] = stored
+                added.append(stored)
+
+            # Appending the batch as one sorted run lets the sort merge the
+            # two runs in linear time instead of inserting key by key
+            for field, keys in self._keys.items():
+                keys.extend(sorted(self._key(doc, field) for doc in added))
+                keys.sort()
+        return errors
+
+    def get(self, player_id: ObjectId, fields: Optional[Iterable[str]] = None) -> Optional[Dict]:
+        with self._lock:
+            doc = self._players.get(player_id.binary)
+            return project(doc, fields) if doc is not None else None
+
+    def get_many(self, player_ids: Sequence[ObjectId], fields: Optional[Iterable[str]] = None) -> List[Dict]:
+        with self._lock:
+            docs = (self._players.get(player_id.binary) for player_id in player_ids)
+            return [project(doc, fields) for doc in docs if doc is not None]
+
+    @staticmethod
+    def _matcher(filters: Optional[Dict]):
+        filters = filters or {}
+        position, team, name = filters.get('position'), filters.get('team'), filters.get('name')
+        if not (position or team or name):
+            return None
+
+        def matches(doc: Dict) -> bool:
+            return (
+                (not position or doc.get('position') == position)
+                and (not team or doc.get('team') == team)
+                and (not name or matches_name(doc.get('name') or '', name))
+            )
+        return matches
+
+    def find(
+        self,
+        filters: Optional[Dict] = None,
+        sort_by: str = 'overall_score',
+        descending: bool = True,
+        after: Optional[Keyset] = None,
+        limit: Optional[int] = None,
+        fields: Optional[Iterable[str]] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Dict]:
+        matches = self._matcher(filters)
+        with self._lock:
+            keys = self._keys.get(sort_by)
+            if keys is None:
+                keys = sorted(self._key(doc, sort_by) for doc in self._players.values())
+            after_key = (after[0], after[1].binary) if after is not None else None
+            if descending:
+                end = bisect_left(keys, after_key) if after_key is not None else len(keys)
+                walk = (keys[position] for position in range(end - 1, -1, -1))
+            else:
+                start = bisect_right(keys, after_key) if after_key is not None else 0
+                walk = (keys[position] for position in range(start, len(keys)))
+
+            docs = []
+            for _, binary in walk:
+                doc = self._players[binary]
+                if matches is None or matches(doc):
+                    docs.append(project(doc, fields))
+                    if limit is not None and len(docs) >= limit:
+                        break
+        return iter(docs)
+
+    def scan(self, fields: Optional[Iterable[str]] = None, batch_size: int = 10000) -> Iterator[Dict]:
+        with self._lock:
+            return iter([project(doc, fields) for doc in self._players.values()])
+
+    def update(self, player_id: ObjectId, values: Dict) -> Optional[Dict]:
+        with self._lock:
+            doc = self._players.get(player_id.binary)
+            if doc is None:
+                return None
+            self._unindex(doc)
+            doc.update(project(values, None))
+            self._index(doc)
+            return project(doc, None)
+
+    def delete(self, player_id: ObjectId) -> Optional[Dict]:
+        with self._lock:
+            doc = self._players.pop(player_id.binary, None)
+            if doc is not None:
+                self._unindex(doc)
+            return doc
+
+    def count(self) -> int:
+        return len(self._players)
+
+    def get_aggregates(self, scopes: Iterable[str], fields: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                scope: _copy_aggregate(self._aggregates[scope], fields)
+                for scope in scopes if scope in self._aggregates
+            }
+
+    def team_aggregates(self) -> List[Dict]:
+        with self._lock:
+            docs = [
+                _copy_aggregate(doc) for doc in self._aggregates.values()
+                if doc.get('team') is not None and doc.get('count', 0) > 0
+            ]
+        return sorted(docs, key=lambda doc: doc['team'])
+
+    def increment_aggregates(self, increments: Dict[str, Dict[str, float]]):
+        with self._lock:
+            for scope, inc in increments.items():
+                doc = self._aggregates.setdefault(scope, {'_id': scope, 'team': scope_team(scope)})
+                increment(doc, inc)
+
+    def replace_aggregates(self, aggregates: Dict[str, Dict]):
+        with self._lock:
+            self._aggregates = {scope: _deep_copy(dict(aggregate, _id=scope)) for scope, aggregate in aggregates.items()}
+
+    def append_history(self, entries: Sequence[HistoryEntry]) -> int:
+        with self._lock:
+            for timestamp, player_id, score, rank in entries:
+                self._player_history.setdefault(player_id.binary, []).append(len(self._history))
+                self._history.append(HistoryEvent(len(self._history) + 1, timestamp, player_id, score, rank))
+            return len(self._history)
+
+    def last_history_seq(self) -> int:
+        return len(self._history)
+
+    def history_events(self, after_seq: int, through_seq: Optional[int] = None) -> Iterator[HistoryEvent]:
+        # The log only grows, so walking indexes needs no lock or copy
+        end = len(self._history) if through_seq is None else min(through_seq, len(self._history))
+        return (self._history[index] for index in range(after_seq, end))
+
+    def player_history(
+        self,
+        player_id: ObjectId,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[HistoryEvent]:
+        with self._lock:
+            events = [self._history[index] for index in self._player_history.get(player_id.binary, [])]
+        return [
+            event for event in events
+            if (since is None or event.timestamp >= since) and (until is None or event.timestamp <= until)
+        ]
+
+    def save_checkpoint(self, checkpoint: Checkpoint):
+        with self._lock:
+            self._checkpoints[checkpoint.seq] = checkpoint
+
+    def latest_checkpoint(self, until: Optional[datetime] = None) -> Optional[Checkpoint]:
+        with self._lock:
+            checkpoints = [
+                checkpoint for checkpoint in self._checkpoints.values()
+                if until is None or checkpoint.timestamp <= until
+            ]
+        return max(checkpoints, key=lambda checkpoint: checkpoint.seq, default=None)
+
+def _deep_copy(value):
+    if isinstance(value, dict):
+        return {key: _deep_copy(item) for key, item in value.items()}
+    return value
+
+def _copy_aggregate(doc: Dict, fields: Optional[Iterable[str]] = None) -> Dict:
+    """Deep copy of an aggregate document, restricted to fields (and _id)"""
+    if fields is not None:
+        doc = {key: doc[key] for key in ('_id', *fields) if key in doc}
+    return _deep_copy(doc)
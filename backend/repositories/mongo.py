@@ -0,0 +1,284 @@
+import re
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from .base import (
+    Checkpoint, HistoryEntry, HistoryEvent, Keyset, PlayerRepository, TEAM_SCOPE_PREFIX, scope_team
+)
+
+# Per-team aggregates of teams that still have players
+TEAMS_QUERY = {'_id': {'$regex': f'^{TEAM_SCOPE_PREFIX}'}, 'count': {'$gt': 0}}
+
+# Player count and score sum per (team, position), folded by StatsService._aggregate
+GROUPS_PIPELINE = [
+    {'$group': {
+        '_id': {'team': '$team', 'position': '$position'},
+        'count': {'$sum': 1},
+        'overall_score_sum': {'$sum': '$overall_score'}
+    }}
+]
+
+# Player count per (team, position, attribute, value), folded by StatsService._aggregate
+VALUES_PIPELINE = [
+    {'$project': {
+        'team': 1,
+        'position': 1,
+        'stats': {'$concatArrays': [{'$objectToArray': '$offense'}, {'$objectToArray': '$defense'}]}
+    }},
+    {'$unwind': '$stats'},
+    {'$group': {
+        '_id': {'team': '$team', 'position': '$position', 'field': '$stats.k', 'value': '$stats.v'},
+        'count': {'$sum': 1}
+    }}
+]
+
+# Checkpoints are split across documents to stay under the 16MB document limit
+CHECKPOINT_PART_BYTES = 8 * 1024 * 1024
+
+def filter_query(filters: Optional[Dict]) -> Dict:
+    """Translate listing filters into a MongoDB query"""
+    filters = filters or {}
+    query = {}
+    if filters.get('position'):
+        query['position'] = filters['position']
+    if filters.get('team'):
+        query['team'] = filters['team']
+    if filters.get('name'):
+        query['name'] = {'$regex': re.escape(filters['name']), '$options': 'i'}
+    return query
+
+def page_query(
+    filters: Optional[Dict],
+    sort_by: str,
+    descending: bool,
+    after: Optional[Keyset] = None
+) -> Tuple[Dict, List]:
+    """
+    Build the query and sort of a keyset-paginated listing
+
+    Returns:
+        Tuple of (MongoDB query, sort specification)
+    """
+    query = filter_query(filters)
+    if after is not None:
+        # Everything strictly after the last (value, _id) seen
+        last_value, last_id = after
+        op = '$lt' if descending else '$gt'
+        query = {'$and': [query, {'$or': [
+            {sort_by: {op: last_value}},
+            {sort_by: last_value, '_id': {op: last_id}}
+        ]}]}
+    direction = DESCENDING if descending else ASCENDING
+    return query, [(sort_by, direction), ('_id', direction)]
+
+def aggregate_updates(increments: Dict[str, Dict[str, float]]) -> List[UpdateOne]:
+    """Upserts applying per-scope increments to the team_stats collection"""
+    return [
+        UpdateOne({'_id': scope}, {'$inc': inc, '$setOnInsert': {'team': scope_team(scope)}}, upsert=True)
+        for scope, inc in increments.items()
+    ]
+
+def _projection(fields: Optional[Iterable[str]]) -> Optional[Dict]:
+    return None if fields is None else dict.fromkeys(fields, 1)
+
+def _history_event(doc: Dict) -> HistoryEvent:
+    return HistoryEvent(doc['_id'], doc['t'], doc['p'], doc.get('s'), doc.get('r'))
+
+class MongoPlayerRepository(PlayerRepository):
+    """
+    Players in the players collection and aggregates in team_stats
+
+    History events live in rank_history under short field names, keyed by
+    a seq handed out by the counters collection; checkpoints live in
+    rank_checkpoints, one document per part.
+
+    Uses the process-wide pooled client from get_db() unless a database
+    is given.
+    """
+
+    name = 'mongodb'
+
+    def __init__(self, db=None):
+        self._db = db
+
+    @property
+    def db(self):
+        from ..db import get_db
+
+        return self._db if self._db is not None else get_db()
+
+    def insert(self, doc: Dict) -> ObjectId:
+        return self.db.players.insert_one(doc).inserted_id
+
+    def insert_many(self, docs: List[Dict]) -> Dict[int, str]:
+        errors = {}
+        try:
+            self.db.players.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get('writeErrors', []):
+                errors[write_error['index']] = write_error.get('errmsg', 'Write failed')
+        return errors
+
+    def get(self, player_id: ObjectId, fields: Optional[Iterable[str]] = None) -> Optional[Dict]:
+        return self.db.players.find_one({'_id': player_id}, _projection(fields))
+
+    def get_many(self, player_ids: Sequence[ObjectId], fields: Optional[Iterable[str]] = None) -> List[Dict]:
+        return list(self.db.players.find({'_id': {'$in': list(player_ids)}}, _projection(fields)))
+
+    def find(
+        self,
+        filters: Optional[Dict] = None,
+        sort_by: str = 'overall_score',
+        descending: bool = True,
+        after: Optional[Keyset] = None,
+        limit: Optional[int] = None,
+        fields: Optional[Iterable[str]] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Dict]:
+        query, sort = page_query(filters, sort_by, descending, after)
+        cursor = self.db.players.find(query, _projection(fields)).sort(sort)
+        if limit is not None:
+            return cursor.limit(limit)
+        return cursor.batch_size(batch_size)
+
+    def scan(self, fields: Optional[Iterable[str]] = None, batch_size: int = 10000) -> Iterator[Dict]:
+        return self.db.players.find({}, _projection(fields)).batch_size(batch_size)
+
+    def update(self, player_id: ObjectId, values: Dict) -> Optional[Dict]:
+        return self.db.players.find_one_and_update(
+            {'_id': player_id},
+            {'$set': values},
+            return_document=ReturnDocument.AFTER
+        )
+
+    def delete(self, player_id: ObjectId) -> Optional[Dict]:
+        return self.db.players.find_one_and_delete({'_id': player_id})
+
+    def count(self) -> int:
+        return self.db.players.estimated_document_count()
+
+    def position_leaderboard(self, position: str, limit: int) -> List[Dict]:
+        # Served straight from the position_weighted_leaderboard index: the
+        # query only projects indexed fields, so it never fetches documents
+        return list(
+            self.db.players.find(
+                {'position': position, 'position_weighted_score': {'$gte': 0}},
+                {'_id': 1, 'name': 1, 'team': 1, 'position_weighted_score': 1}
+            )
+            .sort([('position_weighted_score', -1), ('_id', 1)])
+            .limit(limit)
+        )
+
+    def text_search(self, query: str, limit: int) -> List[Dict]:
+        return list(
+            self.db.players.find(
+                {'$text': {'$search': query}},
+                {'score': {'$meta': 'textScore'}, 'name': 1, 'team': 1, 'position': 1, 'overall_score': 1}
+            )
+            .sort([('score', {'$meta': 'textScore'}), ('overall_score', -1)])
+            .limit(limit)
+        )
+
+    def get_aggregates(self, scopes: Iterable[str], fields: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        return {
+            doc['_id']: doc
+            for doc in self.db.team_stats.find({'_id': {'$in': list(scopes)}}, _projection(fields))
+        }
+
+    def team_aggregates(self) -> List[Dict]:
+        return list(self.db.team_stats.find(TEAMS_QUERY).sort('team', 1))
+
+    def increment_aggregates(self, increments: Dict[str, Dict[str, float]]):
+        if increments:
+            self.db.team_stats.bulk_write(aggregate_updates(increments), ordered=False)
+
+    def replace_aggregates(self, aggregates: Dict[str, Dict]):
+        db = self.db
+        db.team_stats.delete_many({'_id': {'$nin': list(aggregates)}})
+        if aggregates:
+            db.team_stats.bulk_write([
+                ReplaceOne({'_id': scope}, aggregate, upsert=True)
+                for scope, aggregate in aggregates.items()
+            ], ordered=False)
+
+    def aggregate_groups(self) -> Tuple[Iterable[Dict], Iterable[Dict]]:
+        db = self.db
+        return (
+            db.players.aggregate(GROUPS_PIPELINE, allowDiskUse=True),
+            db.players.aggregate(VALUES_PIPELINE, allowDiskUse=True)
+        )
+
+    def append_history(self, entries: Sequence[HistoryEntry]) -> int:
+        if not entries:
+            return self.last_history_seq()
+        db = self.db
+        counter = db.counters.find_one_and_update(
+            {'_id': 'rank_history'},
+            {'$inc': {'seq': len(entries)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        first = counter['seq'] - len(entries) + 1
+        db.rank_history.insert_many([
+            {'_id': first + offset, 't': timestamp, 'p': player_id, 's': score, 'r': rank}
+            for offset, (timestamp, player_id, score, rank) in enumerate(entries)
+        ])
+        return counter['seq']
+
+    def last_history_seq(self) -> int:
+        counter = self.db.counters.find_one({'_id': 'rank_history'})
+        return counter['seq'] if counter else 0
+
+    def history_events(self, after_seq: int, through_seq: Optional[int] = None) -> Iterator[HistoryEvent]:
+        query = {'$gt': after_seq}
+        if through_seq is not None:
+            query['$lte'] = through_seq
+        cursor = self.db.rank_history.find({'_id': query}).sort('_id', ASCENDING).batch_size(5000)
+        return map(_history_event, cursor)
+
+    def player_history(
+        self,
+        player_id: ObjectId,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[HistoryEvent]:
+        query = {'p': player_id}
+        if since is not None or until is not None:
+            query['t'] = {}
+            if since is not None:
+                query['t']['$gte'] = since
+            if until is not None:
+                query['t']['$lte'] = until
+        return [_history_event(doc) for doc in self.db.rank_history.find(query).sort('_id', ASCENDING)]
+
+    def save_checkpoint(self, checkpoint: Checkpoint):
+        db = self.db
+        parts = [
+            checkpoint.data[offset:offset + CHECKPOINT_PART_BYTES]
+            for offset in range(0, len(checkpoint.data), CHECKPOINT_PART_BYTES)
+        ] or [b'']
+        db.rank_checkpoints.delete_many({'seq': checkpoint.seq})
+        # Part 0 goes last, so a checkpoint is only found once it is complete
+        try:
+            db.rank_checkpoints.insert_many([
+                {'seq': checkpoint.seq, 'part': index, 'parts': len(parts), 't': checkpoint.timestamp, 'data': part}
+                for index, part in reversed(list(enumerate(parts)))
+            ])
+        except BulkWriteError as e:
+            # Another process saved the same checkpoint, built from the same events
+            if any(error.get('code') != 11000 for error in e.details.get('writeErrors', [])):
+                raise
+
+    def latest_checkpoint(self, until: Optional[datetime] = None) -> Optional[Checkpoint]:
+        db = self.db
+        query = {'part': 0}
+        if until is not None:
+            query['t'] = {'$lte': until}
+        for head in db.rank_checkpoints.find(query, {'data': 0}).sort('seq', DESCENDING).limit(3):
+            parts = list(db.rank_checkpoints.find({'seq': head['seq']}).sort('part', ASCENDING))
+            # Skip a checkpoint that is being replaced
+            if len(parts) == head['parts']:
+                return Checkpoint(head['seq'], head['t'], b''.join(bytes(part['data']) for part in parts))
+        return None
@@ -0,0 +1,400 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import bson
+from bson import ObjectId
+from .base import (
+    Checkpoint, HistoryEntry, HistoryEvent, Keyset, PlayerRepository, TEAM_SCOPE_PREFIX,
+    increment, project, scope_team
+)
+
+# Player fields stored in their own columns; the rest only live in the BSON document
+COLUMNS = ('name', 'team', 'position', 'overall_score', 'position_weighted_score')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    team TEXT NOT NULL,
+    position TEXT NOT NULL,
+    overall_score REAL,
+    position_weighted_score REAL,
+    doc BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS players_overall_score ON players (overall_score, id);
+CREATE INDEX IF NOT EXISTS players_name ON players (name, id);
+CREATE INDEX IF NOT EXISTS players_position ON players (position, overall_score, id);
+CREATE INDEX IF NOT EXISTS players_team ON players (team, overall_score, id);
+CREATE INDEX IF NOT EXISTS players_position_weighted ON players (position, position_weighted_score DESC, id);
+CREATE TABLE IF NOT EXISTS team_stats (
+    id TEXT PRIMARY KEY,
+    team TEXT,
+    count INTEGER NOT NULL DEFAULT 0,
+    doc BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rank_history (
+    seq INTEGER PRIMARY KEY,
+    ts INTEGER NOT NULL,
+    player BLOB NOT NULL,
+    score REAL,
+    rank INTEGER
+);
+CREATE INDEX IF NOT EXISTS rank_history_player ON rank_history (player, seq);
+CREATE TABLE IF NOT EXISTS rank_checkpoints (
+    seq INTEGER PRIMARY KEY,
+    ts INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+"""
+
+# History timestamps are stored as integer microseconds since the epoch
+EPOCH = datetime(1970, 1, 1)
+
+# SQLite caps the number of bound parameters per statement
+MAX_PARAMETERS = 900
+
+def _row(player_id: str, doc: Dict) -> Tuple:
+    """Row values of one player; the BSON document leaves out the _id held in the id column"""
+    body = {key: value for key, value in doc.items() if key != '_id'}
+    return (
+        player_id, doc.get('name'), doc.get('team'), doc.get('position'),
+        doc.get('overall_score'), doc.get('position_weighted_score'), bson.encode(body)
+    )
+
+def _micros(timestamp: datetime) -> int:
+    return (timestamp - EPOCH) // timedelta(microseconds=1)
+
+def _datetime(micros: int) -> datetime:
+    return EPOCH + timedelta(microseconds=micros)
+
+def _history_event(row: Tuple) -> HistoryEvent:
+    return HistoryEvent(row[0], _datetime(row[1]), ObjectId(row[2]), row[3], row[4])
+
+class SQLitePlayerRepository(PlayerRepository):
+    """
+    Players and aggregates in a SQLite database file
+
+    For single-host deployments and test runs without a MongoDB server.
+    The database runs in WAL mode, so readers never block the writer, and
+    every thread gets its own connection. Fields the API filters and sorts
+    on have their own indexed columns; the full document is stored as BSON
+    so it round-trips with the same types as MongoDB. Batches are written
+    with one executemany per transaction.
+
+    Name filters are case-insensitive for ASCII letters only, as with
+    SQLite's LIKE. History events are rows of rank_history numbered by
+    their rowid.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._pid = os.getpid()
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections inherited across fork() are never reused
+        if self._pid != os.getpid():
+            self._local = threading.local()
+            self._connections = []
+            self._connections_lock = threading.Lock()
+            self._pid = os.getpid()
+
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Run a write transaction, taking the write lock up front"""
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    @staticmethod
+    def _select(fields: Optional[Iterable[str]]) -> Tuple[str, Optional[Tuple[str, ...]]]:
+        """
+        Columns to read for fields
+
+        Returns:
+            Tuple of (select list, column fields), where column fields is
+            None when the BSON document has to be decoded
+        """
+        if fields is not None:
+            wanted = tuple(field for field in fields if field != '_id')
+            if all(field in COLUMNS for field in wanted):
+                return ', '.join(('id',) + wanted), wanted
+        return 'id, doc', None
+
+    @staticmethod
+    def _document(row: Tuple, columns: Optional[Tuple[str, ...]], fields: Optional[Iterable[str]]) -> Dict:
+        if columns is not None:
+            doc = dict(zip(columns, row[1:]))
+            doc['_id'] = ObjectId(row[0])
+            return doc
+        doc = bson.decode(row[1])
+        doc['_id'] = ObjectId(row[0])
+        return project(doc, fields) if fields is not None else doc
+
+    def _query(self, sql: str, params: Sequence, fields: Optional[Iterable[str]], batch_size: int = 1000) -> Iterator[Dict]:
+        select, columns = self._select(fields)
+        cursor = self._connect().execute(sql.format(select=select), params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield self._document(row, columns, fields)
+
+    def insert(self, doc: Dict) -> ObjectId:
+        doc.setdefault('_id', ObjectId())
+        with self._transaction() as conn:
+            conn.execute('INSERT INTO players VALUES (?, ?, ?, ?, ?, ?, ?)', _row(str(doc['_id']), doc))
+        return doc['_id']
+
+    def insert_many(self, docs: List[Dict]) -> Dict[int, str]:
+        for doc in docs:
+            doc.setdefault('_id', ObjectId())
+        try:
+            with self._transaction() as conn:
+                conn.executemany(
+                    'INSERT INTO players VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    [_row(str(doc['_id']), doc) for doc in docs]
+                )
+            return {}
+        except sqlite3.IntegrityError:
+            pass
+
+        # Some row was rejected: store the rest one by one to find out which
+        errors = {}
+        with self._transaction() as conn:
+            for index, doc in enumerate(docs):
+                try:
+                    conn.execute('INSERT INTO players VALUES (?, ?, ?, ?, ?, ?, ?)', _row(str(doc['_id']), doc))
+                except sqlite3.IntegrityError as e:
+                    errors[index] = str(e)
+        return errors
+
+    def get(self, player_id: ObjectId, fields: Optional[Iterable[str]] = None) -> Optional[Dict]:
+        docs = list(self._query('SELECT {select} FROM players WHERE id = ?', (str(player_id),), fields))
+        return docs[0] if docs else None
+
+    def get_many(self, player_ids: Sequence[ObjectId], fields: Optional[Iterable[str]] = None) -> List[Dict]:
+        ids = [str(player_id) for player_id in player_ids]
+        docs = []
+        for start in range(0, len(ids), MAX_PARAMETERS):
+            chunk = ids[start:start + MAX_PARAMETERS]
+            sql = f"SELECT {{select}} FROM players WHERE id IN ({', '.join('?' * len(chunk))})"
+            docs.extend(self._query(sql, chunk, fields))
+        return docs
+
+    def find(
+        self,
+        filters: Optional[Dict] = None,
+        sort_by: str = 'overall_score',
+        descending: bool = True,
+        after: Optional[Keyset] = None,
+        limit: Optional[int] = None,
+        fields: Optional[Iterable[str]] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Dict]:
+        if sort_by not in COLUMNS:
+            raise ValueError(f"Cannot sort on {sort_by}")
+        filters = filters or {}
+        where, params = [], []
+        for field in ('position', 'team'):
+            if filters.get(field):
+                where.append(f'{field} = ?')
+                params.append(filters[field])
+        if filters.get('name'):
+            escaped = filters['name'].replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            where.append("name LIKE ? ESCAPE '\\'")
+            params.append(f'%{escaped}%')
+        if after is not None:
+            # Everything strictly after the last (value, _id) seen
+            where.append(f"({sort_by}, id) {'<' if descending else '>'} (?, ?)")
+            params.extend([after[0], str(after[1])])
+
+        direction = 'DESC' if descending else 'ASC'
+        sql = 'SELECT {select} FROM players'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += f' ORDER BY {sort_by} {direction}, id {direction}'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return self._query(sql, params, fields, batch_size)
+
+    def scan(self, fields: Optional[Iterable[str]] = None, batch_size: int = 10000) -> Iterator[Dict]:
+        return self._query('SELECT {select} FROM players', (), fields, batch_size)
+
+    def update(self, player_id: ObjectId, values: Dict) -> Optional[Dict]:
+        with self._transaction() as conn:
+            row = conn.execute('SELECT doc FROM players WHERE id = ?', (str(player_id),)).fetchone()
+            if row is None:
+                return None
+            doc = bson.decode(row[0])
+            doc.update(values)
+            doc['_id'] = player_id
+            conn.execute(
+                'UPDATE players SET name = ?, team = ?, position = ?, overall_score = ?, '
+                'position_weighted_score = ?, doc = ? WHERE id = ?',
+                _row(str(player_id), doc)[1:] + (str(player_id),)
+            )
+        # Round-trip through BSON, as a stored document would
+        return self.get(player_id)
+
+    def delete(self, player_id: ObjectId) -> Optional[Dict]:
+        with self._transaction() as conn:
+            row = conn.execute('SELECT doc FROM players WHERE id = ?', (str(player_id),)).fetchone()
+            if row is None:
+                return None
+            conn.execute('DELETE FROM players WHERE id = ?', (str(player_id),))
+        doc = bson.decode(row[0])
+        doc['_id'] = player_id
+        return doc
+
+    def count(self) -> int:
+        return self._connect().execute('SELECT count(*) FROM players').fetchone()[0]
+
+    def position_leaderboard(self, position: str, limit: int) -> List[Dict]:
+        return list(self._query(
+            'SELECT {select} FROM players WHERE position = ? AND position_weighted_score >= 0 '
+            'ORDER BY position_weighted_score DESC, id ASC LIMIT ?',
+            (position, limit),
+            ('name', 'team', 'position_weighted_score')
+        ))
+
+    @staticmethod
+    def _aggregate(row: Tuple, fields: Optional[Iterable[str]] = None) -> Dict:
+        doc = bson.decode(row[1])
+        doc['_id'] = row[0]
+        if fields is not None:
+            doc = {key: doc[key] for key in ('_id', *fields) if key in doc}
+        return doc
+
+    def get_aggregates(self, scopes: Iterable[str], fields: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        scopes = list(scopes)
+        rows = self._connect().execute(
+            f"SELECT id, doc FROM team_stats WHERE id IN ({', '.join('?' * len(scopes))})",
+            scopes
+        ).fetchall()
+        return {row[0]: self._aggregate(row, fields) for row in rows}
+
+    def team_aggregates(self) -> List[Dict]:
+        rows = self._connect().execute(
+            'SELECT id, doc FROM team_stats WHERE id LIKE ? AND count > 0 ORDER BY team',
+            (f'{TEAM_SCOPE_PREFIX}%',)
+        ).fetchall()
+        return [self._aggregate(row) for row in rows]
+
+    def increment_aggregates(self, increments: Dict[str, Dict[str, float]]):
+        if not increments:
+            return
+        scopes = list(increments)
+        with self._transaction() as conn:
+            rows = conn.execute(
+                f"SELECT id, doc FROM team_stats WHERE id IN ({', '.join('?' * len(scopes))})",
+                scopes
+            ).fetchall()
+            docs = {row[0]: bson.decode(row[1]) for row in rows}
+            for scope, inc in increments.items():
+                doc = docs.setdefault(scope, {'team': scope_team(scope)})
+                increment(doc, inc)
+            conn.executemany(
+                'INSERT OR REPLACE INTO team_stats VALUES (?, ?, ?, ?)',
+                [(scope, doc.get('team'), doc.get('count', 0), bson.encode(doc)) for scope, doc in docs.items()]
+            )
+
+    def replace_aggregates(self, aggregates: Dict[str, Dict]):
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM team_stats')
+            conn.executemany(
+                'INSERT INTO team_stats VALUES (?, ?, ?, ?)',
+                [
+                    (scope, aggregate.get('team'), aggregate.get('count', 0),
+                     bson.encode({key: value for key, value in aggregate.items() if key != '_id'}))
+                    for scope, aggregate in aggregates.items()
+                ]
+            )
+
+    def append_history(self, entries: Sequence[HistoryEntry]) -> int:
+        with self._transaction() as conn:
+            conn.executemany(
+                'INSERT INTO rank_history (ts, player, score, rank) VALUES (?, ?, ?, ?)',
+                [(_micros(timestamp), player_id.binary, score, rank) for timestamp, player_id, score, rank in entries]
+            )
+            return conn.execute('SELECT coalesce(max(seq), 0) FROM rank_history').fetchone()[0]
+
+    def last_history_seq(self) -> int:
+        return self._connect().execute('SELECT coalesce(max(seq), 0) FROM rank_history').fetchone()[0]
+
+    def history_events(self, after_seq: int, through_seq: Optional[int] = None) -> Iterator[HistoryEvent]:
+        sql = 'SELECT seq, ts, player, score, rank FROM rank_history WHERE seq > ?'
+        params = [after_seq]
+        if through_seq is not None:
+            sql += ' AND seq <= ?'
+            params.append(through_seq)
+        cursor = self._connect().execute(sql + ' ORDER BY seq', params)
+        while True:
+            rows = cursor.fetchmany(5000)
+            if not rows:
+                return
+            yield from map(_history_event, rows)
+
+    def player_history(
+        self,
+        player_id: ObjectId,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[HistoryEvent]:
+        sql = 'SELECT seq, ts, player, score, rank FROM rank_history WHERE player = ?'
+        params = [player_id.binary]
+        if since is not None:
+            sql += ' AND ts >= ?'
+            params.append(_micros(since))
+        if until is not None:
+            sql += ' AND ts <= ?'
+            params.append(_micros(until))
+        return [_history_event(row) for row in self._connect().execute(sql + ' ORDER BY seq', params)]
+
+    def save_checkpoint(self, checkpoint: Checkpoint):
+        with self._transaction() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO rank_checkpoints VALUES (?, ?, ?)',
+                (checkpoint.seq, _micros(checkpoint.timestamp), checkpoint.data)
+            )
+
+    def latest_checkpoint(self, until: Optional[datetime] = None) -> Optional[Checkpoint]:
+        sql = 'SELECT seq, ts, data FROM rank_checkpoints'
+        params = []
+        if until is not None:
+            sql += ' WHERE ts <= ?'
+            params.append(_micros(until))
+        row = self._connect().execute(sql + ' ORDER BY seq DESC LIMIT 1', params).fetchone()
+        return Checkpoint(row[0], _datetime(row[1]), bytes(row[2])) if row else None
+
+    def close(self):
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
@@ -0,0 +1,52 @@
+from flask import Blueprint, request, jsonify
+from http import HTTPStatus
+from ..services.lineup_service import lineup_service, DEFAULT_SLOTS
+
+lineups_bp = Blueprint('lineups', __name__, url_prefix='/api/lineups')
+
+def _optional_number(data, field, kind):
+    """Read an optional numeric body field as kind (int or float)"""
+    value = data.get(field)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{field} must be a number")
+    if kind is int and value != int(value):
+        raise ValueError(f"{field} must be an integer")
+    return kind(value)
+
+@lineups_bp.route('/optimize', methods=['POST'])
+def optimize_lineup():
+    """Find the highest-scoring lineup under roster constraints"""
+    try:
+        data = request.get_json(silent=True)
+        if data is None:
+            data = {}
+        if not isinstance(data, dict):
+            raise ValueError("Body must be a JSON object")
+        
+        slots = data.get('slots', list(DEFAULT_SLOTS))
+        exclude = data.get('exclude', [])
+        team = data.get('team')
+        if not isinstance(slots, list) or not all(isinstance(slot, str) for slot in slots):
+            raise ValueError("slots must be a list of positions")
+        if not isinstance(exclude, list) or not all(isinstance(player_id, str) for player_id in exclude):
+            raise ValueError("exclude must be a list of player IDs")
+        if team is not None and not isinstance(team, str):
+            raise ValueError("team must be a string")
+        
+        result = lineup_service.optimize(
+            slots=[slot.upper() for slot in slots],
+            team=team,
+            exclude=exclude,
+            min_defense=_optional_number(data, 'min_defense', float),
+            max_per_team=_optional_number(data, 'max_per_team', int)
+        )
+        if result is None:
+            return jsonify({'error': 'No lineup satisfies the constraints'}), HTTPStatus.UNPROCESSABLE_ENTITY
+        return jsonify(result), HTTPStatus.OK
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), HTTPStatus.BAD_REQUEST
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), HTTPStatus.INTERNAL_SERVER_ERROR
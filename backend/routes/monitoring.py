@@ -0,0 +1,38 @@
+from flask import Blueprint, Response, jsonify
+from http import HTTPStatus
+from ..db import get_pool_stats
+from ..utils.cache import response_cache
+from ..utils.metrics import metrics, render_gauges
+
+monitoring_bp = Blueprint('monitoring', __name__, url_prefix='/api')
+
+PROMETHEUS_MIMETYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+@monitoring_bp.route('/health', methods=['GET'])
+def health_check():
+    """Report liveness, connection pool and response cache statistics"""
+    return jsonify({
+        'status': 'healthy',
+        'message': 'Basketball Player Ranking API is running',
+        'db_pool': get_pool_stats(),
+        'response_cache': response_cache.stats()
+    }), HTTPStatus.OK
+
+@monitoring_bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Expose latency histograms, pool and cache statistics for Prometheus"""
+    pool = get_pool_stats()
+    cache = response_cache.stats()
+    gauges = render_gauges({
+        'mongodb_pool_connections_open': ('gauge', "Open pooled MongoDB connections", pool['connections_open']),
+        'mongodb_pool_checked_out': ('gauge', "MongoDB connections checked out", pool['checked_out']),
+        'mongodb_pool_max_size': ('gauge', "MongoDB connection pool size limit", pool['max_pool_size']),
+        'mongodb_pool_checkouts_total': ('counter', "MongoDB connection checkouts", pool['checkouts']),
+        'mongodb_pool_wait_seconds_total': ('counter', "Time spent waiting for a pooled connection",
+                                            pool['wait_time_total_ms'] / 1000),
+        'response_cache_entries': ('gauge', "Cached responses", cache['entries']),
+        'response_cache_hits_total': ('counter', "Response cache hits", cache['hits']),
+        'response_cache_misses_total': ('counter', "Response cache misses", cache['misses']),
+        'response_cache_evictions_total': ('counter', "Response cache evictions", cache['evictions'])
+    })
+    return Response(metrics.render(gauges), mimetype=PROMETHEUS_MIMETYPE), HTTPStatus.OK
@@ -1,16 +1,48 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from http import HTTPStatus
+from ..services.history_service import history_service, parse_timestamp
 from ..services.player_service import PlayerService
+from ..services.ranking_service import ranking_service
+from ..services.similarity_service import similarity_service
+from ..services.search_service import search_service
+from ..services.stats_service import stats_service
 from ..utils.validators import validate_player_data, format_validation_errors
+from ..utils.ingest import parse_players_payload
+from ..utils.export import EXPORT_FIELDS, EXPORT_MIMETYPES, export_chunks
+from ..utils.cache import cached, response_cache, player_tag, PlayerCacheInvalidator, PLAYER_LIST_TAG
 from marshmallow import ValidationError
+from bson import ObjectId
 from bson.errors import InvalidId
 from mongoengine.errors import DoesNotExist, ValidationError as MongoValidationError
 
 # Create blueprint and service instance
 players_bp = Blueprint('players', __name__, url_prefix='/api/players')
-player_service = PlayerService()
+player_service = PlayerService(listeners=[
+    ranking_service,
+    history_service,
+    similarity_service,
+    stats_service,
+    search_service,
+    PlayerCacheInvalidator(response_cache)
+])
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+def _wants_stream():
+    """Whether the client asked for a streamed NDJSON listing"""
+    if request.args.get('stream', '').lower() in ('1', 'true'):
+        return True
+    best = request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+def _ndjson_rows(rows):
+    """Encode player dicts one JSON document per line"""
+    dumps = current_app.json.dumps
+    for row in rows:
+        yield dumps(row) + '\n'
 
 @players_bp.route('', methods=['GET', 'POST'])
+@cached(lambda: [PLAYER_LIST_TAG])
 def list_or_create_players():
     """List all players or create a new one"""
     if request.method == 'POST':
@@ -19,22 +51,21 @@ def list_or_create_players():
             new_player = player_service.create_player(player_data)
             return jsonify(new_player.dict()), HTTPStatus.CREATED
         except ValidationError as e:
-            return jsonify({'errors': format_validation_errors(e)}), HTTPStatus.BAD_REQUEST
+            return jsonify({'errors': format_validation_errors(e.messages)}), HTTPStatus.BAD_REQUEST
         except Exception as e:
             import traceback
             print(f"Error creating player: {e}\n{traceback.format_exc()}")
             return jsonify({'error': str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
     
     try:
-        players = player_service.list_players()
-        return jsonify([p.dict() for p in players]), HTTPStatus.OK
-    except Exception as e:
-        return jsonify({'error': str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
-    """List all players with pagination and filtering"""
-    try:
+        # Fetch a batch of players by ID with one query instead of a page
+        if 'ids' in request.args:
+            ids = [player_id for player_id in request.args['ids'].split(',') if player_id]
+            return jsonify(player_service.get_players(ids)), HTTPStatus.OK
+        
         # Get query parameters
-        page = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 20))
+        cursor = request.args.get('cursor')
         sort_by = request.args.get('sort_by', 'overall_score')
         order = request.args.get('order', 'desc')
         
@@ -47,28 +78,144 @@ def list_or_create_players():
         if 'name' in request.args:
             filters['name'] = request.args['name']
 
+        # Stream every matching row as NDJSON instead of building one page
+        if _wants_stream():
+            players = player_service.iter_players(
+                sort_by=sort_by,
+                order=order,
+                filters=filters,
+                batch_size=current_app.config.get('STREAM_BATCH_SIZE', 1000),
+                as_rows=True
+            )
+            return Response(
+                stream_with_context(_ndjson_rows(players)),
+                mimetype=NDJSON_MIMETYPE
+            )
+
         # Get players from service
         result = player_service.list_players(
-            page=page,
             per_page=per_page,
+            cursor=cursor,
             sort_by=sort_by,
             order=order,
-            filters=filters
+            filters=filters,
+            as_rows=True
         )
         
-        return jsonify(result), HTTPStatus.OK
+        return jsonify({
+            'players': result['players'],
+            'next_cursor': result['next_cursor']
+        }), HTTPStatus.OK
 
     except ValueError as e:
         return jsonify({'error': str(e)}), HTTPStatus.BAD_REQUEST
     except Exception as e:
         return jsonify({'error': 'Internal server error'}), HTTPStatus.INTERNAL_SERVER_ERROR
 
+@players_bp.route('/bulk', methods=['POST'])
+def bulk_create_players():
+    """Create players from a JSON array, NDJSON or CSV body"""
+    try:
+        records, parse_errors = parse_players_payload(
+            request.get_data(as_text=True),
+            request.mimetype
+        )
+        result = player_service.create_players(
+            records,
+            chunk_size=current_app.config.get('BULK_INSERT_CHUNK_SIZE', 5000)
+        )
+        
+        # Parse failures are more useful to the client than schema errors
+        errors = {**result['errors'], **parse_errors}
+        inserted = sum(1 for player_id in result['inserted_ids'] if player_id)
+        
+        if not errors:
+            status = HTTPStatus.CREATED
+        elif inserted:
+            status = HTTPStatus.MULTI_STATUS
+        else:
+            status = HTTPStatus.BAD_REQUEST
+        
+        return jsonify({
+            'inserted': inserted,
+            'failed': len(errors),
+            'ids': result['inserted_ids'],
+            'errors': [
+                {'index': index, 'errors': format_validation_errors(errors[index])}
+                for index in sorted(errors)
+            ]
+        }), status
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), HTTPStatus.BAD_REQUEST
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@players_bp.route('/compare', methods=['POST'])
+def compare_players():
+    """Compare players attribute by attribute, fetched with one query"""
+    try:
+        data = request.get_json(silent=True)
+        ids = data.get('ids') if isinstance(data, dict) else None
+        if not isinstance(ids, list):
+            raise ValueError("ids must be a list of player IDs")
+        
+        return jsonify(player_service.compare_players(ids)), HTTPStatus.OK
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), HTTPStatus.BAD_REQUEST
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@players_bp.route('/export', methods=['GET'])
+def export_players():
+    """Stream every player as CSV, Parquet or an Arrow IPC stream, one batch at a time"""
+    try:
+        export_format = request.args.get('format', 'csv').lower()
+        batch_size = current_app.config.get('EXPORT_BATCH_SIZE', 10000)
+        chunks = export_chunks(
+            player_service.repository.scan(EXPORT_FIELDS, batch_size=batch_size),
+            export_format,
+            batch_size=batch_size
+        )
+        return Response(
+            stream_with_context(chunks),
+            mimetype=EXPORT_MIMETYPES[export_format],
+            headers={'Content-Disposition': f'attachment; filename=players.{export_format}'}
+        )
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), HTTPStatus.BAD_REQUEST
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), HTTPStatus.NOT_IMPLEMENTED
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@players_bp.route('/search', methods=['GET'])
+def search_players():
+    """Search players by name or team, as typed or with the full-text index"""
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            raise ValueError("q is required")
+        limit = int(request.args.get('limit', 10))
+        if not 1 <= limit <= 50:
+            raise ValueError("limit must be between 1 and 50")
+        
+        result = search_service.search(query, limit=limit, mode=request.args.get('mode', 'autocomplete'))
+        return jsonify(result), HTTPStatus.OK
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), HTTPStatus.BAD_REQUEST
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), HTTPStatus.INTERNAL_SERVER_ERROR
+
 @players_bp.route('/<player_id>', methods=['GET'])
+@cached(lambda player_id: [player_tag(player_id)])
 def get_player(player_id):
     """Get a single player by ID"""
     try:
-        player = player_service.get_player(player_id)
-        return jsonify(player.to_dict()), HTTPStatus.OK
+        return jsonify(player_service.get_player(player_id, as_rows=True)), HTTPStatus.OK
     
     except InvalidId:
         return jsonify({'error': 'Invalid player ID format'}), HTTPStatus.BAD_REQUEST
@@ -77,6 +224,82 @@ def get_player(player_id):
     except Exception as e:
         return jsonify({'error': 'Internal server error'}), HTTPStatus.INTERNAL_SERVER_ERROR
 
+@players_bp.route('/<player_id>/rank', methods=['GET'])
+def get_player_rank(player_id):
+    """Get a player's overall rank"""
+    if not ObjectId.is_valid(player_id):
+        return jsonify({'error': 'Invalid player ID format'}), HTTPStatus.BAD_REQUEST
+    try:
+        result = ranking_service.player_rank(player_id)
+        if result is None:
+            return jsonify({'error': 'Player not found'}), HTTPStatus.NOT_FOUND
+        return jsonify(result), HTTPStatus.OK
+    
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@players_bp.route('/<player_id>/history', methods=['GET'])
+def get_player_history(player_id):
+    """Get a player's overall score and rank after every change, oldest first"""
+    if not ObjectId.is_valid(player_id):
+        return jsonify({'error': 'Invalid player ID format'}), HTTPStatus.BAD_REQUEST
+    try:
+        since = request.args.get('since')
+        until = request.args.get('until')
+        result = history_service.player_history(
+            player_id,
+            since=parse_timestamp(since) if since else None,
+            until=parse_timestamp(until) if until else None
+        )
+        if result is None:
+            return jsonify({'error': 'Player not found'}), HTTPStatus.NOT_FOUND
+        return jsonify(result), HTTPStatus.OK
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), HTTPStatus.BAD_REQUEST
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@players_bp.route('/<player_id>/percentiles', methods=['GET'])
+def get_player_percentiles(player_id):
+    """Get a player's percentile rank in every attribute, league-wide and by position"""
+    if not ObjectId.is_valid(player_id):
+        return jsonify({'error': 'Invalid player ID format'}), HTTPStatus.BAD_REQUEST
+    try:
+        result = stats_service.player_percentiles(player_id)
+        if result is None:
+            return jsonify({'error': 'Player not found'}), HTTPStatus.NOT_FOUND
+        return jsonify(result), HTTPStatus.OK
+    
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@players_bp.route('/<player_id>/similar', methods=['GET'])
+def get_similar_players(player_id):
+    """Find players with the most similar offense and defense stats"""
+    if not ObjectId.is_valid(player_id):
+        return jsonify({'error': 'Invalid player ID format'}), HTTPStatus.BAD_REQUEST
+    try:
+        k = int(request.args.get('k', 10))
+        if not 1 <= k <= 100:
+            raise ValueError("k must be between 1 and 100")
+        position = request.args.get('position')
+        
+        result = similarity_service.similar_players(
+            player_id,
+            k=k,
+            metric=request.args.get('metric', 'cosine'),
+            position=position.upper() if position else None
+        )
+        if result is None:
+            return jsonify({'error': 'Player not found'}), HTTPStatus.NOT_FOUND
+        return jsonify(result), HTTPStatus.OK
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), HTTPStatus.BAD_REQUEST
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), HTTPStatus.INTERNAL_SERVER_ERROR
+
 @players_bp.route('/api/players', methods=['POST'])
 def create_player():
     """Create a new player"""
@@ -97,7 +320,7 @@ def create_player():
     except Exception as e:
         return jsonify({'error': 'Internal server error'}), HTTPStatus.INTERNAL_SERVER_ERROR
 
-@players_bp.route('/api/players/<player_id>', methods=['PUT'])
+@players_bp.route('/<player_id>', methods=['PUT'])
 def update_player(player_id):
     """Update an existing player"""
     try:
@@ -108,7 +331,7 @@ def update_player(player_id):
 
         # Update player using service
         player = player_service.update_player(player_id, player_data)
-        return jsonify(player.to_dict()), HTTPStatus.OK
+        return jsonify(player.dict()), HTTPStatus.OK
 
     except InvalidId:
         return jsonify({'error': 'Invalid player ID format'}), HTTPStatus.BAD_REQUEST
@@ -121,7 +344,7 @@ def update_player(player_id):
     except Exception as e:
         return jsonify({'error': 'Internal server error'}), HTTPStatus.INTERNAL_SERVER_ERROR
 
-@players_bp.route('/api/players/<player_id>', methods=['DELETE'])
+@players_bp.route('/<player_id>', methods=['DELETE'])
 def delete_player(player_id):
     """Delete a player"""
     try:
@@ -0,0 +1,41 @@
+from flask import Blueprint, request, jsonify
+from http import HTTPStatus
+from ..services.history_service import history_service, parse_timestamp
+from ..services.ranking_service import ranking_service
+
+rankings_bp = Blueprint('rankings', __name__, url_prefix='/api/rankings')
+
+MAX_LIMIT = 1000
+
+@rankings_bp.route('', methods=['GET'])
+def get_rankings():
+    """Get the top players by overall score, now or as of a past time"""
+    try:
+        limit = int(request.args.get('limit', 50))
+        if not 1 <= limit <= MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+        
+        as_of = request.args.get('as_of')
+        if as_of:
+            return jsonify(history_service.leaderboard_as_of(parse_timestamp(as_of), limit)), HTTPStatus.OK
+        return jsonify(ranking_service.top_players(limit)), HTTPStatus.OK
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), HTTPStatus.BAD_REQUEST
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@rankings_bp.route('/<position>', methods=['GET'])
+def get_position_rankings(position):
+    """Get the top players at a position by position-weighted score"""
+    try:
+        limit = int(request.args.get('limit', 50))
+        if not 1 <= limit <= MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+        
+        return jsonify(ranking_service.position_leaderboard(position.upper(), limit)), HTTPStatus.OK
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), HTTPStatus.BAD_REQUEST
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), HTTPStatus.INTERNAL_SERVER_ERROR
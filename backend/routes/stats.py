@@ -0,0 +1,33 @@
+from flask import Blueprint, jsonify, request
+from http import HTTPStatus
+from ..services.stats_service import stats_service
+
+stats_bp = Blueprint('stats', __name__, url_prefix='/api/stats')
+
+@stats_bp.route('/overview', methods=['GET'])
+def get_overview():
+    """Get league-wide player statistics"""
+    try:
+        return jsonify(stats_service.overview()), HTTPStatus.OK
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@stats_bp.route('/teams', methods=['GET'])
+def get_team_stats():
+    """Get per-team player statistics"""
+    try:
+        return jsonify({'teams': stats_service.teams()}), HTTPStatus.OK
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+@stats_bp.route('/distributions', methods=['GET'])
+def get_distributions():
+    """Get per-attribute value histograms, optionally for one position"""
+    try:
+        position = request.args.get('position')
+        result = stats_service.distributions(position.upper() if position else None)
+        return jsonify(result), HTTPStatus.OK
+    except ValueError as e:
+        return jsonify({'error': str(e)}), HTTPStatus.BAD_REQUEST
+    except Exception as e:
+        return jsonify({'error': 'Internal server error'}), HTTPStatus.INTERNAL_SERVER_ERROR
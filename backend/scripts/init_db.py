@@ -1,24 +1,63 @@
-from mongoengine import connect, disconnect
-from backend.models.player import Player
-from backend.services.player_service import PlayerService
+from pymongo import UpdateOne
+from backend.db import get_db
+from backend.services.scoring_service import ScoringService
+from backend.services.stats_service import StatsService
 
-def init_db(db_url="mongodb://localhost:27017/basketball_rankings"):
+def init_db(db=None):
     """Initialize the database with indexes and initial setup"""
-    # Ensure we're disconnected first
-    disconnect()
-    
-    # Connect to database
-    connect(host=db_url)
+    # Use the process-wide pooled client unless a database is given
+    db = db if db is not None else get_db()
+    players = db.players
     
     # Create text index on name and team fields for text search
-    Player._get_collection().create_index([("name", "text"), ("team", "text")])
+    players.create_index([("name", "text"), ("team", "text")])
+    
+    # Create other necessary indexes; _id is the keyset pagination tie-breaker
+    players.create_index([("overall_score", -1), ("_id", -1)])  # For sorting
+    players.create_index([("position", 1), ("overall_score", -1), ("_id", -1)])  # For filtering
+    players.create_index([("team", 1), ("overall_score", -1), ("_id", -1)])      # For filtering
+    
+    # Per-position leaderboards; name and team make the leaderboard query covered
+    players.create_index(
+        [("position", 1), ("position_weighted_score", -1), ("_id", 1), ("name", 1), ("team", 1)],
+        name="position_weighted_leaderboard"
+    )
+    backfill_position_weighted_scores(db)
+    
+    # Rank history: one player's events in seq order, and checkpoint lookups
+    # by seq and by the newest first part before a time
+    db.rank_history.create_index([("p", 1), ("_id", 1)])
+    db.rank_checkpoints.create_index([("seq", 1), ("part", 1)], unique=True)
+    db.rank_checkpoints.create_index([("part", 1), ("seq", -1)])
     
-    # Create other necessary indexes
-    Player._get_collection().create_index([("overall_score", -1)])  # For sorting
-    Player._get_collection().create_index([("position", 1)])        # For filtering
-    Player._get_collection().create_index([("team", 1)])           # For filtering
+    # League and team aggregates are maintained incrementally from here on
+    StatsService().rebuild(db)
     
     print("Database initialization completed successfully.")
 
+def backfill_position_weighted_scores(db, batch_size=10000):
+    """Store position_weighted_score on players written before it was persisted"""
+    cursor = db.players.find(
+        {'position_weighted_score': {'$exists': False}},
+        {'position': 1, 'offense': 1, 'defense': 1}
+    ).batch_size(batch_size)
+    
+    batch = []
+    for doc in cursor:
+        batch.append(doc)
+        if len(batch) == batch_size:
+            _write_position_weighted_scores(db, batch)
+            batch = []
+    if batch:
+        _write_position_weighted_scores(db, batch)
+
+def _write_position_weighted_scores(db, docs):
+    matrix = ScoringService.stats_matrix(docs)
+    _, weighted = ScoringService.score_batch(matrix, [doc['position'] for doc in docs])
+    db.players.bulk_write([
+        UpdateOne({'_id': doc['_id']}, {'$set': {'position_weighted_score': score}})
+        for doc, score in zip(docs, weighted.tolist())
+    ], ordered=False)
+
 if __name__ == "__main__":
     init_db()
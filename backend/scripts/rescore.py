@@ -0,0 +1,217 @@
+"""
+Rescore every stored player with the current ScoringService formulas
+
+Splits the players into partitions of consecutive _ids, scores each
+partition in batches on a process pool and writes the changed scores
+back with unordered bulk writes. Finished partitions are recorded in the
+jobs collection, so running the command again after an interruption
+picks up the partitions still left; --restart starts over.
+
+API processes keep their in-process rankings and caches until they are
+restarted.
+
+Usage:
+    python -m backend.scripts.rescore [--workers 4] [--chunk-size 10000] [--batch-size 1000] [--restart]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import ASCENDING, UpdateOne
+from backend.db import get_client, get_db
+from backend.repositories.mongo import MongoPlayerRepository
+from backend.services.history_service import HistoryService
+from backend.services.scoring_service import ScoringService
+from backend.services.stats_service import StatsService
+
+JOB_ID = 'rescore'
+
+SCORE_PROJECTION = {
+    'position': 1, 'offense': 1, 'defense': 1, 'overall_score': 1, 'position_weighted_score': 1, 'updated_at': 1
+}
+
+def partition_bounds(db, chunk_size: int) -> List[ObjectId]:
+    """First _id of every chunk_size players in _id order, read from the _id index alone"""
+    cursor = db.players.find({}, {'_id': 1}).sort('_id', ASCENDING).batch_size(chunk_size)
+    return [doc['_id'] for index, doc in enumerate(cursor) if index % chunk_size == 0]
+
+def rescore_partition(db, lower: Optional[ObjectId], upper: Optional[ObjectId], batch_size: int = 1000) -> Tuple[int, int]:
+    """
+    Rescore the players with lower <= _id < upper
+    
+    Args:
+        db: MongoDB database
+        lower: First _id of the partition, or None for no lower bound
+        upper: First _id after the partition, or None for no upper bound
+        batch_size: Players scored and written per bulk write
+        
+    Returns:
+        Tuple of (players read, players whose scores changed)
+    """
+    bounds = {}
+    if lower is not None:
+        bounds['$gte'] = lower
+    if upper is not None:
+        bounds['$lt'] = upper
+    cursor = db.players.find({'_id': bounds} if bounds else {}, SCORE_PROJECTION).batch_size(batch_size)
+    
+    scanned = changed = 0
+    batch = []
+    for doc in cursor:
+        batch.append(doc)
+        if len(batch) == batch_size:
+            changed += _rescore_batch(db, batch)
+            scanned += len(batch)
+            batch = []
+    if batch:
+        changed += _rescore_batch(db, batch)
+        scanned += len(batch)
+    return scanned, changed
+
+def _rescore_batch(db, docs: List[Dict]) -> int:
+    matrix = ScoringService.stats_matrix(docs)
+    overall, weighted = ScoringService.score_batch(matrix, [doc['position'] for doc in docs])
+    
+    updates = []
+    stale = {}
+    for doc, score, weighted_score in zip(docs, overall.tolist(), weighted.tolist()):
+        if doc.get('overall_score') == score and doc.get('position_weighted_score') == weighted_score:
+            continue
+        # A player edited since it was read keeps the scores its edit wrote
+        updates.append(UpdateOne(
+            {'_id': doc['_id'], 'updated_at': doc.get('updated_at')},
+            {'$set': {'overall_score': score, 'position_weighted_score': weighted_score}}
+        ))
+        stale[doc['_id']] = (doc, score)
+    if not updates:
+        return 0
+    
+    result = db.players.bulk_write(updates, ordered=False)
+    if result.matched_count < len(updates):
+        for edited in db.players.find({'_id': {'$in': list(stale)}}, {'updated_at': 1}):
+            if edited.get('updated_at') != stale[edited['_id']][0].get('updated_at'):
+                del stale[edited['_id']]
+    
+    # Rank history gets the new scores; ranks are not known here
+    if stale:
+        timestamp = datetime.utcnow()
+        MongoPlayerRepository(db).append_history([
+            (timestamp, player_id, score, None) for player_id, (doc, score) in stale.items()
+        ])
+    return len(stale)
+
+def _run_partition(db_name: str, lower: Optional[ObjectId], upper: Optional[ObjectId], batch_size: int) -> Tuple[int, int]:
+    # Each worker process connects on first use with the DB_* environment
+    return rescore_partition(get_client()[db_name], lower, upper, batch_size)
+
+def rescore(
+    db=None,
+    workers: Optional[int] = None,
+    chunk_size: int = 10000,
+    batch_size: int = 1000,
+    restart: bool = False,
+    report: Optional[Callable[[str], None]] = print
+) -> Dict:
+    """
+    Rescore every player, resuming an interrupted run unless restart is set
+    
+    Args:
+        db: MongoDB database; defaults to get_db()
+        workers: Worker processes; defaults to the CPU count, and 0 runs
+            every partition in this process
+        chunk_size: Players per partition
+        batch_size: Players scored and written per bulk write
+        restart: Discard the progress of an interrupted run
+        report: Called with a progress line after every partition
+        
+    Returns:
+        Dictionary with the partition count, the players read and changed
+        by this run, its duration and its rate in rows per second
+    """
+    db = db if db is not None else get_db()
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    
+    job = db.jobs.find_one({'_id': JOB_ID})
+    if job is None or job.get('finished_at') is not None or restart:
+        job = {
+            '_id': JOB_ID,
+            'bounds': partition_bounds(db, chunk_size),
+            'done': [],
+            'started_at': datetime.utcnow(),
+            'finished_at': None
+        }
+        db.jobs.replace_one({'_id': JOB_ID}, job, upsert=True)
+    bounds = job['bounds']
+    done = set(job['done'])
+    pending = [index for index in range(len(bounds)) if index not in done]
+
+    def partition(index: int):
+        # The first and last partitions are open, so players added since
+        # the bounds were taken are still covered
+        return (
+            bounds[index] if index else None,
+            bounds[index + 1] if index + 1 < len(bounds) else None
+        )
+    
+    scanned = changed = 0
+    start = time.perf_counter()
+
+    def finished(index: int, result: Tuple[int, int]):
+        nonlocal scanned, changed
+        scanned += result[0]
+        changed += result[1]
+        done.add(index)
+        db.jobs.update_one({'_id': JOB_ID}, {'$addToSet': {'done': index}})
+        if report is not None:
+            rate = scanned / max(time.perf_counter() - start, 1e-9)
+            report(f"{len(done)}/{len(bounds)} partitions, {scanned:,} players, {changed:,} changed, {rate:,.0f} rows/s")
+    
+    if workers == 0:
+        for index in pending:
+            finished(index, rescore_partition(db, *partition(index), batch_size))
+    elif pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_run_partition, db.name, *partition(index), batch_size): index
+                for index in pending
+            }
+            for future in as_completed(futures):
+                finished(futures[future], future.result())
+    elapsed = time.perf_counter() - start
+    
+    # Aggregates sum overall scores, and the history needs its checkpoints
+    # over the events appended above
+    StatsService().rebuild(db)
+    HistoryService(repository=MongoPlayerRepository(db)).catch_up()
+    db.jobs.update_one({'_id': JOB_ID}, {'$set': {'finished_at': datetime.utcnow()}})
+    
+    return {
+        'partitions': len(bounds),
+        'scanned': scanned,
+        'changed': changed,
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(scanned / elapsed) if elapsed > 0 else None
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--restart', action='store_true')
+    args = parser.parse_args()
+    
+    summary = rescore(
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        batch_size=args.batch_size,
+        restart=args.restart
+    )
+    print(f"Rescored {summary['scanned']:,} players ({summary['changed']:,} changed) "
+          f"in {summary['seconds']:,.1f}s, {summary['rows_per_second'] or 0:,} rows/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Write the roster snapshot the API workers start their indexes from
+
+Run it periodically (after a bulk import or rescore in particular): a
+worker replays every change logged since the snapshot, so a fresher
+snapshot means a shorter replay. The file is replaced atomically, so
+workers starting meanwhile map the old one or the new one.
+
+Usage:
+    python -m backend.scripts.snapshot [--path roster.snapshot]
+"""
+import argparse
+import time
+from backend.services.snapshot_service import SnapshotService
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--path', default=None, help="defaults to the ROSTER_SNAPSHOT_PATH setting")
+    args = parser.parse_args()
+    
+    service = SnapshotService(path=args.path)
+    start = time.perf_counter()
+    snapshot = service.write()
+    print(f"Wrote {len(snapshot.ids):,} players at history seq {snapshot.seq:,} to {service.path} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+from typing import Dict, List, Optional
+from bson import ObjectId
+from mongoengine.errors import DoesNotExist
+from pymongo import DESCENDING, ReturnDocument
+from pymongo.errors import BulkWriteError
+from ..repositories.mongo import page_query
+from .player_service import PlayerService
+from .scoring_service import ScoringService
+from ..utils.serialization import PLAYER_PROJECTION, player_row
+from ..utils.validators import validate_player_data, validate_players_batch
+
+class AsyncPlayerService:
+    """
+    PlayerService for the ASGI app, on a Motor database
+    
+    Validation, scoring, filters and cursors are shared with PlayerService;
+    only the database calls are awaited. Results are JSON-ready dicts in
+    the Player.dict() shape. The process-local indexes (rankings,
+    similarity, search, response cache) belong to the Flask app, so the
+    only write listener is the async stats service.
+    """
+
+    def __init__(self, db, stats_service=None):
+        self.db = db
+        self.scoring_service = ScoringService()
+        self.stats_service = stats_service
+
+    async def create_player(self, player_data: Dict) -> Dict:
+        """
+        Create a new player
+        
+        Args:
+            player_data: Dictionary containing player information
+        
+        Returns:
+            The created player
+        
+        Raises:
+            ValidationError: If player data is invalid
+        """
+        validated_data = validate_player_data(player_data)
+        self.scoring_service.score_player(validated_data)
+        
+        result = await self.db.players.insert_one(validated_data)
+        player_doc = await self.db.players.find_one({'_id': result.inserted_id}, PLAYER_PROJECTION)
+        if self.stats_service is not None:
+            await self.stats_service.record(added=[player_doc])
+        return player_row(player_doc)
+
+    async def create_players(self, players_data: List, chunk_size: int = 5000) -> Dict:
+        """
+        Create many players at once, like PlayerService.create_players
+        
+        Args:
+            players_data: List of player dictionaries; None marks a row
+                that could not be parsed
+            chunk_size: Number of documents per insert_many call
+        
+        Returns:
+            Dictionary with the inserted IDs (aligned with the input, None
+            for failed rows) and per-row errors keyed by row index
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        
+        rows, errors = validate_players_batch(players_data)
+        valid = [(index, row) for index, row in enumerate(rows) if row is not None]
+        self.scoring_service.score_players([row for _, row in valid])
+        
+        inserted_ids = [None] * len(rows)
+        for start in range(0, len(valid), chunk_size):
+            chunk = valid[start:start + chunk_size]
+            failed = set()
+            try:
+                await self.db.players.insert_many([row for _, row in chunk], ordered=False)
+            except BulkWriteError as e:
+                for write_error in e.details.get('writeErrors', []):
+                    index = chunk[write_error['index']][0]
+                    errors[index] = {'_schema': [write_error.get('errmsg', 'Write failed')]}
+                    failed.add(index)
+            
+            created = [row for index, row in chunk if index not in failed]
+            for index, row in chunk:
+                if index not in failed:
+                    inserted_ids[index] = str(row['_id'])
+            if self.stats_service is not None:
+                await self.stats_service.record(added=created)
+        
+        return {'inserted_ids': inserted_ids, 'errors': errors}
+
+    async def _get_player_doc(self, player_id: str, projection: Optional[Dict] = None) -> Dict:
+        doc = await self.db.players.find_one({'_id': ObjectId(player_id)}, projection)
+        if doc is None:
+            raise DoesNotExist(f"Player {player_id} not found")
+        return doc
+
+    async def get_player(self, player_id: str) -> Dict:
+        """
+        Get a player by ID
+        
+        Raises:
+            InvalidId: If player_id is not a valid ObjectId
+            DoesNotExist: If player not found
+        """
+        return player_row(await self._get_player_doc(player_id, PLAYER_PROJECTION))
+
+    async def get_players(self, player_ids: List[str]) -> Dict:
+        """
+        Get many players with one $in query, like PlayerService.get_players
+        
+        Raises:
+            ValueError: If there are no IDs, too many or an invalid one
+        """
+        object_ids = PlayerService._parse_ids(player_ids)
+        docs = await self.db.players.find({'_id': {'$in': object_ids}}, PLAYER_PROJECTION).to_list(None)
+        return PlayerService._batch_result(object_ids, docs)
+
+    async def compare_players(self, player_ids: List[str]) -> Dict:
+        """
+        Compare players attribute by attribute, like PlayerService.compare_players
+        
+        Raises:
+            ValueError: If there are fewer than 2 distinct IDs, too many or
+                an invalid one
+        """
+        PlayerService._check_comparable(player_ids)
+        result = await self.get_players(player_ids)
+        result['comparison'] = ScoringService.compare(result['players'])
+        return result
+
+    async def list_players(
+        self,
+        per_page: int = 20,
+        cursor: Optional[str] = None,
+        sort_by: str = 'overall_score',
+        order: str = 'desc',
+        filters: Optional[Dict] = None
+    ) -> Dict:
+        """
+        List players one page at a time, like PlayerService.list_players
+        
+        Returns:
+            Dictionary with the page of players and the cursor of the next
+            page (None on the last page)
+        
+        Raises:
+            ValueError: If pagination or sort parameters are invalid
+        """
+        direction, after = PlayerService._page_params(per_page, cursor, sort_by, order)
+        query, sort = page_query(filters, sort_by, direction == DESCENDING, after)
+        docs = await self.db.players.find(query, PLAYER_PROJECTION).sort(sort).limit(per_page + 1).to_list(None)
+        docs, next_cursor = PlayerService._split_page(docs, per_page, sort_by, order)
+        return {'players': [player_row(doc) for doc in docs], 'next_cursor': next_cursor}
+
+    async def update_player(self, player_id: str, player_data: Dict) -> Dict:
+        """
+        Update a player; fields missing from player_data keep their values
+        
+        Raises:
+            InvalidId: If player_id is not a valid ObjectId
+            DoesNotExist: If player not found
+            ValidationError: If update data is invalid
+        """
+        current = await self._get_player_doc(player_id)
+        validated_data = PlayerService._prepare_update(current, player_data)
+        
+        player_doc = await self.db.players.find_one_and_update(
+            {'_id': current['_id']},
+            {'$set': validated_data},
+            projection=PLAYER_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+        if player_doc is None:
+            raise DoesNotExist(f"Player {player_id} not found")
+        if self.stats_service is not None:
+            await self.stats_service.record(added=[player_doc], removed=[current])
+        return player_row(player_doc)
+
+    async def delete_player(self, player_id: str) -> bool:
+        """
+        Delete a player
+        
+        Raises:
+            InvalidId: If player_id is not a valid ObjectId
+            DoesNotExist: If player not found
+        """
+        player_doc = await self.db.players.find_one_and_delete({'_id': ObjectId(player_id)})
+        if player_doc is None:
+            raise DoesNotExist(f"Player {player_id} not found")
+        if self.stats_service is not None:
+            await self.stats_service.record(removed=[player_doc])
+        return True
@@ -0,0 +1,81 @@
+import asyncio
+from typing import Dict, Iterable, List, Optional
+from pymongo import ReplaceOne
+from ..repositories.mongo import TEAMS_QUERY, GROUPS_PIPELINE, VALUES_PIPELINE, aggregate_updates
+from .stats_service import StatsService, LEAGUE_ID, BUILT_QUERY
+
+class AsyncStatsService:
+    """
+    StatsService for the ASGI app, on a Motor database
+    
+    Reads and maintains the same team_stats aggregate documents, so the
+    Flask and ASGI apps can serve the same database side by side.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._build_lock = asyncio.Lock()
+        self._built = False
+
+    async def record(self, added: Iterable[Dict] = (), removed: Iterable[Dict] = ()):
+        """Add and remove players from the aggregates after a write"""
+        if await self.ensure_built():
+            return
+        increments = StatsService._increments(added=added, removed=removed)
+        if increments:
+            await self.db.team_stats.bulk_write(aggregate_updates(increments), ordered=False)
+
+    async def ensure_built(self) -> bool:
+        """
+        Rebuild the aggregates once if they have never been computed
+        
+        Returns:
+            True if a rebuild ran, in which case it already reflects every
+            write made so far
+        """
+        if self._built:
+            return False
+        async with self._build_lock:
+            if self._built:
+                return False
+            rebuilt = await self.db.team_stats.find_one(BUILT_QUERY, {'_id': 1}) is None
+            if rebuilt:
+                await self.rebuild()
+            self._built = True
+            return rebuilt
+
+    async def rebuild(self):
+        """Recompute every aggregate document with aggregation pipelines"""
+        groups = await self.db.players.aggregate(GROUPS_PIPELINE, allowDiskUse=True).to_list(None)
+        values = await self.db.players.aggregate(VALUES_PIPELINE, allowDiskUse=True).to_list(None)
+        aggregates = StatsService._aggregate(groups, values)
+        await self.db.team_stats.delete_many({'_id': {'$nin': list(aggregates)}})
+        await self.db.team_stats.bulk_write([
+            ReplaceOne({'_id': scope}, aggregate, upsert=True)
+            for scope, aggregate in aggregates.items()
+        ], ordered=False)
+        self._built = True
+
+    async def overview(self) -> Dict:
+        """Get league-wide statistics, like StatsService.overview"""
+        await self.ensure_built()
+        doc = await self.db.team_stats.find_one({'_id': LEAGUE_ID}) or {}
+        return StatsService._summarize(doc)
+
+    async def teams(self) -> List[Dict]:
+        """Get statistics for every team with at least one player, like StatsService.teams"""
+        await self.ensure_built()
+        docs = await self.db.team_stats.find(TEAMS_QUERY).sort('team', 1).to_list(None)
+        return [dict(team=doc['team'], **StatsService._summarize(doc)) for doc in docs]
+
+    async def distributions(self, position: Optional[str] = None) -> Dict:
+        """
+        Get the value distribution of every attribute, like StatsService.distributions
+        
+        Raises:
+            ValueError: If the position is invalid
+        """
+        scope = StatsService._distribution_scope(position)
+        await self.ensure_built()
+        doc = await self.db.team_stats.find_one({'_id': scope}) or {}
+        return StatsService._distribution(doc, position)
@@ -0,0 +1,347 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from bson import ObjectId
+from ..repositories import get_player_repository
+from ..repositories.base import Checkpoint, HistoryEvent, PlayerRepository
+from .ranking_service import ranking_service
+
+# History events between two checkpoints: any point in time is rebuilt from
+# the checkpoint before it plus at most this many events
+CHECKPOINT_INTERVAL = 10000
+
+# Saves that change none of these are not logged
+LOGGED_FIELDS = ('overall_score', 'position_weighted_score', 'position', 'offense', 'defense')
+
+# Decoded checkpoints kept for repeated queries around the same time
+CACHED_CHECKPOINTS = 4
+
+# Checkpoints pack the 12-byte player IDs, sorted, followed by the scores
+# in hundredths as little-endian int32, in the same order
+ID_DTYPE = np.dtype('S12')
+SCORE_DTYPE = np.dtype('<i4')
+
+def parse_timestamp(value: str) -> datetime:
+    """
+    Parse an ISO 8601 timestamp or Unix time in seconds as a naive UTC datetime
+    
+    Raises:
+        ValueError: If value is neither
+    """
+    value = value.strip()
+    try:
+        return datetime.fromtimestamp(float(value), timezone.utc).replace(tzinfo=None)
+    except (ValueError, OverflowError, OSError):
+        pass
+    try:
+        parsed = datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+    except ValueError:
+        raise ValueError(f"Invalid timestamp: {value}. Use ISO 8601 or Unix seconds")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def format_timestamp(value: datetime) -> str:
+    """ISO 8601 form of a naive UTC datetime, as parse_timestamp reads it"""
+    return value.isoformat(timespec='milliseconds') + 'Z'
+
+def _now() -> datetime:
+    # MongoDB keeps milliseconds, so every backend records the same instant
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+def _hundredths(score: float) -> int:
+    return int(round(score * 100))
+
+def _pack(ids: np.ndarray, scores: np.ndarray) -> bytes:
+    return ids.tobytes() + scores.astype(SCORE_DTYPE).tobytes()
+
+def _unpack(data: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    # Views over the checkpoint bytes, no copy
+    count = len(data) // (ID_DTYPE.itemsize + SCORE_DTYPE.itemsize)
+    ids = np.frombuffer(data, ID_DTYPE, count)
+    scores = np.frombuffer(data, SCORE_DTYPE, count, offset=count * ID_DTYPE.itemsize)
+    return ids, scores
+
+def _object_id(key: bytes) -> ObjectId:
+    # NumPy drops trailing NUL bytes from fixed-width byte strings
+    return ObjectId(bytes(key).ljust(ID_DTYPE.itemsize, b'\0'))
+
+def _changes(events: Iterable[HistoryEvent]) -> Dict[bytes, Optional[int]]:
+    """Latest score in hundredths per player binary ID, None for deleted players"""
+    return {
+        event.player_id.binary: None if event.score is None else _hundredths(event.score)
+        for event in events
+    }
+
+def _overlay(ids: np.ndarray, scores: np.ndarray, changes: Dict[bytes, Optional[int]]) -> Tuple[np.ndarray, List]:
+    """
+    Apply changes on top of checkpoint arrays
+    
+    Returns:
+        Tuple of (checkpoint scores as int64 with changed players set to
+        -1, (score, binary ID) pairs of the changed players still present)
+    """
+    live = scores.astype(np.int64)
+    if changes and len(ids):
+        keys = np.array(list(changes), dtype=ID_DTYPE)
+        positions = np.searchsorted(ids, keys)
+        inside = positions < len(ids)
+        found = np.zeros(len(keys), dtype=bool)
+        found[inside] = ids[positions[inside]] == keys[inside]
+        live[positions[found]] = -1
+    added = [(score, key) for key, score in changes.items() if score is not None]
+    return live, added
+
+class HistoryService:
+    """
+    Append-only history of overall score changes, with periodic checkpoints
+    
+    Every change to a player's scores, position or stats (and every create
+    and delete) is appended to the repository's history log as a small
+    event: time, player, overall score and the player's overall rank right
+    after the change. Every
+    checkpoint_interval events a checkpoint packs every player's score
+    into two flat arrays, built from the previous checkpoint plus the
+    events since, so the leaderboard at any past time is one checkpoint
+    read and at most checkpoint_interval events replayed.
+    
+    Event timestamps are expected to increase with seq, which holds as
+    long as the processes writing players keep their clocks in sync.
+    """
+
+    def __init__(
+        self,
+        ranking=None,
+        repository: Optional[PlayerRepository] = None,
+        checkpoint_interval: int = CHECKPOINT_INTERVAL
+    ):
+        # RankingService whose index provides the rank recorded with each event
+        self.ranking = ranking
+        self._repository = repository
+        self.checkpoint_interval = checkpoint_interval
+        self._lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        self._decoded: "OrderedDict[tuple, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        self._checkpoint_seq = 0
+        self.started = False
+
+    @property
+    def repository(self) -> PlayerRepository:
+        return self._repository if self._repository is not None else get_player_repository()
+
+    def ensure_started(self):
+        """Take the first checkpoint from the players collection unless there is one"""
+        if self.started:
+            return
+        with self._lock:
+            if not self.started:
+                checkpoint = self.repository.latest_checkpoint()
+                if checkpoint is None:
+                    checkpoint = self._checkpoint_players()
+                self._checkpoint_seq = checkpoint.seq
+                self.started = True
+
+    def rebuild(self):
+        """Take a checkpoint of the players collection as it is now"""
+        with self._lock:
+            self._checkpoint_seq = self._checkpoint_players().seq
+            self.started = True
+        with self._cache_lock:
+            self._decoded.clear()
+
+    def _checkpoint_players(self) -> Checkpoint:
+        repository = self.repository
+        # Events appended during the scan have later seqs and replay on top
+        seq = repository.last_history_seq()
+        docs = list(repository.scan(('overall_score',)))
+        ids = np.array([doc['_id'].binary for doc in docs], dtype=ID_DTYPE)
+        scores = np.array([_hundredths(doc.get('overall_score') or 0.0) for doc in docs], dtype=SCORE_DTYPE)
+        order = np.argsort(ids, kind='stable')
+        checkpoint = Checkpoint(seq, _now(), _pack(ids[order], scores[order]))
+        repository.save_checkpoint(checkpoint)
+        return checkpoint
+
+    def on_player_saved(self, player_id: str, doc: Dict, previous: Optional[Dict] = None):
+        # Stat and position changes are logged even when the overall score
+        # stays put, since roster snapshots replay every change the log shows
+        if previous is None or any(previous.get(field) != doc.get(field) for field in LOGGED_FIELDS):
+            self._record([(player_id, doc.get('overall_score') or 0.0)])
+
+    def on_players_created(self, created: List):
+        self._record([(player_id, doc.get('overall_score') or 0.0) for player_id, doc in created])
+
+    def on_player_deleted(self, player_id: str, doc: Dict):
+        self._record([(player_id, None)])
+
+    def _rank(self, player_id: str) -> Optional[int]:
+        if self.ranking is None or not self.ranking.index.loaded:
+            return None
+        result = self.ranking.index.rank(player_id)
+        return result[0] if result else None
+
+    def _record(self, changes: List[Tuple[str, Optional[float]]]):
+        if not changes:
+            return
+        self.ensure_started()
+        timestamp = _now()
+        last_seq = self.repository.append_history([
+            (timestamp, ObjectId(player_id), score, None if score is None else self._rank(player_id))
+            for player_id, score in changes
+        ])
+        if last_seq - self._checkpoint_seq >= self.checkpoint_interval:
+            self._advance_checkpoints(last_seq)
+
+    def catch_up(self):
+        """Take every checkpoint due, after a bulk job appended events to the log directly"""
+        self.ensure_started()
+        self._advance_checkpoints(self.repository.last_history_seq())
+
+    def _advance_checkpoints(self, last_seq: int):
+        """Take the checkpoints due up to last_seq, each from the one before it"""
+        # Another thread taking them already is as good
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            repository = self.repository
+            checkpoint = repository.latest_checkpoint()
+            while checkpoint is not None and last_seq - checkpoint.seq >= self.checkpoint_interval:
+                target = checkpoint.seq + self.checkpoint_interval
+                events = list(repository.history_events(checkpoint.seq, target))
+                # Another process may not have written all the seqs it was handed yet
+                if len(events) != self.checkpoint_interval:
+                    break
+                ids, scores = self._decode(checkpoint)
+                live, added = _overlay(ids, scores, _changes(events))
+                keep = live >= 0
+                ids = np.concatenate([ids[keep], np.array([key for _, key in added], dtype=ID_DTYPE)])
+                scores = np.concatenate([live[keep], np.array([score for score, _ in added], dtype=np.int64)])
+                order = np.argsort(ids, kind='stable')
+                checkpoint = Checkpoint(
+                    target,
+                    max(event.timestamp for event in events),
+                    _pack(ids[order], scores[order])
+                )
+                repository.save_checkpoint(checkpoint)
+            if checkpoint is not None:
+                self._checkpoint_seq = checkpoint.seq
+        finally:
+            self._lock.release()
+
+    def _decode(self, checkpoint: Checkpoint) -> Tuple[np.ndarray, np.ndarray]:
+        # A rebuilt checkpoint keeps its seq but not its timestamp
+        key = (checkpoint.seq, checkpoint.timestamp)
+        with self._cache_lock:
+            decoded = self._decoded.get(key)
+            if decoded is not None:
+                self._decoded.move_to_end(key)
+                return decoded
+        decoded = _unpack(checkpoint.data)
+        with self._cache_lock:
+            self._decoded[key] = decoded
+            while len(self._decoded) > CACHED_CHECKPOINTS:
+                self._decoded.popitem(last=False)
+        return decoded
+
+    def leaderboard_as_of(self, as_of: datetime, limit: int = 50) -> Dict:
+        """
+        Get the overall leaderboard as it stood at a past time
+        
+        Args:
+            as_of: Naive UTC datetime
+            limit: Number of players to return
+            
+        Returns:
+            Dictionary with the time, the player count then and the top
+            players, each with rank, ID, name, team, position and overall
+            score; players deleted since have no name, team or position
+            
+        Raises:
+            ValueError: If as_of is before the history starts
+        """
+        self.ensure_started()
+        repository = self.repository
+        checkpoint = repository.latest_checkpoint(as_of)
+        if checkpoint is None:
+            raise ValueError(f"No rank history at or before {format_timestamp(as_of)}")
+        ids, scores = self._decode(checkpoint)
+        
+        changes = {}
+        for event in repository.history_events(checkpoint.seq):
+            if event.timestamp > as_of:
+                break
+            changes[event.player_id.binary] = None if event.score is None else _hundredths(event.score)
+        live, added = _overlay(ids, scores, changes)
+        total = int(np.count_nonzero(live >= 0)) + len(added)
+        
+        # Everyone at or above the limit-th best checkpoint score, plus the
+        # changed players, holds every player above the returned ones
+        threshold = 0
+        if limit < len(live):
+            threshold = max(int(np.partition(live, len(live) - limit)[len(live) - limit]), 0)
+        rows = np.flatnonzero(live >= threshold)
+        entries = [(score, bytes(key).ljust(ID_DTYPE.itemsize, b'\0')) for score, key in zip(live[rows].tolist(), ids[rows])]
+        entries.extend(added)
+        entries.sort(key=lambda entry: (-entry[0], entry[1]))
+        entries = entries[:limit]
+        
+        docs = {
+            doc['_id'].binary: doc
+            for doc in repository.get_many([_object_id(key) for _, key in entries], ('name', 'team', 'position'))
+        }
+        players = []
+        for index, (score, key) in enumerate(entries):
+            # Players with equal scores share a rank
+            if players and entries[index - 1][0] == score:
+                rank = players[-1]['rank']
+            else:
+                rank = index + 1
+            doc = docs.get(key, {})
+            players.append({
+                'rank': rank,
+                'id': str(_object_id(key)),
+                'name': doc.get('name'),
+                'team': doc.get('team'),
+                'position': doc.get('position'),
+                'overall_score': score / 100
+            })
+        return {'as_of': format_timestamp(as_of), 'total': total, 'players': players}
+
+    def player_history(
+        self,
+        player_id: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> Optional[Dict]:
+        """
+        Get a player's overall score after every logged change, oldest first
+        
+        Args:
+            player_id: Player's ID
+            since: Optional naive UTC datetime of the first change to return
+            until: Optional naive UTC datetime of the last change to return
+            
+        Returns:
+            Dictionary with the player's ID and one point per change with
+            its time, the new overall score (None once deleted) and the
+            overall rank right after it, or None if the player is unknown
+            
+        Raises:
+            InvalidId: If player_id is not a valid ObjectId
+        """
+        object_id = ObjectId(player_id)
+        repository = self.repository
+        events = repository.player_history(object_id, since, until)
+        if not events and repository.get(object_id, ('_id',)) is None:
+            return None
+        return {
+            'id': player_id,
+            'points': [
+                {'timestamp': format_timestamp(event.timestamp), 'overall_score': event.score, 'rank': event.rank}
+                for event in events
+            ]
+        }
+
+history_service = HistoryService(ranking=ranking_service)
@@ -0,0 +1,251 @@
+import heapq
+from typing import Dict, List, NamedTuple, Optional, Sequence
+from ..repositories import get_player_repository
+from ..repositories.base import PlayerRepository
+from .scoring_service import DEFENSE_FIELDS, POSITIONS
+
+# Slots that more than one position can fill
+FLEX_SLOTS = {
+    'G': ('PG', 'SG'),
+    'F': ('SF', 'PF'),
+    'UTIL': tuple(POSITIONS)
+}
+DEFAULT_SLOTS = tuple(POSITIONS)
+LINEUP_SIZE = len(DEFAULT_SLOTS)
+
+POOL_FIELDS = ('name', 'team', 'position', 'defense', 'position_weighted_score')
+
+class Candidate(NamedTuple):
+    # Scores in hundredths and defense as the sum of the defensive stats,
+    # so totals are exact integers
+    score: int
+    defense: int
+    player_id: str
+    team: str
+    position: str
+
+class LineupService:
+    """
+    Builds the best lineup for a set of position slots by branch and bound
+    
+    Players score the position-weighted score ScoringService stored when
+    they were written, as shown on the position leaderboards. Slots are filled one at a
+    time from candidates sorted by score; a branch is cut as soon as its
+    score plus the best score still open to every remaining slot cannot
+    beat the best lineup found, or when even the best remaining defenders
+    cannot reach the minimum team defense. Before the search, a player is
+    dropped when as many players as there are slots match or beat them on
+    both score and defense (at the same position, and on the same team
+    when teams are capped), since one of those can always take their place
+    without making the lineup worse.
+    """
+
+    def __init__(self, repository: Optional[PlayerRepository] = None):
+        self._repository = repository
+
+    @property
+    def repository(self) -> PlayerRepository:
+        return self._repository if self._repository is not None else get_player_repository()
+
+    def optimize(
+        self,
+        slots: Sequence[str] = DEFAULT_SLOTS,
+        team: Optional[str] = None,
+        exclude: Sequence[str] = (),
+        min_defense: Optional[float] = None,
+        max_per_team: Optional[int] = None
+    ) -> Optional[Dict]:
+        """
+        Choose the lineup with the highest total position-weighted score
+        
+        Args:
+            slots: Slots to fill, each a position (PG, SG, SF, PF, C) or a
+                flexible slot (G, F, UTIL)
+            team: Pick from this team's roster instead of the whole league
+            exclude: IDs of players that may not be picked
+            min_defense: Minimum team defense, the mean over the lineup of
+                each player's average defensive stat
+            max_per_team: Most players one team may contribute
+            
+        Returns:
+            Dictionary with the lineup in slot order, its total score and
+            team defense and search statistics, or None if no lineup
+            satisfies the constraints
+            
+        Raises:
+            ValueError: If a slot or constraint is invalid
+        """
+        eligible = self._slot_positions(slots)
+        if min_defense is not None and not 0 <= min_defense <= 100:
+            raise ValueError("min_defense must be between 0 and 100")
+        if max_per_team is not None and max_per_team < 1:
+            raise ValueError("max_per_team must be positive")
+        excluded = set(exclude)
+        
+        docs = [
+            doc for doc in self.repository.find({'team': team} if team else None, fields=POOL_FIELDS)
+            if str(doc['_id']) not in excluded
+        ]
+        pool = self._candidates(docs)
+        kept = self._undominated(pool, len(slots), max_per_team is not None)
+        
+        # Fill the slots with the fewest candidates first
+        candidates = [
+            sorted((c for c in kept if c.position in positions), key=lambda c: (-c.score, -c.defense, c.player_id))
+            for positions in eligible
+        ]
+        order = sorted(range(len(slots)), key=lambda slot: (len(candidates[slot]), slots[slot]))
+        needed = 0 if min_defense is None else min_defense * len(DEFENSE_FIELDS) * len(slots)
+        picks, nodes = self._search(
+            [candidates[slot] for slot in order],
+            [slots[slot] for slot in order],
+            needed,
+            max_per_team
+        )
+        if picks is None:
+            return None
+        
+        by_slot = dict(zip(order, picks))
+        docs_by_id = {str(doc['_id']): doc for doc in docs}
+        lineup = []
+        for slot, name in enumerate(slots):
+            candidate = by_slot[slot]
+            doc = docs_by_id[candidate.player_id]
+            lineup.append({
+                'slot': name,
+                'id': candidate.player_id,
+                'name': doc['name'],
+                'team': doc['team'],
+                'position': doc['position'],
+                'position_weighted_score': candidate.score / 100,
+                'defense': round(candidate.defense / len(DEFENSE_FIELDS), 2)
+            })
+        return {
+            'lineup': lineup,
+            'total_score': sum(candidate.score for candidate in picks) / 100,
+            'team_defense': round(sum(candidate.defense for candidate in picks) / len(DEFENSE_FIELDS) / len(slots), 2),
+            'pool_size': len(pool),
+            'candidates': len(kept),
+            'nodes': nodes
+        }
+
+    @staticmethod
+    def _slot_positions(slots: Sequence[str]) -> List[tuple]:
+        """Positions each slot accepts; raises ValueError for unknown slots"""
+        if len(slots) != LINEUP_SIZE:
+            raise ValueError(f"slots must list {LINEUP_SIZE} slots")
+        eligible = []
+        for slot in slots:
+            if slot in FLEX_SLOTS:
+                eligible.append(FLEX_SLOTS[slot])
+            elif slot in POSITIONS:
+                eligible.append((slot,))
+            else:
+                raise ValueError(f"Invalid slot: {slot}. Must be a position or one of {', '.join(FLEX_SLOTS)}")
+        return eligible
+
+    @staticmethod
+    def _candidates(docs: List[Dict]) -> List[Candidate]:
+        """Candidates for a pool of player documents, skipping unscored players"""
+        return [
+            Candidate(
+                int(round(doc['position_weighted_score'] * 100)),
+                sum(doc['defense'][stat] for stat in DEFENSE_FIELDS),
+                str(doc['_id']),
+                doc['team'],
+                doc['position']
+            )
+            for doc in docs if doc.get('position_weighted_score') is not None
+        ]
+
+    @staticmethod
+    def _undominated(pool: List[Candidate], size: int, by_team: bool) -> List[Candidate]:
+        """
+        Drop players that can always be swapped for a better one
+        
+        A lineup holds at most size - 1 other players, so if size players
+        of the same position (and team, when teams are capped) have at
+        least the same score and defense, one of them is free to replace
+        the player without breaking a constraint or lowering the score.
+        """
+        groups: Dict[tuple, List[Candidate]] = {}
+        for candidate in pool:
+            groups.setdefault((candidate.position, candidate.team if by_team else None), []).append(candidate)
+        
+        kept = []
+        for members in groups.values():
+            members.sort(key=lambda c: (-c.score, -c.defense, c.player_id))
+            # Min-heap of the best defenses among the higher-scoring players
+            defenses: List[int] = []
+            for candidate in members:
+                if len(defenses) == size and defenses[0] >= candidate.defense:
+                    continue
+                kept.append(candidate)
+                if len(defenses) < size:
+                    heapq.heappush(defenses, candidate.defense)
+                elif candidate.defense > defenses[0]:
+                    heapq.heapreplace(defenses, candidate.defense)
+        return kept
+
+    @staticmethod
+    def _search(candidates: List[List[Candidate]], slots: List[str], needed: float, max_per_team: Optional[int]):
+        """
+        Depth-first branch and bound over slots in the given order
+        
+        Returns:
+            Tuple of (the best candidates, aligned with slots, or None if
+            no lineup is feasible, number of search nodes visited)
+        """
+        count = len(slots)
+        # Best score and defense still open to slots[depth:], ignoring conflicts
+        score_bound = [0] * (count + 1)
+        defense_bound = [0] * (count + 1)
+        for depth in range(count - 1, -1, -1):
+            if not candidates[depth]:
+                return None, 0
+            score_bound[depth] = score_bound[depth + 1] + candidates[depth][0].score
+            defense_bound[depth] = defense_bound[depth + 1] + max(c.defense for c in candidates[depth])
+        
+        best = [-1, None]
+        chosen: List[Candidate] = []
+        used = set()
+        per_team: Dict[str, int] = {}
+        nodes = 0
+        
+        def visit(depth: int, score: int, defense: int, start: int):
+            nonlocal nodes
+            nodes += 1
+            if depth == count:
+                if score > best[0]:
+                    best[0], best[1] = score, list(chosen)
+                return
+            if defense + defense_bound[depth] < needed:
+                return
+            
+            following = score_bound[depth + 1]
+            defense_following = defense_bound[depth + 1]
+            # Identical consecutive slots take candidates in increasing order,
+            # so each set of players is tried once
+            same_as_next = depth + 1 < count and slots[depth + 1] == slots[depth]
+            slot_candidates = candidates[depth]
+            for index in range(start, len(slot_candidates)):
+                candidate = slot_candidates[index]
+                if score + candidate.score + following <= best[0]:
+                    break
+                if candidate.player_id in used or defense + candidate.defense + defense_following < needed:
+                    continue
+                if max_per_team is not None and per_team.get(candidate.team, 0) >= max_per_team:
+                    continue
+                
+                used.add(candidate.player_id)
+                per_team[candidate.team] = per_team.get(candidate.team, 0) + 1
+                chosen.append(candidate)
+                visit(depth + 1, score + candidate.score, defense + candidate.defense, index + 1 if same_as_next else 0)
+                chosen.pop()
+                per_team[candidate.team] -= 1
+                used.discard(candidate.player_id)
+        
+        visit(0, 0, 0, 0)
+        return best[1], nodes
+
+lineup_service = LineupService()
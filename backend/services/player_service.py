@@ -1,13 +1,58 @@
-from typing import List, Dict, Optional
+import logging
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 from ..models.player import Player
+from ..repositories import get_player_repository
+from ..repositories.base import Keyset, PlayerRepository
 from ..services.scoring_service import ScoringService
-from ..utils.validators import validate_player_data
+from ..utils.validators import validate_player_data, validate_players_batch
+from ..utils.pagination import encode_cursor, decode_cursor
+from ..utils.metrics import stage
+from ..utils.serialization import PLAYER_PROJECTION, player_row
 from mongoengine.errors import ValidationError, DoesNotExist
+from pymongo import ASCENDING, DESCENDING
 from bson import ObjectId
+from bson.errors import InvalidId
+
+SORT_FIELDS = ('overall_score', 'name')
+MAX_PER_PAGE = 100
+
+# Most player IDs one batch fetch or comparison accepts
+MAX_BATCH_IDS = 500
+
+logger = logging.getLogger(__name__)
 
 class PlayerService:
-    def __init__(self):
+    def __init__(self, listeners: Optional[List] = None, repository: Optional[PlayerRepository] = None):
         self.scoring_service = ScoringService()
+        # Objects with on_player_saved/on_player_deleted hooks, such as the
+        # in-memory indexes, notified after every successful write
+        self.listeners = list(listeners or [])
+        self._repository = repository
+
+    @property
+    def repository(self) -> PlayerRepository:
+        """The repository given at construction, else the one the PLAYER_REPOSITORY setting selects"""
+        return self._repository if self._repository is not None else get_player_repository()
+
+    def _notify(self, hook: str, *args):
+        for listener in self.listeners:
+            try:
+                getattr(listener, hook)(*args)
+            except Exception:
+                logger.exception("Player listener %r failed in %s", listener, hook)
+
+    def _notify_created(self, created: List):
+        """Report newly inserted (player_id, doc) pairs, batched where a listener supports it"""
+        for listener in self.listeners:
+            try:
+                if hasattr(listener, 'on_players_created'):
+                    listener.on_players_created(created)
+                else:
+                    for player_id, doc in created:
+                        listener.on_player_saved(player_id, doc, None)
+            except Exception:
+                logger.exception("Player listener %r failed in on_players_created", listener)
 
     def create_player(self, player_data: Dict) -> Player:
         """
@@ -22,64 +67,369 @@ class PlayerService:
         Raises:
             ValidationError: If player data is invalid
         """
-        from ..db import get_db
-        
         # Validate input data
-        validated_data = validate_player_data(player_data)
+        with stage('validate'):
+            validated_data = validate_player_data(player_data)
         
-        # Calculate overall score
-        validated_data['overall_score'] = self.scoring_service.calculate_overall_score(
-            validated_data['offense'],
-            validated_data['defense']
-        )
+        # Calculate overall and position-weighted scores
+        with stage('score'):
+            self.scoring_service.score_player(validated_data)
         
         # Create player
-        db = get_db()
-        result = db.players.insert_one(validated_data)
+        with stage('db'):
+            repository = self.repository
+            inserted_id = repository.insert(validated_data)
+            
+            # Get the created player
+            player_doc = repository.get(inserted_id)
+        player_id = str(player_doc.pop('_id'))
+        with stage('notify'):
+            self._notify('on_player_saved', player_id, player_doc, None)
+        player_doc['id'] = player_id
+        
+        with stage('build'):
+            return Player(**player_doc)
+
+    def create_players(self, players_data: List, chunk_size: int = 5000) -> Dict:
+        """
+        Create many players at once
         
-        # Get the created player
-        player_doc = db.players.find_one({'_id': result.inserted_id})
-        player_doc['id'] = str(player_doc.pop('_id'))
+        Rows are validated in one batch, scored with the vectorized scorer
+        and written in batches of chunk_size documents. Invalid rows and
+        rows the database rejects are reported instead of failing the
+        whole batch.
         
-        return Player(**player_doc)
+        Args:
+            players_data: List of player dictionaries; None marks a row
+                that could not be parsed
+            chunk_size: Number of documents per batched write
+            
+        Returns:
+            Dictionary with the inserted IDs (aligned with the input, None
+            for failed rows) and per-row errors keyed by row index
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        
+        # Validate input data
+        with stage('validate'):
+            rows, errors = validate_players_batch(players_data)
+        valid = [(index, row) for index, row in enumerate(rows) if row is not None]
+        
+        # Calculate overall and position-weighted scores for the whole batch
+        with stage('score'):
+            self.scoring_service.score_players([row for _, row in valid])
+        
+        # Create players
+        repository = self.repository
+        inserted_ids = [None] * len(rows)
+        for start in range(0, len(valid), chunk_size):
+            chunk = valid[start:start + chunk_size]
+            with stage('db'):
+                write_errors = repository.insert_many([row for _, row in chunk])
+            failed = set()
+            for position, message in write_errors.items():
+                index = chunk[position][0]
+                errors[index] = {'_schema': [message]}
+                failed.add(index)
+            
+            # insert_many assigns _id to each document before writing it
+            created = []
+            for index, row in chunk:
+                if index not in failed:
+                    inserted_ids[index] = str(row.pop('_id'))
+                    created.append((inserted_ids[index], row))
+            with stage('notify'):
+                self._notify_created(created)
+        
+        return {'inserted_ids': inserted_ids, 'errors': errors}
 
-    def get_player(self, player_id: str) -> Player:
+    def get_player(self, player_id: str, as_rows: bool = False):
         """
         Get a player by ID
         
         Args:
             player_id: Player's ID
+            as_rows: Return the JSON-ready dict built by player_row instead
+                of a Player, for read-only responses
             
         Returns:
-            Player instance
+            Player instance, or its dict when as_rows is set
             
         Raises:
+            InvalidId: If player_id is not a valid ObjectId
             DoesNotExist: If player not found
         """
-        return Player.objects.get(id=ObjectId(player_id))
+        if as_rows:
+            doc = self._get_player_doc(player_id, PLAYER_PROJECTION)
+            with stage('build'):
+                return player_row(doc)
+        
+        doc = self._get_player_doc(player_id)
+        doc['id'] = str(doc.pop('_id'))
+        with stage('build'):
+            return Player(**doc)
+
+    def _get_player_doc(self, player_id: str, fields: Optional[Dict] = None) -> Dict:
+        with stage('db'):
+            doc = self.repository.get(ObjectId(player_id), fields)
+        if doc is None:
+            raise DoesNotExist(f"Player {player_id} not found")
+        return doc
+
+    def get_players(self, player_ids: Sequence[str]) -> Dict:
+        """
+        Get many players with one repository query
+        
+        Args:
+            player_ids: Player IDs; duplicates are returned once
+            
+        Returns:
+            Dictionary with the JSON-ready dicts built by player_row of the
+            players found, in request order, and the IDs that were not found
+            
+        Raises:
+            ValueError: If there are no IDs, more than MAX_BATCH_IDS or an
+                invalid one
+        """
+        object_ids = self._parse_ids(player_ids)
+        with stage('db'):
+            docs = self.repository.get_many(object_ids, PLAYER_PROJECTION)
+        with stage('build'):
+            return self._batch_result(object_ids, docs)
+
+    def compare_players(self, player_ids: Sequence[str]) -> Dict:
+        """
+        Compare players attribute by attribute
+        
+        Args:
+            player_ids: IDs of the players to compare; the first one found
+                is the baseline differences are taken against
+            
+        Returns:
+            get_players result plus the ScoringService.compare comparison
+            of the players found, keyed by attribute
+            
+        Raises:
+            ValueError: If there are fewer than 2 or more than
+                MAX_BATCH_IDS distinct IDs, or an invalid one
+        """
+        self._check_comparable(player_ids)
+        result = self.get_players(player_ids)
+        with stage('score'):
+            result['comparison'] = ScoringService.compare(result['players'])
+        return result
+
+    @staticmethod
+    def _check_comparable(player_ids: Sequence[str]):
+        """Raise ValueError unless player_ids names at least 2 distinct players"""
+        if len({player_id for player_id in player_ids if isinstance(player_id, str)}) < 2:
+            raise ValueError("At least 2 distinct player IDs are required")
+
+    @staticmethod
+    def _parse_ids(player_ids: Sequence[str]) -> List[ObjectId]:
+        """
+        Validate a batch of player IDs
+        
+        Returns:
+            Distinct ObjectIds, in request order
+            
+        Raises:
+            ValueError: If there are no IDs, more than MAX_BATCH_IDS or an
+                invalid one
+        """
+        if not player_ids:
+            raise ValueError("At least one player ID is required")
+        object_ids = []
+        seen = set()
+        for player_id in player_ids:
+            if not isinstance(player_id, str) or not ObjectId.is_valid(player_id):
+                raise ValueError(f"Invalid player ID: {player_id}")
+            object_id = ObjectId(player_id)
+            if object_id not in seen:
+                seen.add(object_id)
+                object_ids.append(object_id)
+        if len(object_ids) > MAX_BATCH_IDS:
+            raise ValueError(f"At most {MAX_BATCH_IDS} player IDs are allowed")
+        return object_ids
+
+    @staticmethod
+    def _batch_result(object_ids: List[ObjectId], docs: List[Dict]) -> Dict:
+        """Order fetched documents like the request and list the IDs that were not found"""
+        by_id = {doc['_id']: doc for doc in docs}
+        return {
+            'players': [player_row(by_id[object_id]) for object_id in object_ids if object_id in by_id],
+            'missing': [str(object_id) for object_id in object_ids if object_id not in by_id]
+        }
 
-    def list_players(self) -> List[Player]:
+    def list_players(
+        self,
+        per_page: int = 20,
+        cursor: Optional[str] = None,
+        sort_by: str = 'overall_score',
+        order: str = 'desc',
+        filters: Optional[Dict] = None,
+        as_rows: bool = False
+    ) -> Dict:
         """
-        List all players
+        List players one page at a time, sorted and filtered by the repository
         
+        Pages are fetched with keyset pagination on (sort_by, _id), so each
+        page is an index range scan no matter how deep it is.
+        
+        Args:
+            per_page: Number of players per page (1-100)
+            cursor: Opaque cursor returned with the previous page
+            sort_by: Field to sort on (overall_score or name)
+            order: Sort order (asc or desc)
+            filters: Optional position, team and name filters
+            as_rows: Return JSON-ready dicts built by player_row instead of
+                Player instances, for read-only responses
+            
         Returns:
-            List of Player instances
+            Dictionary with the page of Player instances (or dicts) and the
+            cursor of the next page (None on the last page)
+            
+        Raises:
+            ValueError: If pagination or sort parameters are invalid
         """
-        from ..db import get_db
+        direction, after = self._page_params(per_page, cursor, sort_by, order)
+        with stage('db'):
+            docs = list(self.repository.find(
+                filters,
+                sort_by,
+                descending=direction == DESCENDING,
+                after=after,
+                limit=per_page + 1,
+                fields=PLAYER_PROJECTION if as_rows else None
+            ))
+        docs, next_cursor = self._split_page(docs, per_page, sort_by, order)
         
-        db = get_db()
         players = []
+        with stage('build'):
+            if as_rows:
+                players = [player_row(doc) for doc in docs]
+            else:
+                for doc in docs:
+                    doc['id'] = str(doc.pop('_id'))
+                    players.append(Player(**doc))
         
-        for doc in db.players.find():
-            doc['id'] = str(doc.pop('_id'))
-            players.append(Player(**doc))
+        return {'players': players, 'next_cursor': next_cursor}
+
+    @staticmethod
+    def _page_params(
+        per_page: int,
+        cursor: Optional[str],
+        sort_by: str,
+        order: str
+    ) -> Tuple[int, Optional[Keyset]]:
+        """
+        Validate the parameters of one listing page
+        
+        Returns:
+            Tuple of (PyMongo sort direction, (value, _id) keyset the page
+            starts after, or None for the first page); fetch per_page + 1
+            documents and pass them to _split_page
+            
+        Raises:
+            ValueError: If pagination or sort parameters are invalid
+        """
+        direction = PlayerService._sort_direction(sort_by, order)
+        if not 1 <= per_page <= MAX_PER_PAGE:
+            raise ValueError(f"per_page must be between 1 and {MAX_PER_PAGE}")
         
-        return players
+        if not cursor:
+            return direction, None
+        
+        state = decode_cursor(cursor)
+        if state.get('sort_by') != sort_by or state.get('order') != order:
+            raise ValueError("Cursor does not match the requested sort")
+        try:
+            return direction, (state['value'], ObjectId(state['id']))
+        except (KeyError, InvalidId):
+            raise ValueError("Invalid cursor")
+
+    @staticmethod
+    def _split_page(docs: List[Dict], per_page: int, sort_by: str, order: str) -> Tuple[List[Dict], Optional[str]]:
+        """Trim the look-ahead document off a page and encode the next page's cursor"""
+        next_cursor = None
+        if len(docs) > per_page:
+            docs = docs[:per_page]
+            last = docs[-1]
+            next_cursor = encode_cursor({
+                'sort_by': sort_by,
+                'order': order,
+                'value': last.get(sort_by),
+                'id': str(last['_id'])
+            })
+        return docs, next_cursor
+
+    def iter_players(
+        self,
+        sort_by: str = 'overall_score',
+        order: str = 'desc',
+        filters: Optional[Dict] = None,
+        batch_size: int = 1000,
+        as_rows: bool = False
+    ) -> Iterator:
+        """
+        Iterate over every matching player without materializing the list
+        
+        The query is validated and the cursor opened eagerly, so errors
+        surface before the first row; documents are then pulled from
+        the repository batch_size at a time as the iterator is consumed.
+        
+        Args:
+            sort_by: Field to sort on (overall_score or name)
+            order: Sort order (asc or desc)
+            filters: Optional position, team and name filters
+            batch_size: Number of documents fetched per round trip
+            as_rows: Yield JSON-ready dicts built by player_row instead of
+                Player instances
+            
+        Returns:
+            Iterator of Player instances, or of dicts when as_rows is set
+            
+        Raises:
+            ValueError: If sort parameters are invalid
+        """
+        direction = self._sort_direction(sort_by, order)
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        
+        cursor = self.repository.find(
+            filters,
+            sort_by,
+            descending=direction == DESCENDING,
+            fields=PLAYER_PROJECTION if as_rows else None,
+            batch_size=batch_size
+        )
+        if as_rows:
+            return map(player_row, cursor)
+        
+        def generate():
+            for doc in cursor:
+                doc['id'] = str(doc.pop('_id'))
+                yield Player(**doc)
+        
+        return generate()
+
+    @staticmethod
+    def _sort_direction(sort_by: str, order: str) -> int:
+        """Validate sort parameters and return the PyMongo sort direction"""
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"Invalid sort field. Allowed: {SORT_FIELDS}")
+        if order not in ('asc', 'desc'):
+            raise ValueError("Order must be 'asc' or 'desc'")
+        return DESCENDING if order == 'desc' else ASCENDING
 
     def update_player(self, player_id: str, player_data: Dict) -> Player:
         """
         Update a player
         
+        Fields missing from player_data, including individual stats, keep
+        their stored values.
+        
         Args:
             player_id: Player's ID
             player_data: Updated player data
@@ -88,25 +438,55 @@ class PlayerService:
             Updated Player instance
             
         Raises:
+            InvalidId: If player_id is not a valid ObjectId
             DoesNotExist: If player not found
             ValidationError: If update data is invalid
         """
-        player = self.get_player(player_id)
+        current = self._get_player_doc(player_id)
+        validated_data = self._prepare_update(current, player_data)
         
-        # Validate update data
-        validated_data = validate_player_data(player_data)
+        # Save changes
+        with stage('db'):
+            player_doc = self.repository.update(current['_id'], validated_data)
+        if player_doc is None:
+            raise DoesNotExist(f"Player {player_id} not found")
         
-        # Update fields
-        for key, value in validated_data.items():
-            setattr(player, key, value)
+        player_doc.pop('_id')
+        current.pop('_id')
+        with stage('notify'):
+            self._notify('on_player_saved', player_id, player_doc, current)
+        player_doc['id'] = player_id
         
-        # Recalculate overall score
-        player.calculate_overall_score()
+        with stage('build'):
+            return Player(**player_doc)
+
+    @staticmethod
+    def _prepare_update(current: Dict, player_data: Dict) -> Dict:
+        """
+        Validate and score a partial update against the stored document
         
-        # Save changes
-        player.save()
+        Returns:
+            The full set of fields to $set
+            
+        Raises:
+            ValidationError: If the merged player is invalid
+        """
+        # Validate the merged document so partial updates are allowed
+        merged = {field: current.get(field) for field in ('name', 'team', 'position')}
+        merged.update({
+            field: value for field, value in player_data.items()
+            if field in ('name', 'team', 'position')
+        })
+        for group in ('offense', 'defense'):
+            merged[group] = {**(current.get(group) or {}), **(player_data.get(group) or {})}
+        with stage('validate'):
+            validated_data = validate_player_data(merged)
         
-        return player
+        # Recalculate overall and position-weighted scores
+        with stage('score'):
+            ScoringService.score_player(validated_data)
+        validated_data['updated_at'] = datetime.utcnow()
+        return validated_data
 
     def delete_player(self, player_id: str) -> bool:
         """
@@ -119,8 +499,15 @@ class PlayerService:
             True if player was deleted
             
         Raises:
+            InvalidId: If player_id is not a valid ObjectId
             DoesNotExist: If player not found
         """
-        player = self.get_player(player_id)
-        player.delete()
+        with stage('db'):
+            player_doc = self.repository.delete(ObjectId(player_id))
+        if player_doc is None:
+            raise DoesNotExist(f"Player {player_id} not found")
+        
+        player_doc.pop('_id')
+        with stage('notify'):
+            self._notify('on_player_deleted', player_id, player_doc)
         return True
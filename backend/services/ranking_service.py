@@ -0,0 +1,292 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from bson import ObjectId
+from ..repositories import get_player_repository
+from ..repositories.base import PlayerRepository
+from .scoring_service import POSITIONS
+from .snapshot_service import snapshot_service
+
+# Scores are 0-100 rounded to 2 decimals, so they map exactly onto buckets
+SCORE_SCALE = 100
+MAX_BUCKET = 100 * SCORE_SCALE
+
+class RankingIndex:
+    """
+    In-memory order-statistics index over overall_score
+    
+    A Fenwick tree counts players per score bucket, ordered from the highest
+    score down, so the number of players above any score and the bucket
+    holding the k-th best player are both O(log buckets) lookups. Players
+    with equal scores share a rank.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._size = MAX_BUCKET + 1
+        self._tree = [0] * (self._size + 1)
+        self._members: Dict[int, set] = {}
+        self._buckets: Dict[str, int] = {}
+        self.loaded = False
+
+    def __len__(self):
+        return len(self._buckets)
+
+    @staticmethod
+    def _bucket(score: float) -> int:
+        return min(max(int(round(score * SCORE_SCALE)), 0), MAX_BUCKET)
+
+    @staticmethod
+    def _position(bucket: int) -> int:
+        # Fenwick positions are 1-based and run from the best score down
+        return MAX_BUCKET - bucket + 1
+
+    def _add(self, position: int, delta: int):
+        while position <= self._size:
+            self._tree[position] += delta
+            position += position & -position
+
+    def _prefix(self, position: int) -> int:
+        total = 0
+        while position > 0:
+            total += self._tree[position]
+            position -= position & -position
+        return total
+
+    def _find(self, k: int) -> int:
+        """Smallest position whose prefix count reaches k"""
+        position = 0
+        step = 1 << self._size.bit_length()
+        while step:
+            following = position + step
+            if following <= self._size and self._tree[following] < k:
+                position = following
+                k -= self._tree[following]
+            step >>= 1
+        return position + 1
+
+    def build(self, scores: Iterable[Tuple[str, float]]):
+        """Replace the index contents with (player_id, score) pairs"""
+        counts = [0] * (self._size + 1)
+        members: Dict[int, set] = {}
+        buckets: Dict[str, int] = {}
+        for player_id, score in scores:
+            bucket = self._bucket(score)
+            buckets[player_id] = bucket
+            members.setdefault(bucket, set()).add(player_id)
+        for bucket, ids in members.items():
+            counts[self._position(bucket)] = len(ids)
+
+        # Linear-time Fenwick construction from per-position counts
+        for position in range(1, self._size + 1):
+            parent = position + (position & -position)
+            if parent <= self._size:
+                counts[parent] += counts[position]
+
+        with self._lock:
+            self._tree = counts
+            self._members = members
+            self._buckets = buckets
+            self.loaded = True
+
+    def upsert(self, player_id: str, score: float):
+        """Insert a player or move them to a new score"""
+        bucket = self._bucket(score)
+        with self._lock:
+            previous = self._buckets.get(player_id)
+            if previous == bucket:
+                return
+            if previous is not None:
+                self._discard(player_id, previous)
+            self._buckets[player_id] = bucket
+            self._members.setdefault(bucket, set()).add(player_id)
+            self._add(self._position(bucket), 1)
+
+    def remove(self, player_id: str):
+        """Drop a player from the index if present"""
+        with self._lock:
+            bucket = self._buckets.pop(player_id, None)
+            if bucket is not None:
+                self._discard(player_id, bucket)
+
+    def _discard(self, player_id: str, bucket: int):
+        members = self._members[bucket]
+        members.discard(player_id)
+        if not members:
+            del self._members[bucket]
+        self._add(self._position(bucket), -1)
+
+    def rank(self, player_id: str) -> Optional[Tuple[int, float]]:
+        """Return (rank, score) for a player, or None if not indexed"""
+        with self._lock:
+            bucket = self._buckets.get(player_id)
+            if bucket is None:
+                return None
+            above = self._prefix(self._position(bucket) - 1)
+        return above + 1, bucket / SCORE_SCALE
+
+    def top(self, limit: int) -> List[Tuple[int, str, float]]:
+        """Return up to limit (rank, player_id, score) tuples, best first"""
+        results = []
+        with self._lock:
+            total = len(self._buckets)
+            while len(results) < min(limit, total):
+                rank = len(results) + 1
+                bucket = MAX_BUCKET - self._find(rank) + 1
+                score = bucket / SCORE_SCALE
+                for player_id in sorted(self._members[bucket]):
+                    if len(results) >= limit:
+                        break
+                    results.append((rank, player_id, score))
+        return results
+
+class RankingService:
+    """Keeps a RankingIndex in sync with the players collection"""
+
+    def __init__(
+        self,
+        index: Optional[RankingIndex] = None,
+        repository: Optional[PlayerRepository] = None,
+        snapshots=None
+    ):
+        self.index = index or RankingIndex()
+        self._load_lock = threading.Lock()
+        self._repository = repository
+        # SnapshotService to start from instead of scanning, when it has one
+        self.snapshots = snapshots
+
+    @property
+    def repository(self) -> PlayerRepository:
+        return self._repository if self._repository is not None else get_player_repository()
+
+    def ensure_loaded(self):
+        """Build the index from the players collection on first use"""
+        if self.index.loaded:
+            return
+        with self._load_lock:
+            if not self.index.loaded:
+                self.rebuild()
+
+    def rebuild(self):
+        """Rebuild the index from the roster snapshot, else a full scan of overall scores"""
+        loaded = self.snapshots.load(self.repository, ('overall_score',)) if self.snapshots is not None else None
+        if loaded is None:
+            cursor = self.repository.scan(('overall_score',))
+            self.index.build(
+                (str(doc['_id']), doc.get('overall_score') or 0.0)
+                for doc in cursor
+            )
+            return
+        
+        snapshot, changed, removed = loaded
+        scores = np.maximum(snapshot.overall, 0) / 100
+        self.index.build(zip(snapshot.id_strings(), scores.tolist()))
+        for doc in changed:
+            self.index.upsert(str(doc['_id']), doc.get('overall_score') or 0.0)
+        for player_id in removed:
+            self.index.remove(player_id)
+
+    def on_player_saved(self, player_id: str, doc: Dict, previous: Optional[Dict] = None):
+        if self.index.loaded:
+            self.index.upsert(player_id, doc.get('overall_score') or 0.0)
+
+    def on_player_deleted(self, player_id: str, doc: Dict):
+        if self.index.loaded:
+            self.index.remove(player_id)
+
+    def top_players(self, limit: int = 50) -> Dict:
+        """
+        Get the overall leaderboard
+        
+        Args:
+            limit: Number of players to return
+            
+        Returns:
+            Dictionary with the total player count and the top players,
+            each with rank, ID, name, team, position and overall score
+        """
+        self.ensure_loaded()
+        entries = self.index.top(limit)
+        
+        # One round trip for the display fields of the whole leaderboard
+        docs = {
+            str(doc['_id']): doc
+            for doc in self.repository.get_many(
+                [ObjectId(player_id) for _, player_id, _ in entries],
+                ('name', 'team', 'position')
+            )
+        }
+        
+        players = []
+        for rank, player_id, score in entries:
+            doc = docs.get(player_id, {})
+            players.append({
+                'rank': rank,
+                'id': player_id,
+                'name': doc.get('name'),
+                'team': doc.get('team'),
+                'position': doc.get('position'),
+                'overall_score': score
+            })
+        return {'total': len(self.index), 'players': players}
+
+    def player_rank(self, player_id: str) -> Optional[Dict]:
+        """
+        Get a player's overall rank
+        
+        Args:
+            player_id: Player's ID
+            
+        Returns:
+            Dictionary with the player's rank, score and the total player
+            count, or None if the player is not ranked
+        """
+        self.ensure_loaded()
+        result = self.index.rank(player_id)
+        if result is None:
+            return None
+        rank, score = result
+        return {'id': player_id, 'rank': rank, 'overall_score': score, 'total': len(self.index)}
+
+    def position_leaderboard(self, position: str, limit: int = 50) -> Dict:
+        """
+        Get the leaderboard for one position by position-weighted score
+        
+        Served straight from the (position, position_weighted_score)
+        index: on MongoDB the query only projects indexed fields, so it is
+        answered from the index without fetching documents.
+        
+        Args:
+            position: Position (PG, SG, SF, PF, C)
+            limit: Number of players to return
+            
+        Returns:
+            Dictionary with the position and its top players, each with
+            rank, ID, name, team and position-weighted score
+            
+        Raises:
+            ValueError: If the position is invalid
+        """
+        if position not in POSITIONS:
+            raise ValueError(f"Invalid position: {position}")
+        
+        cursor = self.repository.position_leaderboard(position, limit)
+        
+        players = []
+        for index, doc in enumerate(cursor):
+            score = doc['position_weighted_score']
+            # Players with equal scores share a rank
+            if players and players[-1]['position_weighted_score'] == score:
+                rank = players[-1]['rank']
+            else:
+                rank = index + 1
+            players.append({
+                'rank': rank,
+                'id': str(doc['_id']),
+                'name': doc.get('name'),
+                'team': doc.get('team'),
+                'position_weighted_score': score
+            })
+        return {'position': position, 'players': players}
+
+ranking_service = RankingService(snapshots=snapshot_service)
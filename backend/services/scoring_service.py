@@ -1,4 +1,106 @@
-from typing import Dict
+from typing import Dict, Iterable, Sequence, Tuple
+import numpy as np
+
+OFFENSE_FIELDS = ['shooting', 'ball_handling', 'passing', 'speed', 'finishing']
+DEFENSE_FIELDS = ['perimeter_defense', 'interior_defense', 'steal', 'block', 'rebounding']
+
+# Column order of the N x 10 stat matrices used by the batch API
+STAT_FIELDS = OFFENSE_FIELDS + DEFENSE_FIELDS
+
+POSITIONS = ['PG', 'SG', 'SF', 'PF', 'C']
+POSITION_CODES = {position: code for code, position in enumerate(POSITIONS)}
+
+# Position-specific weights for offensive and defensive attributes
+POSITION_WEIGHTS = {
+    'PG': {
+        'offense': {
+            'ball_handling': 0.3,
+            'passing': 0.3,
+            'shooting': 0.2,
+            'speed': 0.1,
+            'finishing': 0.1
+        },
+        'defense': {
+            'perimeter_defense': 0.4,
+            'steal': 0.3,
+            'interior_defense': 0.1,
+            'block': 0.1,
+            'rebounding': 0.1
+        }
+    },
+    'SG': {
+        'offense': {
+            'shooting': 0.4,
+            'ball_handling': 0.2,
+            'speed': 0.2,
+            'passing': 0.1,
+            'finishing': 0.1
+        },
+        'defense': {
+            'perimeter_defense': 0.4,
+            'steal': 0.3,
+            'interior_defense': 0.1,
+            'block': 0.1,
+            'rebounding': 0.1
+        }
+    },
+    'SF': {
+        'offense': {
+            'shooting': 0.3,
+            'finishing': 0.2,
+            'ball_handling': 0.2,
+            'speed': 0.2,
+            'passing': 0.1
+        },
+        'defense': {
+            'perimeter_defense': 0.3,
+            'interior_defense': 0.2,
+            'steal': 0.2,
+            'rebounding': 0.2,
+            'block': 0.1
+        }
+    },
+    'PF': {
+        'offense': {
+            'finishing': 0.3,
+            'shooting': 0.2,
+            'speed': 0.2,
+            'ball_handling': 0.15,
+            'passing': 0.15
+        },
+        'defense': {
+            'interior_defense': 0.3,
+            'rebounding': 0.3,
+            'block': 0.2,
+            'perimeter_defense': 0.1,
+            'steal': 0.1
+        }
+    },
+    'C': {
+        'offense': {
+            'finishing': 0.4,
+            'shooting': 0.2,
+            'passing': 0.2,
+            'ball_handling': 0.1,
+            'speed': 0.1
+        },
+        'defense': {
+            'rebounding': 0.3,
+            'interior_defense': 0.3,
+            'block': 0.3,
+            'perimeter_defense': 0.05,
+            'steal': 0.05
+        }
+    }
+}
+
+# Weight matrix (positions x stat columns) matching STAT_FIELDS, built once
+POSITION_WEIGHT_MATRIX = np.array([
+    [POSITION_WEIGHTS[position]['offense'][stat] for stat in OFFENSE_FIELDS] +
+    [POSITION_WEIGHTS[position]['defense'][stat] for stat in DEFENSE_FIELDS]
+    for position in POSITIONS
+], dtype=np.float64)
+
 
 class ScoringService:
     @staticmethod
@@ -44,90 +146,6 @@ class ScoringService:
         Returns:
             Float representing the weighted overall score (0-100)
         """
-        # Position-specific weights for offensive and defensive attributes
-        POSITION_WEIGHTS = {
-            'PG': {
-                'offense': {
-                    'ball_handling': 0.3,
-                    'passing': 0.3,
-                    'shooting': 0.2,
-                    'speed': 0.1,
-                    'finishing': 0.1
-                },
-                'defense': {
-                    'perimeter_defense': 0.4,
-                    'steal': 0.3,
-                    'interior_defense': 0.1,
-                    'block': 0.1,
-                    'rebounding': 0.1
-                }
-            },
-            'SG': {
-                'offense': {
-                    'shooting': 0.4,
-                    'ball_handling': 0.2,
-                    'speed': 0.2,
-                    'passing': 0.1,
-                    'finishing': 0.1
-                },
-                'defense': {
-                    'perimeter_defense': 0.4,
-                    'steal': 0.3,
-                    'interior_defense': 0.1,
-                    'block': 0.1,
-                    'rebounding': 0.1
-                }
-            },
-            'SF': {
-                'offense': {
-                    'shooting': 0.3,
-                    'finishing': 0.2,
-                    'ball_handling': 0.2,
-                    'speed': 0.2,
-                    'passing': 0.1
-                },
-                'defense': {
-                    'perimeter_defense': 0.3,
-                    'interior_defense': 0.2,
-                    'steal': 0.2,
-                    'rebounding': 0.2,
-                    'block': 0.1
-                }
-            },
-            'PF': {
-                'offense': {
-                    'finishing': 0.3,
-                    'shooting': 0.2,
-                    'speed': 0.2,
-                    'ball_handling': 0.15,
-                    'passing': 0.15
-                },
-                'defense': {
-                    'interior_defense': 0.3,
-                    'rebounding': 0.3,
-                    'block': 0.2,
-                    'perimeter_defense': 0.1,
-                    'steal': 0.1
-                }
-            },
-            'C': {
-                'offense': {
-                    'finishing': 0.4,
-                    'shooting': 0.2,
-                    'passing': 0.2,
-                    'ball_handling': 0.1,
-                    'speed': 0.1
-                },
-                'defense': {
-                    'rebounding': 0.3,
-                    'interior_defense': 0.3,
-                    'block': 0.3,
-                    'perimeter_defense': 0.05,
-                    'steal': 0.05
-                }
-            }
-        }
-        
         weights = POSITION_WEIGHTS.get(position)
         if not weights:
             raise ValueError(f"Invalid position: {position}")
@@ -146,3 +164,170 @@ class ScoringService:
 
         # Overall score is the average of weighted offense and defense scores
         return round((offensive_score + defensive_score) / 2, 2)
+
+    @staticmethod
+    def stats_matrix(players: Iterable[Dict]) -> np.ndarray:
+        """
+        Pack player documents into an N x 10 stat matrix
+        
+        Args:
+            players: Iterable of dictionaries with offense and defense stats
+            
+        Returns:
+            Float64 array whose columns follow STAT_FIELDS
+        """
+        rows = [
+            [player['offense'][stat] for stat in OFFENSE_FIELDS] +
+            [player['defense'][stat] for stat in DEFENSE_FIELDS]
+            for player in players
+        ]
+        return np.array(rows, dtype=np.float64).reshape(len(rows), len(STAT_FIELDS))
+
+    @staticmethod
+    def position_codes(positions: Sequence) -> np.ndarray:
+        """
+        Convert positions to integer codes indexing POSITIONS
+        
+        Args:
+            positions: Position strings (PG, SG, SF, PF, C) or integer codes
+            
+        Returns:
+            Int64 array of position codes
+            
+        Raises:
+            ValueError: If a position is unknown
+        """
+        if isinstance(positions, np.ndarray) and positions.dtype.kind in 'iu':
+            codes = positions.astype(np.int64, copy=False)
+            if codes.size and (codes.min() < 0 or codes.max() >= len(POSITIONS)):
+                raise ValueError("Position codes must be between 0 and 4")
+            return codes
+
+        try:
+            return np.fromiter(
+                (POSITION_CODES[position] for position in positions),
+                dtype=np.int64,
+                count=len(positions)
+            )
+        except KeyError as e:
+            raise ValueError(f"Invalid position: {e.args[0]}")
+
+    @staticmethod
+    def score_batch(matrix: np.ndarray, positions: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score many players at once
+        
+        Vectorized equivalent of calling calculate_overall_score and
+        calculate_position_weighted_score for every row.
+        
+        Args:
+            matrix: N x 10 array of stats in STAT_FIELDS column order
+            positions: Length-N sequence of positions or position codes
+            
+        Returns:
+            Tuple of (overall scores, position-weighted scores), both
+            float64 arrays of length N rounded to 2 decimals
+            
+        Raises:
+            ValueError: If the matrix shape or a position is invalid
+        """
+        matrix = np.asarray(matrix, dtype=np.float64)
+        if matrix.ndim != 2 or matrix.shape[1] != len(STAT_FIELDS):
+            raise ValueError(f"Expected an N x {len(STAT_FIELDS)} stat matrix, got {matrix.shape}")
+
+        codes = ScoringService.position_codes(positions)
+        if len(codes) != len(matrix):
+            raise ValueError("Stat matrix and positions must have the same length")
+
+        # Average of offense and defense means is the mean of all ten stats
+        overall = np.round(matrix.mean(axis=1), 2)
+
+        # Score every row under every position, then pick each row's own
+        by_position = matrix @ POSITION_WEIGHT_MATRIX.T
+        weighted = by_position[np.arange(len(codes)), codes] / 2
+        
+        return overall, np.round(weighted, 2)
+
+    @staticmethod
+    def score_player(player: Dict) -> Dict:
+        """
+        Store both score variants on a validated player document
+        
+        Args:
+            player: Dictionary with position, offense and defense
+            
+        Returns:
+            The same dictionary, with overall_score and
+            position_weighted_score set
+        """
+        player['overall_score'] = ScoringService.calculate_overall_score(player['offense'], player['defense'])
+        player['position_weighted_score'] = ScoringService.calculate_position_weighted_score(
+            player['offense'],
+            player['defense'],
+            player['position']
+        )
+        return player
+
+    @staticmethod
+    def score_players(players: Sequence[Dict]):
+        """
+        Store both score variants on many validated player documents
+        
+        Vectorized equivalent of calling score_player on each one.
+        
+        Args:
+            players: Sequence of dictionaries with position, offense and defense
+        """
+        if not players:
+            return
+        matrix = ScoringService.stats_matrix(players)
+        overall, weighted = ScoringService.score_batch(matrix, [player['position'] for player in players])
+        for player, score, weighted_score in zip(players, overall.tolist(), weighted.tolist()):
+            player['overall_score'] = score
+            player['position_weighted_score'] = weighted_score
+
+    @staticmethod
+    def compare(players: Sequence[Dict]) -> Dict:
+        """
+        Compare players attribute by attribute
+        
+        Every stat and both score variants are compared across the set:
+        each player's value, its difference from the first player (the
+        baseline) and its rank within the set, highest first, where tied
+        players share the best rank.
+        
+        Args:
+            players: Sequence of dictionaries with position, offense and defense
+            
+        Returns:
+            Dictionary of per-attribute comparisons keyed by attribute, each
+            with values, diffs and ranks aligned with players, plus the
+            min, max and mean of the set
+        """
+        if not players:
+            return {}
+        matrix = ScoringService.stats_matrix(players)
+        overall, weighted = ScoringService.score_batch(matrix, [player['position'] for player in players])
+        columns = np.column_stack([matrix, overall, weighted])
+        
+        # Rank = 1 + number of players with a strictly higher value
+        ordered = np.sort(columns, axis=0)
+        ranks = np.empty(columns.shape, dtype=np.int64)
+        for column in range(columns.shape[1]):
+            ranks[:, column] = len(players) - np.searchsorted(ordered[:, column], columns[:, column], side='right') + 1
+        diffs = np.round(columns - columns[0], 2)
+        means = np.round(columns.mean(axis=0), 2)
+        
+        comparison = {}
+        for column, field in enumerate(STAT_FIELDS + ['overall_score', 'position_weighted_score']):
+            values = columns[:, column]
+            integral = column < len(STAT_FIELDS)
+            comparison[field] = {
+                'values': values.astype(np.int64).tolist() if integral else values.tolist(),
+                'diffs': diffs[:, column].astype(np.int64).tolist() if integral else diffs[:, column].tolist(),
+                'ranks': ranks[:, column].tolist(),
+                'min': ordered[0, column].item(),
+                'max': ordered[-1, column].item(),
+                'mean': means[column].item()
+            }
+        return comparison
@@ -0,0 +1,461 @@
+import bisect
+import heapq
+import math
+import re
+import sys
+import threading
+import unicodedata
+from collections import Counter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from ..repositories import get_player_repository
+from ..repositories.base import PlayerRepository
+
+SEARCH_MODES = ('autocomplete', 'full')
+
+# Match quality tiers, best first
+MATCH_TIERS = ('exact', 'prefix', 'word', 'team', 'fuzzy')
+
+# Share of a query word's trigrams a name token must contain to count as a typo match
+FUZZY_THRESHOLD = 0.5
+
+# Most similar name tokens a misspelled query word expands to
+FUZZY_CANDIDATES = 32
+
+# Shorter words share too few trigrams with their intended token to correct
+FUZZY_MIN_LENGTH = 4
+
+# Query words matching at most this many keys are intersected as sets,
+# probing other words' lists up to INTERSECT_RATIO times the candidates left
+INTERSECT_LIMIT = 16384
+INTERSECT_RATIO = 16
+
+# Prefixes up to this length get their own postings lists, since they
+# match too many distinct tokens to merge per query
+PREFIX_POSTINGS_LENGTH = 3
+
+# Width of the inverted score at the start of every postings key
+SCORE_DIGITS = 5
+
+_APOSTROPHES = re.compile(r"['’]")
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, accent-folded alphanumeric tokens of text"""
+    text = _APOSTROPHES.sub('', text or '')
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(char for char in text if not unicodedata.combining(char))
+    return [sys.intern(token) for token in _TOKEN.findall(text.lower())]
+
+def trigrams(token: str, closed: bool = True) -> Set[str]:
+    """Boundary-padded trigrams of a token, without the trailing boundary when not closed"""
+    padded = f' {token} ' if closed else f' {token}'
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def posting_key(player_id: str, overall_score: Optional[float]) -> str:
+    """
+    Postings key of a player: the score in hundredths, inverted and
+    zero-padded, then the ID, so plain string order is best score first
+    and key sets hash as cheaply as strings
+    """
+    hundredths = min(max(round((overall_score or 0) * 100), 0), 10000)
+    return f'{10000 - hundredths:0{SCORE_DIGITS}d}{player_id}'
+
+def _short_prefixes(tokens: Sequence[str]) -> Set[str]:
+    return {token[:length] for token in tokens for length in range(1, min(len(token), PREFIX_POSTINGS_LENGTH) + 1)}
+
+class _Entry:
+    __slots__ = ('key', 'name', 'team', 'position', 'overall_score', 'text', 'tokens', 'team_text', 'team_tokens')
+
+class SearchIndex:
+    """
+    In-process typeahead index over player names and teams
+
+    Every name token, team token and short name prefix has a postings list
+    of posting_key() strings kept sorted, so the players matching a
+    query word come out best score first from a heap merge of a few lists
+    and a query stops as soon as it has enough results. Longer prefixes
+    bisect a sorted list of distinct tokens, and typo-tolerant lookups go
+    through trigram postings over those distinct tokens rather than over
+    players.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+        self.loaded = False
+
+    def _reset(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._names: Dict[str, List[str]] = {}
+        self._leading: Dict[str, List[str]] = {}
+        self._leading_prefixes: Dict[str, List[str]] = {}
+        self._postings: Dict[str, List[str]] = {}
+        self._prefixes: Dict[str, List[str]] = {}
+        self._team_postings: Dict[str, List[str]] = {}
+        self._leading_tokens: List[str] = []
+        self._tokens: List[str] = []
+        self._team_tokens: List[str] = []
+        self._trigrams: Dict[str, Set[str]] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _entry(player_id: str, doc: Dict) -> _Entry:
+        entry = _Entry()
+        entry.key = posting_key(player_id, doc.get('overall_score'))
+        entry.name = doc.get('name')
+        entry.team = sys.intern(doc['team']) if doc.get('team') else None
+        entry.position = sys.intern(doc['position']) if doc.get('position') else None
+        entry.overall_score = doc.get('overall_score')
+        tokens = tokenize(entry.name)
+        team_tokens = tokenize(entry.team)
+        # Space-led so a word prefix match is a single substring test
+        entry.text = ' ' + ' '.join(tokens)
+        entry.tokens = tuple(dict.fromkeys(tokens))
+        entry.team_text = ' ' + ' '.join(team_tokens)
+        entry.team_tokens = tuple(dict.fromkeys(team_tokens))
+        return entry
+
+    def _postings_of(self, entry: _Entry):
+        """Every (postings dict, sorted token list, token) the entry appears under"""
+        yield self._names, None, entry.text
+        if entry.tokens:
+            yield self._leading, self._leading_tokens, entry.tokens[0]
+            for prefix in _short_prefixes(entry.tokens[:1]):
+                yield self._leading_prefixes, None, prefix
+        for token in entry.tokens:
+            yield self._postings, self._tokens, token
+        for prefix in _short_prefixes(entry.tokens):
+            yield self._prefixes, None, prefix
+        for token in entry.team_tokens:
+            yield self._team_postings, self._team_tokens, token
+
+    def _add(self, entry: _Entry):
+        for postings, tokens, token in self._postings_of(entry):
+            keys = postings.get(token)
+            if keys is None:
+                postings[token] = [entry.key]
+                if tokens is not None:
+                    bisect.insort(tokens, token)
+                if postings is self._postings:
+                    for trigram in trigrams(token):
+                        self._trigrams.setdefault(trigram, set()).add(token)
+            else:
+                bisect.insort(keys, entry.key)
+
+    def _discard(self, entry: _Entry):
+        for postings, tokens, token in self._postings_of(entry):
+            keys = postings.get(token)
+            if keys is None:
+                continue
+            position = bisect.bisect_left(keys, entry.key)
+            if position < len(keys) and keys[position] == entry.key:
+                del keys[position]
+            if keys:
+                continue
+            del postings[token]
+            if tokens is not None:
+                del tokens[bisect.bisect_left(tokens, token)]
+            if postings is self._postings:
+                for trigram in trigrams(token):
+                    self._trigrams[trigram].discard(token)
+
+    def build(self, docs: Iterable[Tuple[str, Dict]]):
+        """Replace the index contents with (player_id, doc) pairs"""
+        with self._lock:
+            self._reset()
+            for player_id, doc in docs:
+                entry = self._entry(player_id, doc)
+                self._entries[player_id] = entry
+                for postings, _, token in self._postings_of(entry):
+                    postings.setdefault(token, []).append(entry.key)
+            for postings in (
+                self._names, self._leading, self._leading_prefixes,
+                self._postings, self._prefixes, self._team_postings
+            ):
+                for keys in postings.values():
+                    keys.sort()
+            self._leading_tokens = sorted(self._leading)
+            self._tokens = sorted(self._postings)
+            self._team_tokens = sorted(self._team_postings)
+            for token in self._tokens:
+                for trigram in trigrams(token):
+                    self._trigrams.setdefault(trigram, set()).add(token)
+            self.loaded = True
+
+    def upsert(self, player_id: str, doc: Dict):
+        """Add a player or replace its name, team and score"""
+        entry = self._entry(player_id, doc)
+        with self._lock:
+            previous = self._entries.pop(player_id, None)
+            if previous is not None:
+                self._discard(previous)
+            self._entries[player_id] = entry
+            self._add(entry)
+
+    def remove(self, player_id: str):
+        """Remove a player if present"""
+        with self._lock:
+            previous = self._entries.pop(player_id, None)
+            if previous is not None:
+                self._discard(previous)
+
+    @staticmethod
+    def _with_prefix(
+        postings: Dict[str, List],
+        tokens: List[str],
+        prefixes: Optional[Dict[str, List]],
+        word: str
+    ) -> List[List]:
+        """Postings lists that together hold every key under a token starting with word"""
+        if prefixes is not None and len(word) <= PREFIX_POSTINGS_LENGTH:
+            return [prefixes[word]] if word in prefixes else []
+        start = bisect.bisect_left(tokens, word)
+        end = bisect.bisect_left(tokens, word + '\uffff', start)
+        return [postings[token] for token in tokens[start:end]]
+
+    def _fuzzy(self, word: str, closed: bool) -> Set[str]:
+        """Distinct name tokens sharing most of the trigrams of a possibly misspelled word"""
+        query = sorted(trigrams(word, closed), key=lambda trigram: len(self._trigrams.get(trigram, ())))
+        needed = max(1, math.ceil(FUZZY_THRESHOLD * len(query)))
+        # A token sharing `needed` trigrams must have one of the rarest len - needed + 1
+        candidates = set().union(*(self._trigrams.get(trigram, ()) for trigram in query[:len(query) - needed + 1]))
+        shared = Counter()
+        for trigram in query:
+            shared.update(candidates.intersection(self._trigrams.get(trigram, ())))
+        scored = [
+            (-count, abs(len(candidate) - len(word)), candidate)
+            for candidate, count in shared.items() if count >= needed
+        ]
+        return {candidate for _, _, candidate in heapq.nsmallest(FUZZY_CANDIDATES, scored)}
+
+    @staticmethod
+    def _stream(lists: Sequence[List]) -> Iterator[str]:
+        """Keys in any of the postings lists, best score first, without repeats"""
+        if len(lists) == 1:
+            yield from lists[0]
+            return
+        seen = set()
+        for key in heapq.merge(*lists):
+            if key not in seen:
+                seen.add(key)
+                yield key
+
+    @staticmethod
+    def _ordered(keys: Set[str]) -> Iterator[str]:
+        """Keys best score first, paying for the order only as far as it is consumed"""
+        heap = list(keys)
+        heapq.heapify(heap)
+        while heap:
+            yield heapq.heappop(heap)
+
+    def _collect(
+        self,
+        sources: Sequence[Tuple[List[List], str, Set[str]]],
+        field: str,
+        tier: str,
+        limit: int,
+        results: List[Tuple[str, str]],
+        seen: Set[str],
+        check: Optional[Callable[[_Entry], bool]] = None
+    ):
+        """
+        Add the keys of players matching every (postings lists, word, extra
+        tokens) source to results and seen, best score first
+
+        A player matches a source if one of the words of its field starts
+        with the source word or is one of the extra tokens, and must also
+        pass check if given.
+        """
+        if len(results) >= limit or not all(lists for lists, _, _ in sources):
+            return
+        sizes = [sum(map(len, lists)) for lists, _, _ in sources]
+        order = sorted(range(len(sources)), key=sizes.__getitem__)
+        # Drive from the most selective query word
+        driver, others = sources[order[0]], [sources[i] for i in order[1:]]
+        if others and sizes[order[0]] <= INTERSECT_LIMIT:
+            # A sparse intersection would drain the whole merge, so intersect
+            # key sets instead and only filter the words too common to probe
+            matched = set().union(*driver[0])
+            matched.difference_update(seen)
+            remaining = []
+            for i in order[1:]:
+                # Probing a long list costs more than filtering the few candidates left
+                if sizes[i] > INTERSECT_RATIO * len(matched):
+                    remaining.append(sources[i])
+                    continue
+                narrowed = set()
+                for keys in sources[i][0]:
+                    narrowed.update(matched.intersection(keys))
+                matched = narrowed
+            candidates = self._ordered(matched)
+            others = remaining
+        else:
+            candidates = self._stream(driver[0])
+        needles = [(' ' + word, extra) for _, word, extra in others]
+        for key in candidates:
+            if key in seen:
+                continue
+            if needles or check is not None:
+                entry = self._entries[key[SCORE_DIGITS:]]
+                text = getattr(entry, field)
+                if not all(needle in text or (extra and not extra.isdisjoint(entry.tokens)) for needle, extra in needles):
+                    continue
+                if check is not None and not check(entry):
+                    continue
+            seen.add(key)
+            results.append((key, tier))
+            if len(results) >= limit:
+                return
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[Dict, str]]:
+        """
+        Find players whose name or team matches a partial query
+
+        Results come in MATCH_TIERS order (exact name, name prefix, every
+        query word prefixing a name word, team, then typo-tolerant name
+        matches) and by overall score within a tier. Every query word is
+        matched as a prefix, so the query can be searched as it is typed,
+        and words that prefix no known name token are matched by trigram
+        similarity instead.
+        """
+        words = tokenize(query)
+        if not words:
+            return []
+        text = ' ' + ' '.join(words)
+        none = set()
+
+        with self._lock:
+            results: List[Tuple[str, str]] = []
+            # Postings keys already placed, so no player shows up in two tiers
+            seen: Set[str] = set()
+
+            for key in self._names.get(text, [])[:limit]:
+                seen.add(key)
+                results.append((key, 'exact'))
+
+            sources = [
+                (self._with_prefix(self._postings, self._tokens, self._prefixes, word), word, none)
+                for word in words
+            ]
+
+            # The first word is complete once another follows it, and then the
+            # rest must continue the name in order
+            if len(words) == 1:
+                leading = self._with_prefix(self._leading, self._leading_tokens, self._leading_prefixes, words[0])
+                self._collect([(leading, words[0], none)], 'text', 'prefix', limit, results, seen)
+            else:
+                leading = [self._leading[words[0]]] if words[0] in self._leading else []
+                self._collect(
+                    [(leading, words[0], none)] + sources[1:], 'text', 'prefix', limit, results, seen,
+                    check=lambda entry: entry.text.startswith(text)
+                )
+            self._collect(sources, 'text', 'word', limit, results, seen)
+
+            team_sources = [
+                (self._with_prefix(self._team_postings, self._team_tokens, None, word), word, none)
+                for word in words
+            ]
+            self._collect(team_sources, 'team_text', 'team', limit, results, seen)
+
+            # Only correct words no name token starts with, one at a time so
+            # the others still narrow the candidates
+            for i, word in enumerate(words):
+                if len(results) >= limit:
+                    break
+                if len(word) < FUZZY_MIN_LENGTH or sources[i][0]:
+                    continue
+                extra = self._fuzzy(word, closed=i < len(words) - 1)
+                fuzzy_sources = list(sources)
+                fuzzy_sources[i] = ([self._postings[token] for token in extra], word, extra)
+                self._collect(fuzzy_sources, 'text', 'fuzzy', limit, results, seen)
+
+            matches = []
+            for key, tier in results:
+                player_id = key[SCORE_DIGITS:]
+                entry = self._entries[player_id]
+                matches.append(({
+                    'id': player_id,
+                    'name': entry.name,
+                    'team': entry.team,
+                    'position': entry.position,
+                    'overall_score': entry.overall_score
+                }, tier))
+            return matches
+
+class SearchService:
+    """Keeps a SearchIndex in sync with the players collection"""
+
+    def __init__(self, index: Optional[SearchIndex] = None, repository: Optional[PlayerRepository] = None):
+        self.index = index or SearchIndex()
+        self._load_lock = threading.Lock()
+        self._repository = repository
+
+    @property
+    def repository(self) -> PlayerRepository:
+        return self._repository if self._repository is not None else get_player_repository()
+
+    def ensure_loaded(self):
+        """Build the index from the players collection on first use"""
+        if self.index.loaded:
+            return
+        with self._load_lock:
+            if not self.index.loaded:
+                self.rebuild()
+
+    def rebuild(self):
+        """Rebuild the index from a full scan of names, teams and scores"""
+        docs = self.repository.scan(('name', 'team', 'position', 'overall_score'))
+        self.index.build((str(doc['_id']), doc) for doc in docs)
+
+    def on_player_saved(self, player_id: str, doc: Dict, previous: Optional[Dict] = None):
+        if self.index.loaded:
+            self.index.upsert(player_id, doc)
+
+    def on_player_deleted(self, player_id: str, doc: Dict):
+        if self.index.loaded:
+            self.index.remove(player_id)
+
+    def search(self, query: str, limit: int = 10, mode: str = 'autocomplete') -> Dict:
+        """
+        Search players by name and team
+
+        Args:
+            query: Search text
+            limit: Maximum number of players to return
+            mode: autocomplete for prefix and typo-tolerant matching as the
+                query is typed, or full to match complete words (through the
+                text index on MongoDB)
+
+        Returns:
+            Dictionary with the query, the mode and the matching players,
+            each with ID, name, team, position, overall score and how it
+            matched
+
+        Raises:
+            ValueError: If the mode is invalid
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Invalid mode: {mode}. Must be one of {', '.join(SEARCH_MODES)}")
+
+        players = []
+        if mode == 'full':
+            for doc in self.repository.text_search(query, limit):
+                players.append({
+                    'id': str(doc['_id']),
+                    'name': doc.get('name'),
+                    'team': doc.get('team'),
+                    'position': doc.get('position'),
+                    'overall_score': doc.get('overall_score'),
+                    'match': 'text'
+                })
+        else:
+            self.ensure_loaded()
+            for player, tier in self.index.search(query, limit):
+                player['match'] = tier
+                players.append(player)
+        return {'query': query, 'mode': mode, 'players': players}
+
+search_service = SearchService()
@@ -0,0 +1,255 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from bson import ObjectId
+from ..repositories import get_player_repository
+from ..repositories.base import PlayerRepository
+from .scoring_service import ScoringService, STAT_FIELDS, POSITIONS, POSITION_CODES
+from .snapshot_service import snapshot_service
+
+METRICS = ('cosine', 'euclidean')
+
+class SimilarityIndex:
+    """
+    Brute-force k-nearest-neighbour index over player stat vectors
+    
+    Vectors live in one float32 matrix stored stat-major (one contiguous
+    row per stat in STAT_FIELDS order, one column per player), which keeps
+    the query dot products streaming through memory. The matrix grows by
+    doubling and deletes move the last column into the hole, so live
+    players are always columns [:len(index)]. A query is a single
+    vectorized distance computation plus an argpartition.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._lock = threading.Lock()
+        self._vectors = np.zeros((len(STAT_FIELDS), capacity), dtype=np.float32)
+        self._norms = np.zeros(capacity, dtype=np.float32)
+        self._positions = np.zeros(capacity, dtype=np.int8)
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self.loaded = False
+
+    def __len__(self):
+        return len(self._ids)
+
+    def build(self, ids: Sequence[str], vectors: np.ndarray, positions: np.ndarray):
+        """Replace the index contents"""
+        count = len(ids)
+        capacity = max(1024, 1 << max(count - 1, 0).bit_length())
+        matrix = np.zeros((len(STAT_FIELDS), capacity), dtype=np.float32)
+        matrix[:, :count] = np.asarray(vectors).T
+        norms = np.zeros(capacity, dtype=np.float32)
+        norms[:count] = np.linalg.norm(matrix[:, :count], axis=0)
+        codes = np.zeros(capacity, dtype=np.int8)
+        codes[:count] = positions
+        with self._lock:
+            self._vectors, self._norms, self._positions = matrix, norms, codes
+            self._ids = list(ids)
+            self._rows = {player_id: row for row, player_id in enumerate(self._ids)}
+            self.loaded = True
+
+    def _grow(self):
+        capacity = len(self._norms) * 2
+        for name in ('_vectors', '_norms', '_positions'):
+            current = getattr(self, name)
+            grown = np.zeros(current.shape[:-1] + (capacity,), dtype=current.dtype)
+            grown[..., :current.shape[-1]] = current
+            setattr(self, name, grown)
+
+    def upsert(self, player_id: str, vector: Sequence[float], position: str):
+        """Insert or replace a player's vector"""
+        with self._lock:
+            row = self._rows.get(player_id)
+            if row is None:
+                row = len(self._ids)
+                if row == len(self._norms):
+                    self._grow()
+                self._ids.append(player_id)
+                self._rows[player_id] = row
+            self._vectors[:, row] = vector
+            self._norms[row] = np.linalg.norm(self._vectors[:, row])
+            self._positions[row] = POSITION_CODES[position]
+
+    def remove(self, player_id: str):
+        """Drop a player if present"""
+        with self._lock:
+            row = self._rows.pop(player_id, None)
+            if row is None:
+                return
+            last = len(self._ids) - 1
+            last_id = self._ids.pop()
+            if row != last:
+                self._vectors[:, row] = self._vectors[:, last]
+                self._norms[row] = self._norms[last]
+                self._positions[row] = self._positions[last]
+                self._ids[row] = last_id
+                self._rows[last_id] = row
+
+    def nearest(
+        self,
+        player_id: str,
+        k: int = 10,
+        metric: str = 'cosine',
+        position: Optional[str] = None
+    ) -> Optional[List[Tuple[str, float]]]:
+        """
+        Find the k players closest to player_id
+        
+        Returns:
+            List of (player_id, distance) pairs, closest first, or None if
+            player_id is not indexed. Cosine distance is 1 - cosine
+            similarity.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Invalid metric. Allowed: {METRICS}")
+        with self._lock:
+            row = self._rows.get(player_id)
+            if row is None:
+                return None
+            count = len(self._ids)
+            vectors = self._vectors[:, :count]
+            dots = vectors[:, row] @ vectors
+
+            if metric == 'cosine':
+                norms = self._norms[:count]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    distances = 1 - dots / (norms * self._norms[row])
+                # All-zero vectors have no direction; treat them as unrelated
+                if not self._norms[row] or not norms.all():
+                    distances[np.isnan(distances)] = 1.0
+            else:
+                # |v - q|^2 = |v|^2 - 2 v.q + |q|^2 avoids an N x 10 temporary
+                norms = self._norms[:count]
+                squared = np.square(norms) - 2 * dots + np.square(self._norms[row])
+                distances = np.sqrt(np.maximum(squared, 0))
+
+            # Exclude the player and other positions by pushing them to +inf
+            distances[row] = np.inf
+            if position is not None:
+                distances = np.where(self._positions[:count] == POSITION_CODES[position], distances, np.inf)
+
+            k = min(k, count)
+            if k == 0:
+                return []
+            nearest = np.argpartition(distances, k - 1)[:k]
+            nearest = nearest[np.argsort(distances[nearest], kind='stable')]
+            return [
+                (self._ids[i], float(distances[i]))
+                for i in nearest
+                if np.isfinite(distances[i])
+            ]
+
+class SimilarityService:
+    """Keeps a SimilarityIndex in sync with the players collection"""
+
+    def __init__(
+        self,
+        index: Optional[SimilarityIndex] = None,
+        repository: Optional[PlayerRepository] = None,
+        snapshots=None
+    ):
+        self.index = index or SimilarityIndex()
+        self._load_lock = threading.Lock()
+        self._repository = repository
+        # SnapshotService to start from instead of scanning, when it has one
+        self.snapshots = snapshots
+
+    @property
+    def repository(self) -> PlayerRepository:
+        return self._repository if self._repository is not None else get_player_repository()
+
+    def ensure_loaded(self):
+        """Build the index from the players collection on first use"""
+        if self.index.loaded:
+            return
+        with self._load_lock:
+            if not self.index.loaded:
+                self.rebuild()
+
+    def rebuild(self):
+        """Rebuild the index from the roster snapshot, else a full scan of player stats"""
+        fields = ('position', 'offense', 'defense')
+        loaded = self.snapshots.load(self.repository, fields) if self.snapshots is not None else None
+        if loaded is None:
+            docs = list(self.repository.scan(fields))
+            self.index.build(
+                [str(doc['_id']) for doc in docs],
+                ScoringService.stats_matrix(docs),
+                ScoringService.position_codes([doc['position'] for doc in docs])
+            )
+            return
+        
+        # The snapshot's stat-major columns are the index's own layout
+        snapshot, changed, removed = loaded
+        self.index.build(snapshot.id_strings(), snapshot.stats.T, snapshot.positions)
+        if changed:
+            vectors = ScoringService.stats_matrix(changed)
+            for doc, vector in zip(changed, vectors):
+                self.index.upsert(str(doc['_id']), vector, doc['position'])
+        for player_id in removed:
+            self.index.remove(player_id)
+
+    def on_player_saved(self, player_id: str, doc: Dict, previous: Optional[Dict] = None):
+        if self.index.loaded:
+            self.index.upsert(player_id, ScoringService.stats_matrix([doc])[0], doc['position'])
+
+    def on_player_deleted(self, player_id: str, doc: Dict):
+        if self.index.loaded:
+            self.index.remove(player_id)
+
+    def similar_players(
+        self,
+        player_id: str,
+        k: int = 10,
+        metric: str = 'cosine',
+        position: Optional[str] = None
+    ) -> Optional[Dict]:
+        """
+        Find the players whose stat vectors are closest to a player's
+        
+        Args:
+            player_id: Player's ID
+            k: Number of similar players to return
+            metric: cosine or euclidean
+            position: Optional position the results must play
+            
+        Returns:
+            Dictionary with the query and the similar players, each with
+            ID, name, team, position, overall score and distance, or None
+            if the player is unknown
+            
+        Raises:
+            ValueError: If the metric or position is invalid
+        """
+        if position is not None and position not in POSITIONS:
+            raise ValueError(f"Invalid position: {position}")
+        
+        self.ensure_loaded()
+        matches = self.index.nearest(player_id, k, metric, position)
+        if matches is None:
+            return None
+        
+        # One round trip for the display fields of every match
+        docs = {
+            str(doc['_id']): doc
+            for doc in self.repository.get_many(
+                [ObjectId(match_id) for match_id, _ in matches],
+                ('name', 'team', 'position', 'overall_score')
+            )
+        }
+        
+        players = []
+        for match_id, distance in matches:
+            doc = docs.get(match_id, {})
+            players.append({
+                'id': match_id,
+                'name': doc.get('name'),
+                'team': doc.get('team'),
+                'position': doc.get('position'),
+                'overall_score': doc.get('overall_score'),
+                'distance': round(distance, 6)
+            })
+        return {'id': player_id, 'metric': metric, 'players': players}
+
+similarity_service = SimilarityService(snapshots=snapshot_service)
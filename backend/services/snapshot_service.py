@@ -0,0 +1,227 @@
+import mmap
+import os
+import struct
+import tempfile
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from ..repositories import get_player_repository
+from ..repositories.base import PlayerRepository
+from .scoring_service import ScoringService, STAT_FIELDS
+
+# Bumped whenever the file layout changes; older files are ignored
+FORMAT_VERSION = 1
+MAGIC = b'RSNP'
+
+# magic, format version, stat count, players, history seq, taken at
+# (microseconds since the Unix epoch, UTC), padded to one section
+HEADER = struct.Struct('<4sHHQQq')
+SECTION_ALIGNMENT = 64
+EPOCH = datetime(1970, 1, 1)
+
+SNAPSHOT_FIELDS = ('position', 'offense', 'defense', 'overall_score', 'position_weighted_score')
+
+# Players re-read per query while replaying changes
+REPLAY_BATCH_SIZE = 1000
+
+class RosterSnapshot(NamedTuple):
+    """
+    A roster snapshot's columns, as read-only views over the mapped file
+    
+    Rows are sorted by ID. Scores are in hundredths, -1 where a player
+    had none.
+    """
+    seq: int
+    taken_at: datetime
+    ids: np.ndarray         # (n,) 'S12' ObjectId bytes
+    stats: np.ndarray       # (10, n) uint8, one row per stat in STAT_FIELDS order
+    overall: np.ndarray     # (n,) int32
+    weighted: np.ndarray    # (n,) int32
+    positions: np.ndarray   # (n,) int8 POSITION_CODES
+
+    def id_strings(self) -> List[str]:
+        """Hex strings of the IDs, as the in-process indexes key players"""
+        hexed = self.ids.tobytes().hex()
+        return [hexed[offset:offset + 24] for offset in range(0, len(hexed), 24)]
+
+def _aligned(offset: int) -> int:
+    return -(-offset // SECTION_ALIGNMENT) * SECTION_ALIGNMENT
+
+def _layout(count: int) -> Tuple[Dict[str, Tuple[int, np.dtype, tuple]], int]:
+    """Offset, dtype and shape of every column for count players, and the file size"""
+    columns = (
+        ('ids', np.dtype('S12'), (count,)),
+        ('stats', np.dtype(np.uint8), (len(STAT_FIELDS), count)),
+        ('overall', np.dtype('<i4'), (count,)),
+        ('weighted', np.dtype('<i4'), (count,)),
+        ('positions', np.dtype(np.int8), (count,))
+    )
+    layout = {}
+    offset = SECTION_ALIGNMENT
+    for name, dtype, shape in columns:
+        layout[name] = (offset, dtype, shape)
+        offset = _aligned(offset + dtype.itemsize * int(np.prod(shape)))
+    return layout, offset
+
+def _hundredths(values: List[Optional[float]]) -> np.ndarray:
+    scores = np.array([-1.0 if value is None else value for value in values], dtype=np.float64)
+    return np.where(scores < 0, -1, np.rint(scores * 100)).astype('<i4')
+
+def write_snapshot(path: str, docs: List[Dict], seq: int, taken_at: datetime):
+    """
+    Write players as a roster snapshot file, atomically replacing path
+    
+    Args:
+        path: File to write
+        docs: Player documents with _id and the SNAPSHOT_FIELDS
+        seq: Last rank history seq reflected in docs
+        taken_at: Naive UTC time the documents were read
+    """
+    docs = sorted(docs, key=lambda doc: doc['_id'].binary)
+    count = len(docs)
+    layout, size = _layout(count)
+    columns = {
+        'ids': np.array([doc['_id'].binary for doc in docs], dtype='S12'),
+        'stats': ScoringService.stats_matrix(docs).T.astype(np.uint8),
+        'overall': _hundredths([doc.get('overall_score') for doc in docs]),
+        'weighted': _hundredths([doc.get('position_weighted_score') for doc in docs]),
+        'positions': ScoringService.position_codes([doc['position'] for doc in docs]).astype(np.int8)
+    }
+    micros = (taken_at - EPOCH) // timedelta(microseconds=1)
+    
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temporary = tempfile.mkstemp(dir=directory, prefix='.roster-', suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as out:
+            out.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(STAT_FIELDS), count, seq, micros))
+            for name, (offset, dtype, shape) in layout.items():
+                out.seek(offset)
+                out.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+            out.truncate(size)
+        # Readers map either the old file or the new one, never half of one
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+def read_snapshot(path: str) -> RosterSnapshot:
+    """
+    Map a roster snapshot file, without copying its columns
+    
+    Raises:
+        OSError: If the file cannot be opened
+        ValueError: If it is not a snapshot in this format version
+    """
+    with open(path, 'rb') as handle:
+        size = os.fstat(handle.fileno()).st_size
+        if size < SECTION_ALIGNMENT:
+            raise ValueError(f"Not a roster snapshot: {path}")
+        # The mapping outlives the file handle and is released with the arrays
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    magic, version, stats, count, seq, micros = HEADER.unpack_from(mapped)
+    if magic != MAGIC:
+        raise ValueError(f"Not a roster snapshot: {path}")
+    if version != FORMAT_VERSION or stats != len(STAT_FIELDS):
+        raise ValueError(f"Roster snapshot {path} has format {version}, expected {FORMAT_VERSION}")
+    layout, expected = _layout(count)
+    if size != expected:
+        raise ValueError(f"Roster snapshot {path} is truncated")
+    
+    columns = {
+        name: np.frombuffer(mapped, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
+        for name, (offset, dtype, shape) in layout.items()
+    }
+    return RosterSnapshot(seq, EPOCH + timedelta(microseconds=micros), **columns)
+
+class SnapshotService:
+    """
+    Columnar roster snapshots for starting the in-process indexes
+    
+    A snapshot holds every player's ID, position code, ten stats and two
+    scores as flat columns in one file, along with the rank history seq
+    it reflects. Workers map the file instead of scanning the players
+    collection, so the pages are shared between every process on the
+    host, then re-read only the players the history log shows changed
+    since. The log covers every write made through PlayerService; a
+    snapshot that the log cannot bring up to date is not used.
+    """
+
+    def __init__(self, path: Optional[str] = None, repository: Optional[PlayerRepository] = None):
+        self._path = path
+        self._repository = repository
+        self._mapped: Optional[Tuple[tuple, RosterSnapshot]] = None
+
+    @property
+    def repository(self) -> PlayerRepository:
+        return self._repository if self._repository is not None else get_player_repository()
+
+    @property
+    def path(self) -> Optional[str]:
+        """The path given at construction, else the ROSTER_SNAPSHOT_PATH setting"""
+        if self._path is not None:
+            return self._path
+        from ..db import _setting
+        
+        return _setting('ROSTER_SNAPSHOT_PATH')
+
+    def write(self) -> RosterSnapshot:
+        """Snapshot the repository's players to path"""
+        path = self.path
+        if not path:
+            raise ValueError("No snapshot path: set ROSTER_SNAPSHOT_PATH")
+        repository = self.repository
+        # Changes logged during the scan have later seqs and are replayed on top
+        seq = repository.last_history_seq()
+        taken_at = datetime.utcnow()
+        write_snapshot(path, list(repository.scan(SNAPSHOT_FIELDS)), seq, taken_at)
+        return self.snapshot()
+
+    def snapshot(self) -> Optional[RosterSnapshot]:
+        """The mapped snapshot file, mapped again only when it was replaced, or None without one"""
+        path = self.path
+        if not path:
+            return None
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        key = (path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        mapped = self._mapped
+        if mapped is None or mapped[0] != key:
+            mapped = self._mapped = (key, read_snapshot(path))
+        return mapped[1]
+
+    def load(self, repository: PlayerRepository, fields=SNAPSHOT_FIELDS) -> Optional[Tuple[RosterSnapshot, List[Dict], List[str]]]:
+        """
+        The snapshot and the changes the history log shows since it was taken
+        
+        Args:
+            repository: Repository whose players the snapshot is of
+            fields: Fields to read for the changed players
+            
+        Returns:
+            Tuple of (snapshot, documents of the players changed or added
+            since, IDs of the players deleted since), or None if there is
+            no snapshot, or replaying the log would take longer than a scan
+        """
+        snapshot = self.snapshot()
+        if snapshot is None or snapshot.seq > repository.last_history_seq():
+            # A log that was reset cannot say what changed since
+            return None
+        
+        touched = {}
+        for event in repository.history_events(snapshot.seq):
+            touched[event.player_id.binary] = event.player_id
+            if len(touched) > len(snapshot.ids):
+                return None
+        player_ids = list(touched.values())
+        
+        changed = []
+        for offset in range(0, len(player_ids), REPLAY_BATCH_SIZE):
+            changed.extend(repository.get_many(player_ids[offset:offset + REPLAY_BATCH_SIZE], fields))
+        present = {doc['_id'].binary for doc in changed}
+        removed = [str(player_id) for binary, player_id in touched.items() if binary not in present]
+        return snapshot, changed, removed
+
+snapshot_service = SnapshotService()
@@ -0,0 +1,316 @@
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from bson import ObjectId
+from ..repositories import get_player_repository
+from ..repositories.base import PlayerRepository, TEAM_SCOPE_PREFIX
+from ..repositories.mongo import MongoPlayerRepository
+from .scoring_service import OFFENSE_FIELDS, DEFENSE_FIELDS, STAT_FIELDS, POSITIONS
+
+LEAGUE_ID = 'league'
+
+# Bumped whenever the aggregate layout changes, forcing a rebuild
+STATS_VERSION = 2
+
+# Percentile cut points reported with each distribution
+DISTRIBUTION_PERCENTILES = (10, 25, 50, 75, 90)
+
+# Aggregate documents are current when the league document has this version
+BUILT_QUERY = {'_id': LEAGUE_ID, 'version': STATS_VERSION}
+
+def team_stats_id(team: str) -> str:
+    return f'{TEAM_SCOPE_PREFIX}{team}'
+
+def position_stats_id(position: str) -> str:
+    return f'position:{position}'
+
+class StatsService:
+    """
+    League-wide, per-team and per-position aggregates kept by the player
+    repository (the team_stats collection on MongoDB)
+    
+    Each aggregate document holds the player count, counts per position,
+    the running sum of overall_score and, per attribute, the running sum
+    and a count per value (stats are ints from 0 to 100). Means come from
+    the sums, min/max and percentiles from the value counts, so every write
+    is a handful of $inc updates and deletes never force a rescan. The full
+    pass over the players only runs in rebuild().
+    """
+
+    def __init__(self, repository: Optional[PlayerRepository] = None):
+        self._build_lock = threading.Lock()
+        self._built = False
+        self._repository = repository
+
+    @property
+    def repository(self) -> PlayerRepository:
+        return self._repository if self._repository is not None else get_player_repository()
+
+    @staticmethod
+    def _delta(doc: Dict, sign: int, deltas: Dict[str, Dict]):
+        """Add the $inc contributions of one player to deltas, per aggregate document"""
+        stats = [(field, doc['offense'][field]) for field in OFFENSE_FIELDS]
+        stats += [(field, doc['defense'][field]) for field in DEFENSE_FIELDS]
+        for scope in (LEAGUE_ID, team_stats_id(doc['team']), position_stats_id(doc['position'])):
+            inc = deltas[scope]
+            inc['count'] = inc.get('count', 0) + sign
+            key = f"positions.{doc['position']}"
+            inc[key] = inc.get(key, 0) + sign
+            inc['overall_score_sum'] = inc.get('overall_score_sum', 0) + sign * (doc.get('overall_score') or 0)
+            for field, value in stats:
+                key = f'sums.{field}'
+                inc[key] = inc.get(key, 0) + sign * value
+                key = f'hist.{field}.{value}'
+                inc[key] = inc.get(key, 0) + sign
+
+    @staticmethod
+    def _increments(added: Iterable[Dict] = (), removed: Iterable[Dict] = ()) -> Dict[str, Dict]:
+        """The $inc of every aggregate document the players are added to or removed from"""
+        deltas = defaultdict(dict)
+        for doc in removed:
+            StatsService._delta(doc, -1, deltas)
+        for doc in added:
+            StatsService._delta(doc, 1, deltas)
+        
+        increments = {}
+        for scope, inc in deltas.items():
+            inc = {key: value for key, value in inc.items() if value}
+            if inc:
+                increments[scope] = inc
+        return increments
+
+    def _apply(self, increments: Dict[str, Dict]):
+        if increments:
+            self.repository.increment_aggregates(increments)
+
+    def on_player_saved(self, player_id: str, doc: Dict, previous: Optional[Dict] = None):
+        if self.ensure_built():
+            return
+        self._apply(self._increments(added=[doc], removed=[previous] if previous is not None else []))
+
+    def on_players_created(self, created: List[Tuple[str, Dict]]):
+        if self.ensure_built():
+            return
+        self._apply(self._increments(added=[doc for _, doc in created]))
+
+    def on_player_deleted(self, player_id: str, doc: Dict):
+        if self.ensure_built():
+            return
+        self._apply(self._increments(removed=[doc]))
+
+    def ensure_built(self) -> bool:
+        """
+        Rebuild the aggregates once if they have never been computed
+        
+        Returns:
+            True if a rebuild ran, in which case it already reflects every
+            write made so far
+        """
+        if self._built:
+            return False
+        with self._build_lock:
+            if self._built:
+                return False
+            league = self.repository.get_aggregates([LEAGUE_ID], ('version',)).get(LEAGUE_ID, {})
+            rebuilt = league.get('version') != STATS_VERSION
+            if rebuilt:
+                self.rebuild()
+            self._built = True
+            return rebuilt
+
+    def rebuild(self, db=None):
+        """
+        Recompute every aggregate document from a full pass over the players
+        
+        Args:
+            db: Optional MongoDB database to rebuild instead of the
+                repository's
+        """
+        repository = MongoPlayerRepository(db) if db is not None else self.repository
+        aggregates = self._aggregate(*repository.aggregate_groups())
+        repository.replace_aggregates(aggregates)
+        self._built = True
+
+    @staticmethod
+    def _aggregate(groups: Iterable[Dict], values: Iterable[Dict]) -> Dict[str, Dict]:
+        """Fold the PlayerRepository.aggregate_groups() counts into aggregate documents"""
+        aggregates = defaultdict(lambda: {
+            'count': 0,
+            'positions': {},
+            'overall_score_sum': 0.0,
+            'sums': {},
+            'hist': {}
+        })
+        
+        for group in groups:
+            team, position = group['_id']['team'], group['_id']['position']
+            for scope in (LEAGUE_ID, team_stats_id(team), position_stats_id(position)):
+                aggregate = aggregates[scope]
+                aggregate['team'] = team if scope.startswith('team:') else None
+                aggregate['count'] += group['count']
+                aggregate['positions'][position] = aggregate['positions'].get(position, 0) + group['count']
+                aggregate['overall_score_sum'] += group['overall_score_sum']
+        
+        for group in values:
+            key = group['_id']
+            team, position, field, value = key['team'], key['position'], key['field'], key['value']
+            if field not in STAT_FIELDS:
+                continue
+            for scope in (LEAGUE_ID, team_stats_id(team), position_stats_id(position)):
+                aggregate = aggregates[scope]
+                aggregate['sums'][field] = aggregate['sums'].get(field, 0) + value * group['count']
+                hist = aggregate['hist'].setdefault(field, {})
+                hist[str(value)] = hist.get(str(value), 0) + group['count']
+        
+        aggregates[LEAGUE_ID]['team'] = None
+        aggregates[LEAGUE_ID]['version'] = STATS_VERSION
+        return aggregates
+
+    @staticmethod
+    def _summarize(doc: Dict) -> Dict:
+        """Turn an aggregate document into counts and mean/min/max per attribute"""
+        count = doc.get('count', 0)
+        attributes = {}
+        for field in STAT_FIELDS:
+            present = [int(value) for value, n in doc.get('hist', {}).get(field, {}).items() if n > 0]
+            attributes[field] = {
+                'mean': round(doc.get('sums', {}).get(field, 0) / count, 2) if count else None,
+                'min': min(present) if present else None,
+                'max': max(present) if present else None
+            }
+        return {
+            'total_players': count,
+            'positions': {position: doc.get('positions', {}).get(position, 0) for position in POSITIONS},
+            'overall_score_mean': round(doc.get('overall_score_sum', 0) / count, 2) if count else None,
+            'attributes': attributes
+        }
+
+    def overview(self) -> Dict:
+        """
+        Get league-wide statistics
+        
+        Returns:
+            Dictionary with the player count, counts per position, mean
+            overall score and mean/min/max of every attribute
+        """
+        self.ensure_built()
+        doc = self.repository.get_aggregates([LEAGUE_ID]).get(LEAGUE_ID, {})
+        return self._summarize(doc)
+
+    def teams(self) -> List[Dict]:
+        """
+        Get statistics for every team with at least one player
+        
+        Returns:
+            List of per-team summaries, in the overview format plus the
+            team name, sorted by team
+        """
+        self.ensure_built()
+        docs = self.repository.team_aggregates()
+        return [dict(team=doc['team'], **self._summarize(doc)) for doc in docs]
+
+    @staticmethod
+    def _histogram(doc: Dict, field: str) -> List[int]:
+        """Dense 101-bucket value counts of one attribute"""
+        counts = [0] * 101
+        for value, count in doc.get('hist', {}).get(field, {}).items():
+            counts[int(value)] = count
+        return counts
+
+    @staticmethod
+    def _percentile_rank(histogram: List[int], value: int) -> Optional[float]:
+        """Share of players below value, counting ties as half, in percent"""
+        total = sum(histogram)
+        if not total:
+            return None
+        below = sum(histogram[:value])
+        return round(100 * (below + histogram[value] / 2) / total, 1)
+
+    @staticmethod
+    def _value_at(histogram: List[int], percentile: float) -> Optional[int]:
+        """Smallest value with at least percentile% of players at or below it"""
+        total = sum(histogram)
+        if not total:
+            return None
+        target = percentile / 100 * total
+        seen = 0
+        for value, count in enumerate(histogram):
+            seen += count
+            if count and seen >= target:
+                return value
+        return None
+
+    def distributions(self, position: Optional[str] = None) -> Dict:
+        """
+        Get the value distribution of every attribute
+        
+        Args:
+            position: Optional position to restrict the distribution to
+            
+        Returns:
+            Dictionary with the player count and, per attribute, the count
+            of players at each value from 0 to 100 plus common percentiles
+            
+        Raises:
+            ValueError: If the position is invalid
+        """
+        scope = self._distribution_scope(position)
+        self.ensure_built()
+        doc = self.repository.get_aggregates([scope]).get(scope, {})
+        return self._distribution(doc, position)
+
+    @staticmethod
+    def _distribution_scope(position: Optional[str]) -> str:
+        """Aggregate document ID holding the distribution, validating the position"""
+        if position is not None and position not in POSITIONS:
+            raise ValueError(f"Invalid position: {position}")
+        return LEAGUE_ID if position is None else position_stats_id(position)
+
+    @staticmethod
+    def _distribution(doc: Dict, position: Optional[str]) -> Dict:
+        """Turn an aggregate document into the distributions() format"""
+        attributes = {}
+        for field in STAT_FIELDS:
+            histogram = StatsService._histogram(doc, field)
+            attributes[field] = {
+                'histogram': histogram,
+                'percentiles': {
+                    f'p{percentile}': StatsService._value_at(histogram, percentile)
+                    for percentile in DISTRIBUTION_PERCENTILES
+                }
+            }
+        return {'position': position, 'total_players': doc.get('count', 0), 'attributes': attributes}
+
+    def player_percentiles(self, player_id: str) -> Optional[Dict]:
+        """
+        Get a player's percentile rank in every attribute
+        
+        Args:
+            player_id: Player's ID
+            
+        Returns:
+            Dictionary with the player's id and position and, per attribute,
+            the value and its percentile rank league-wide and among players
+            at the same position, or None if the player does not exist
+        """
+        repository = self.repository
+        player_doc = repository.get(ObjectId(player_id), ('position', 'offense', 'defense'))
+        if player_doc is None:
+            return None
+        
+        self.ensure_built()
+        position_scope = position_stats_id(player_doc['position'])
+        docs = repository.get_aggregates([LEAGUE_ID, position_scope])
+        
+        percentiles = {}
+        for group, fields in (('offense', OFFENSE_FIELDS), ('defense', DEFENSE_FIELDS)):
+            for field in fields:
+                value = player_doc[group][field]
+                percentiles[field] = {
+                    'value': value,
+                    'league': self._percentile_rank(self._histogram(docs.get(LEAGUE_ID, {}), field), value),
+                    'position': self._percentile_rank(self._histogram(docs.get(position_scope, {}), field), value)
+                }
+        return {'id': player_id, 'position': player_doc['position'], 'percentiles': percentiles}
+
+stats_service = StatsService()
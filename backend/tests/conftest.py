@@ -1,6 +1,12 @@
 import pytest
 from backend import create_app
 from backend.db import get_db
+from backend.services.history_service import history_service
+from backend.services.ranking_service import ranking_service
+from backend.services.similarity_service import similarity_service
+from backend.services.search_service import search_service
+from backend.services.stats_service import stats_service
+from backend.utils.cache import response_cache
 
 @pytest.fixture
 def app():
@@ -20,6 +26,14 @@ def db(app):
         db = get_db()
         # Clear database before each test
         db.players.delete_many({})
+        for collection in (db.rank_history, db.rank_checkpoints, db.counters):
+            collection.delete_many({})
+        ranking_service.rebuild()
+        history_service.rebuild()
+        stats_service.rebuild()
+        similarity_service.rebuild()
+        search_service.rebuild()
+        response_cache.clear()
         yield db
         # Clean up after tests
         db.players.delete_many({})
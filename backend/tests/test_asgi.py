@@ -0,0 +1,87 @@
+import json
+import pytest
+from starlette.testclient import TestClient
+from backend.asgi import create_async_app
+
+def _player(name='Jayson Tatum', position='SF'):
+    return {
+        'name': name,
+        'team': 'Celtics',
+        'position': position,
+        'offense': {'shooting': 88, 'ball_handling': 80, 'passing': 75, 'speed': 82, 'finishing': 86},
+        'defense': {'perimeter_defense': 78, 'interior_defense': 70, 'steal': 65, 'block': 60, 'rebounding': 80}
+    }
+
+@pytest.fixture
+def async_client(db):
+    with TestClient(create_async_app({'DB_NAME': 'basketball_rankings_test'})) as client:
+        yield client
+
+def test_crud_matches_flask_app(async_client, client):
+    created = async_client.post('/api/players', json=_player())
+    assert created.status_code == 201
+    player = created.json()
+    assert player['overall_score'] > 0 and player['position_weighted_score'] > 0
+
+    # Both apps serve the same document in the same shape
+    assert async_client.get(f"/api/players/{player['id']}").json() == player
+    assert client.get(f"/api/players/{player['id']}").get_json() == player
+
+    updated = async_client.put(f"/api/players/{player['id']}", json={'offense': {'shooting': 40}})
+    assert updated.status_code == 200
+    assert updated.json()['offense']['shooting'] == 40
+    assert updated.json()['overall_score'] < player['overall_score']
+
+    assert async_client.delete(f"/api/players/{player['id']}").status_code == 204
+    assert async_client.get(f"/api/players/{player['id']}").status_code == 404
+    assert async_client.get('/api/players/not-an-id').status_code == 400
+
+def test_listing_pages_and_streams(async_client):
+    for index, position in enumerate(['PG', 'SG', 'SF']):
+        async_client.post('/api/players', json=_player(f'Player {index}', position))
+
+    first = async_client.get('/api/players?per_page=2').json()
+    assert len(first['players']) == 2 and first['next_cursor']
+    second = async_client.get(f"/api/players?per_page=2&cursor={first['next_cursor']}").json()
+    assert len(second['players']) == 1 and second['next_cursor'] is None
+    assert async_client.get('/api/players?position=SG').json()['players'][0]['position'] == 'SG'
+    assert async_client.get('/api/players?sort_by=height').status_code == 400
+
+    streamed = async_client.get('/api/players', headers={'Accept': 'application/x-ndjson'})
+    assert streamed.headers['content-type'].startswith('application/x-ndjson')
+    assert len([json.loads(line) for line in streamed.text.splitlines()]) == 3
+
+def test_bulk_create_and_validation(async_client):
+    invalid = async_client.post('/api/players', json={'name': 'No Stats'})
+    assert invalid.status_code == 400
+    assert 'errors' in invalid.json()
+
+    response = async_client.post('/api/players/bulk', json=[_player('Al Horford'), {'name': 'Bad'}, _player('Bill Russell')])
+    assert response.status_code == 207
+    body = response.json()
+    assert body['inserted'] == 2
+    assert [error['index'] for error in body['errors']] == [1]
+
+def test_stats_follow_async_writes(async_client, client):
+    async_client.post('/api/players', json=_player('Al Horford', 'PG'))
+    async_client.post('/api/players', json=_player('Bill Russell', 'C'))
+
+    overview = async_client.get('/api/stats/overview').json()
+    assert overview['total_players'] == 2
+    assert overview == client.get('/api/stats/overview').get_json()
+    assert async_client.get('/api/stats/teams').json()['teams'][0]['team'] == 'Celtics'
+    assert async_client.get('/api/stats/distributions?position=c').json()['total_players'] == 1
+    assert async_client.get('/api/stats/distributions?position=XX').status_code == 400
+
+def test_batch_get_and_compare_match_flask_app(async_client, client):
+    ids = [async_client.post('/api/players', json=_player(name, position)).json()['id']
+           for name, position in [('Al Horford', 'C'), ('Jrue Holiday', 'PG')]]
+
+    batch = async_client.get(f"/api/players?ids={ids[1]},{ids[0]}").json()
+    assert [player['name'] for player in batch['players']] == ['Jrue Holiday', 'Al Horford']
+    assert batch == client.get(f"/api/players?ids={ids[1]},{ids[0]}").get_json()
+
+    compared = async_client.post('/api/players/compare', json={'ids': ids})
+    assert compared.status_code == 200
+    assert compared.json() == client.post('/api/players/compare', json={'ids': ids}).get_json()
+    assert async_client.post('/api/players/compare', json={'ids': [ids[0]]}).status_code == 400
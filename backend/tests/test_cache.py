@@ -0,0 +1,35 @@
+from backend.utils.cache import ResponseCache
+
+def test_lru_eviction_and_stats():
+    cache = ResponseCache(max_entries=2, ttl=60)
+    for key in ('a', 'b'):
+        cache.set(key, key.encode(), key, 'application/json', (), ())
+    assert cache.get('a').body == b'a'
+    cache.set('c', b'c', 'c', 'application/json', (), ())
+
+    # 'b' was least recently used
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['hits'] == 2 and stats['misses'] == 1
+
+def test_ttl_expiry():
+    cache = ResponseCache(max_entries=8, ttl=0)
+    cache.set('a', b'a', 'a', 'application/json', (), ())
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+
+def test_invalidation_is_precise_and_blocks_stale_writes():
+    cache = ResponseCache()
+    cache.set('/p/1', b'1', 'e1', 'application/json', ('player:1',), cache.versions(('player:1',)))
+    cache.set('/p/2', b'2', 'e2', 'application/json', ('player:2',), cache.versions(('player:2',)))
+
+    versions = cache.versions(('player:1',))
+    cache.invalidate('player:1')
+    assert cache.get('/p/1') is None
+    assert cache.get('/p/2') is not None
+
+    # A response rendered before the invalidation must not be stored
+    cache.set('/p/1', b'old', 'e0', 'application/json', ('player:1',), versions)
+    assert cache.get('/p/1') is None
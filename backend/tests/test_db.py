@@ -0,0 +1,26 @@
+import os
+from backend import db as database
+
+def test_client_is_shared_and_configured_from_app(app):
+    app.config.update(MONGO_MAX_POOL_SIZE=7, MONGO_SERVER_SELECTION_TIMEOUT_MS=50)
+    database.close_client()
+    with app.app_context():
+        client = database.get_client()
+        assert database.get_client() is client
+        assert client.options.pool_options.max_pool_size == 7
+    with app.app_context():
+        assert database.get_client() is client
+    database.close_client()
+
+def test_client_is_recreated_in_forked_child(app, monkeypatch):
+    with app.app_context():
+        parent_client = database.get_client()
+        monkeypatch.setattr(os, 'getpid', lambda: -1)
+        assert database.get_client() is not parent_client
+    database.close_client()
+
+def test_health_reports_pool_stats(client):
+    response = client.get('/api/health')
+    assert response.status_code == 200
+    stats = response.get_json()['db_pool']
+    assert {'checked_out', 'checkouts', 'wait_time_avg_ms'} <= set(stats)
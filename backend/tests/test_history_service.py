@@ -0,0 +1,149 @@
+import random
+from datetime import datetime, timedelta
+from http import HTTPStatus
+import pytest
+from bson import ObjectId
+from backend.repositories.memory import InMemoryPlayerRepository
+from backend.services import history_service as history_module
+from backend.services.history_service import HistoryService, format_timestamp, parse_timestamp
+
+START = datetime(2024, 3, 1, 9, 0, 0)
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Make every recorded change one second after the previous one"""
+    now = [START]
+
+    def tick():
+        now[0] += timedelta(seconds=1)
+        return now[0]
+    monkeypatch.setattr(history_module, '_now', tick)
+    return now
+
+def _doc(name, score):
+    return {'name': name, 'team': 'Celtics', 'position': 'SF', 'overall_score': score}
+
+def expected_leaderboard(scores, names, limit):
+    entries = sorted(((round(score * 100), ObjectId(player_id).binary) for player_id, score in scores.items()),
+                     key=lambda entry: (-entry[0], entry[1]))
+    players = []
+    for index, (score, binary) in enumerate(entries[:limit]):
+        shared = players and entries[index - 1][0] == score
+        players.append({
+            'rank': players[-1]['rank'] if shared else index + 1,
+            'id': str(ObjectId(binary)),
+            'name': names.get(str(ObjectId(binary))),
+            'overall_score': score / 100
+        })
+    return len(entries), players
+
+def test_leaderboard_as_of_matches_replayed_state(clock):
+    rng = random.Random(7)
+    repository = InMemoryPlayerRepository()
+    # Players already stored when history starts go into the first checkpoint
+    for index in range(20):
+        repository.insert(_doc(f'Player {index}', float(rng.randint(40, 60))))
+    service = HistoryService(repository=repository, checkpoint_interval=7)
+    service.ensure_started()
+
+    scores = {str(doc['_id']): doc['overall_score'] for doc in repository.scan(('overall_score',))}
+    names = {str(doc['_id']): doc['name'] for doc in repository.scan(('name',))}
+    snapshots = [(clock[0], dict(scores))]
+    for step in range(150):
+        action = rng.random()
+        if action < 0.2 or not scores:
+            docs = [_doc(f'New {step}.{n}', float(rng.randint(30, 90))) for n in range(rng.randint(1, 3))]
+            repository.insert_many(docs)
+            service.on_players_created([(str(doc['_id']), doc) for doc in docs])
+            for doc in docs:
+                scores[str(doc['_id'])] = doc['overall_score']
+                names[str(doc['_id'])] = doc['name']
+        elif action < 0.3:
+            player_id = rng.choice(sorted(scores))
+            doc = repository.delete(ObjectId(player_id))
+            service.on_player_deleted(player_id, doc)
+            del scores[player_id]
+        else:
+            player_id = rng.choice(sorted(scores))
+            previous = repository.get(ObjectId(player_id))
+            # Some saves leave the score alone and are not recorded
+            score = rng.choice([previous['overall_score'], float(rng.randint(30, 90)) + 0.25])
+            doc = repository.update(ObjectId(player_id), {'overall_score': score})
+            service.on_player_saved(player_id, doc, previous)
+            scores[player_id] = score
+        snapshots.append((clock[0], dict(scores)))
+
+    assert repository.latest_checkpoint().seq >= repository.last_history_seq() - 7
+    for as_of, state in snapshots[::5]:
+        result = service.leaderboard_as_of(as_of, limit=10)
+        total, players = expected_leaderboard(state, names, 10)
+        assert result['as_of'] == format_timestamp(as_of)
+        assert result['total'] == total
+        # Players deleted since have no name any more
+        current = {str(doc['_id']) for doc in repository.scan(())}
+        assert [
+            {key: player[key] for key in ('rank', 'id', 'name', 'overall_score')} for player in result['players']
+        ] == [dict(player, name=player['name'] if player['id'] in current else None) for player in players]
+
+    with pytest.raises(ValueError):
+        service.leaderboard_as_of(START - timedelta(days=1))
+
+def test_player_history(clock):
+    repository = InMemoryPlayerRepository()
+    service = HistoryService(repository=repository)
+    player_id = str(repository.insert(_doc('Jayson Tatum', 50.0)))
+    service.on_players_created([(player_id, repository.get(ObjectId(player_id)))])
+    previous = repository.get(ObjectId(player_id))
+    service.on_player_saved(player_id, repository.update(ObjectId(player_id), {'overall_score': 61.5}), previous)
+    previous = repository.get(ObjectId(player_id))
+    service.on_player_saved(player_id, repository.update(ObjectId(player_id), {'name': 'JT'}), previous)
+
+    history = service.player_history(player_id)
+    assert history['id'] == player_id
+    assert [(point['timestamp'], point['overall_score']) for point in history['points']] == [
+        ('2024-03-01T09:00:02.000Z', 50.0),
+        ('2024-03-01T09:00:03.000Z', 61.5)
+    ]
+    since = service.player_history(player_id, since=START + timedelta(seconds=3))
+    assert [point['overall_score'] for point in since['points']] == [61.5]
+    assert service.player_history(player_id, until=START)['points'] == []
+    assert service.player_history(str(ObjectId())) is None
+
+def test_parse_timestamp():
+    assert parse_timestamp('2024-03-01T09:00:00Z') == START
+    assert parse_timestamp('2024-03-01T10:30:00+01:30') == START
+    assert parse_timestamp('2024-03-01T09:00:00') == START
+    assert parse_timestamp('1709283600') == START
+    with pytest.raises(ValueError):
+        parse_timestamp('yesterday')
+
+def _player(name, shooting):
+    return {
+        'name': name,
+        'team': 'Celtics',
+        'position': 'SF',
+        'offense': {'shooting': shooting, 'ball_handling': 60, 'passing': 60, 'speed': 60, 'finishing': 60},
+        'defense': {'perimeter_defense': 60, 'interior_defense': 60, 'steal': 60, 'block': 60, 'rebounding': 60}
+    }
+
+def test_history_api(clock, client, db):
+    tatum = client.post('/api/players', json=_player('Jayson Tatum', 90)).get_json()
+    brown = client.post('/api/players', json=_player('Jaylen Brown', 80)).get_json()
+    created = clock[0]
+    client.put(f"/api/players/{tatum['id']}", json=_player('Jayson Tatum', 40))
+
+    history = client.get(f"/api/players/{tatum['id']}/history").get_json()
+    assert [point['rank'] for point in history['points']] == [1, 2]
+    assert history['points'][0]['overall_score'] == tatum['overall_score']
+
+    then = client.get(f"/api/rankings?as_of={format_timestamp(created)}").get_json()
+    assert [player['name'] for player in then['players']] == ['Jayson Tatum', 'Jaylen Brown']
+    now = client.get('/api/rankings?as_of=' + format_timestamp(clock[0])).get_json()
+    assert [player['id'] for player in now['players']] == [brown['id'], tatum['id']]
+    assert now['total'] == 2
+
+    response = client.get(f"/api/players/{tatum['id']}/history?since=soon")
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert client.get(f"/api/players/{ObjectId()}/history").status_code == HTTPStatus.NOT_FOUND
+    assert client.get('/api/players/nope/history').status_code == HTTPStatus.BAD_REQUEST
+    assert client.get('/api/rankings?as_of=2000-01-01T00:00:00Z').status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,118 @@
+import itertools
+import random
+from collections import Counter
+from http import HTTPStatus
+import pytest
+from backend.repositories.memory import InMemoryPlayerRepository
+from backend.services.lineup_service import LineupService, FLEX_SLOTS
+from backend.services.scoring_service import ScoringService, OFFENSE_FIELDS, DEFENSE_FIELDS, POSITIONS
+
+def _player(name, team, position, offense, defense):
+    return ScoringService.score_player({
+        'name': name,
+        'team': team,
+        'position': position,
+        'offense': {stat: offense for stat in OFFENSE_FIELDS},
+        'defense': {stat: defense for stat in DEFENSE_FIELDS}
+    })
+
+def _random_pool(rng, size):
+    docs = []
+    for index in range(size):
+        quality = rng.randint(40, 95)
+        # Good scorers tend to be weak defenders, so constraints bite
+        docs.append(ScoringService.score_player({
+            'name': f'Player {index}',
+            'team': f'Team {rng.randint(0, 3)}',
+            'position': rng.choice(POSITIONS),
+            'offense': {stat: min(100, max(0, quality + rng.randint(-10, 10))) for stat in OFFENSE_FIELDS},
+            'defense': {stat: min(100, max(0, 135 - quality + rng.randint(-10, 10))) for stat in DEFENSE_FIELDS}
+        }))
+    return docs
+
+def brute_force(docs, slots, min_defense=None, max_per_team=None):
+    best = None
+    for lineup in itertools.permutations(docs, len(slots)):
+        if any(doc['position'] not in FLEX_SLOTS.get(slot, (slot,)) for doc, slot in zip(lineup, slots)):
+            continue
+        if max_per_team and max(Counter(doc['team'] for doc in lineup).values()) > max_per_team:
+            continue
+        defense = sum(sum(doc['defense'].values()) for doc in lineup) / len(DEFENSE_FIELDS) / len(slots)
+        if min_defense is not None and defense < min_defense:
+            continue
+        score = sum(round(doc['position_weighted_score'] * 100) for doc in lineup)
+        best = score if best is None else max(best, score)
+    return best
+
+def _service(docs):
+    repository = InMemoryPlayerRepository()
+    repository.insert_many(docs)
+    return LineupService(repository)
+
+@pytest.mark.parametrize('slots', [['PG', 'SG', 'SF', 'PF', 'C'], ['G', 'G', 'F', 'F', 'C'], ['UTIL'] * 5])
+def test_optimize_matches_brute_force(slots):
+    rng = random.Random(11)
+    for _ in range(40):
+        docs = _random_pool(rng, rng.randint(5, 9))
+        service = _service(docs)
+        min_defense = rng.choice([None, 50, 60, 70])
+        max_per_team = rng.choice([None, 1, 2])
+
+        result = service.optimize(slots, min_defense=min_defense, max_per_team=max_per_team)
+        expected = brute_force(docs, slots, min_defense, max_per_team)
+        assert (result and round(result['total_score'] * 100)) == expected
+        if result:
+            assert [player['slot'] for player in result['lineup']] == slots
+            assert len({player['id'] for player in result['lineup']}) == len(slots)
+
+def test_constraints_and_team_pool():
+    docs = [
+        _player('Scoring PG', 'Celtics', 'PG', 100, 70),
+        _player('Defensive PG', 'Lakers', 'PG', 80, 85),
+        _player('SG', 'Celtics', 'SG', 80, 70),
+        _player('SF', 'Celtics', 'SF', 80, 70),
+        _player('PF', 'Celtics', 'PF', 80, 70),
+        _player('C', 'Lakers', 'C', 80, 70),
+        _player('Bench C', 'Celtics', 'C', 60, 60)
+    ]
+    service = _service(docs)
+
+    def names(result):
+        return [player['name'] for player in result['lineup']]
+
+    assert names(service.optimize())[0] == 'Scoring PG'
+    assert names(service.optimize(min_defense=71))[0] == 'Defensive PG'
+    assert service.optimize(min_defense=71)['team_defense'] == 73
+    assert names(service.optimize(exclude=[str(docs[0]['_id'])]))[0] == 'Defensive PG'
+    assert names(service.optimize(team='Celtics'))[4] == 'Bench C'
+    assert service.optimize(team='Celtics', max_per_team=4) is None
+    assert service.optimize(min_defense=95) is None
+
+    with pytest.raises(ValueError):
+        service.optimize(['PG', 'SG', 'SF', 'PF'])
+    with pytest.raises(ValueError):
+        service.optimize(['PG', 'SG', 'SF', 'PF', 'X'])
+
+def test_large_pool_is_pruned():
+    rng = random.Random(3)
+    docs = _random_pool(rng, 1000)
+    for doc in docs:
+        doc['team'] = f"Team {rng.randint(0, 29)}"
+    result = _service(docs).optimize(['UTIL'] * 5, min_defense=75, max_per_team=1)
+    assert result['team_defense'] >= 75
+    assert result['candidates'] < result['pool_size']
+
+def test_optimize_endpoint(client, db):
+    for name, position in [('Jrue Holiday', 'PG'), ('Derrick White', 'SG'), ('Jayson Tatum', 'SF'),
+                           ('Jaylen Brown', 'PF'), ('Al Horford', 'C')]:
+        player = _player(name, 'Celtics', position, 80, 70)
+        del player['overall_score'], player['position_weighted_score']
+        client.post('/api/players', json=player)
+
+    response = client.post('/api/lineups/optimize', json={'team': 'Celtics', 'max_per_team': 5})
+    assert response.status_code == HTTPStatus.OK
+    assert [player['slot'] for player in response.get_json()['lineup']] == ['PG', 'SG', 'SF', 'PF', 'C']
+
+    assert client.post('/api/lineups/optimize', json={'min_defense': 99}).status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert client.post('/api/lineups/optimize', json={'slots': ['pg', 'sg']}).status_code == HTTPStatus.BAD_REQUEST
+    assert client.post('/api/lineups/optimize', json={'max_per_team': 'two'}).status_code == HTTPStatus.BAD_REQUEST
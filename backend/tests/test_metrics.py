@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+from backend.utils.metrics import Histogram, MetricsRegistry, LATENCY_BUCKETS, command_metrics, metrics
+
+def _player(name='Stephen Curry'):
+    return {
+        'name': name,
+        'team': 'Warriors',
+        'position': 'PG',
+        'offense': {'shooting': 99, 'ball_handling': 92, 'passing': 88, 'speed': 85, 'finishing': 80},
+        'defense': {'perimeter_defense': 70, 'interior_defense': 40, 'steal': 75, 'block': 30, 'rebounding': 50}
+    }
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram()
+    for seconds in (0.0001, 0.003, 0.003, 20.0):
+        histogram.observe(seconds)
+    buckets = dict(histogram.cumulative())
+    assert buckets['0.0005'] == 1
+    assert buckets['0.005'] == 3
+    assert buckets[repr(LATENCY_BUCKETS[-1])] == 3
+    assert buckets['+Inf'] == 4
+    assert histogram.count == 4
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry()
+    registry.observe_request('GET', '/api/players/<player_id>', 200, 0.002, {'db': 0.001})
+    registry.observe_command('find', 'success', 0.0008)
+    text = registry.render(['# TYPE up gauge', 'up 1'])
+    assert '# TYPE http_request_duration_seconds histogram' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/players/<player_id>",status="200",le="+Inf"} 1' in text
+    assert 'http_request_stage_duration_seconds_count{route="/api/players/<player_id>",stage="db"} 1' in text
+    assert 'mongodb_command_duration_seconds_sum{command="find",outcome="success"} 0.0008' in text
+    assert text.endswith('up 1\n')
+
+def test_command_listener_records_durations():
+    metrics.reset()
+    command_metrics.succeeded(SimpleNamespace(command_name='insert', duration_micros=1500))
+    command_metrics.failed(SimpleNamespace(command_name='insert', duration_micros=500))
+    assert metrics.commands[('insert', 'success')].sum == 0.0015
+    assert metrics.commands[('insert', 'failure')].count == 1
+
+def test_server_timing_and_metrics_endpoint(client, db):
+    metrics.reset()
+    created = client.post('/api/players', json=_player())
+    assert created.status_code == 201
+    stages = created.headers['Server-Timing']
+    for name in ('validate', 'score', 'db', 'build', 'serialize', 'total'):
+        assert f'{name};dur=' in stages
+
+    player_id = created.get_json()['id']
+    assert 'db;dur=' in client.get(f'/api/players/{player_id}').headers['Server-Timing']
+
+    response = client.get('/api/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+    assert 'http_request_duration_seconds_count{method="POST",route="/api/players",status="201"} 1' in text
+    assert 'http_request_stage_duration_seconds_count{route="/api/players/<player_id>",stage="build"} 1' in text
+    assert 'response_cache_hits_total' in text
+
+def test_metrics_can_be_disabled(app, client, db):
+    app.config['METRICS_ENABLED'] = False
+    metrics.reset()
+    response = client.get('/api/players')
+    assert response.status_code == 200
+    assert 'Server-Timing' not in response.headers
+    assert not metrics.requests
@@ -0,0 +1,13 @@
+import pytest
+from backend.utils.pagination import encode_cursor, decode_cursor
+
+def test_cursor_round_trip():
+    state = {'sort_by': 'overall_score', 'order': 'desc', 'value': 87.5, 'id': '64b7f0c2a1b2c3d4e5f60718'}
+    token = encode_cursor(state)
+    assert '=' not in token
+    assert decode_cursor(token) == state
+
+@pytest.mark.parametrize('token', ['not-a-cursor', '!!!', encode_cursor([1, 2])])
+def test_decode_cursor_rejects_garbage(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
@@ -0,0 +1,31 @@
+from datetime import datetime
+import pytest
+from backend.models.player import Player, CompactPlayer
+
+PLAYER_DOC = {
+    "id": "64b7f0c2a1b2c3d4e5f60718",
+    "name": "Victor Wembanyama",
+    "team": "Spurs",
+    "position": "C",
+    "offense": {"shooting": 80, "ball_handling": 75, "passing": 70, "speed": 80, "finishing": 85},
+    "defense": {"perimeter_defense": 85, "interior_defense": 95, "steal": 75, "block": 99, "rebounding": 90},
+    "overall_score": 83.4,
+    "position_weighted_score": 86.45,
+    "created_at": datetime(2024, 11, 2, 18, 30, 5, 123000),
+    "updated_at": datetime(2025, 1, 15, 9, 0, 0)
+}
+
+def test_compact_player_dict_matches_player():
+    player = Player(**PLAYER_DOC)
+    compact = CompactPlayer.from_doc(player.dict())
+    assert compact.dict() == player.dict()
+
+def test_compact_player_has_no_instance_dict():
+    compact = CompactPlayer.from_doc(PLAYER_DOC)
+    assert not hasattr(compact, '__dict__')
+    assert compact.stats.itemsize == 1
+
+def test_compact_player_rejects_out_of_range_stats():
+    doc = dict(PLAYER_DOC, offense=dict(PLAYER_DOC['offense'], shooting=300))
+    with pytest.raises(OverflowError):
+        CompactPlayer.from_doc(doc)
@@ -1,5 +1,7 @@
+import json
 import pytest
 from http import HTTPStatus
+from bson import ObjectId
 
 def test_create_player(client):
     player_data = {
@@ -60,6 +62,389 @@ def test_get_players(client, db):
     assert response.status_code == HTTPStatus.OK
     
     data = response.get_json()
-    assert isinstance(data, list)
-    assert len(data) == 1
-    assert data[0]['name'] == player_data['name']
+    assert isinstance(data['players'], list)
+    assert len(data['players']) == 1
+    assert data['players'][0]['name'] == player_data['name']
+    assert data['next_cursor'] is None
+
+def test_get_players_keyset_pagination(client, db):
+    base = {
+        "team": "Warriors",
+        "position": "PG",
+        "defense": {
+            "perimeter_defense": 70,
+            "interior_defense": 70,
+            "steal": 70,
+            "block": 70,
+            "rebounding": 70
+        }
+    }
+    for i in range(5):
+        stat = 60 + i * 5
+        client.post('/api/players', json=dict(
+            base,
+            name=f"Player {i}",
+            offense={field: stat for field in ("shooting", "ball_handling", "passing", "speed", "finishing")}
+        ))
+
+    first = client.get('/api/players?per_page=2').get_json()
+    assert [p['name'] for p in first['players']] == ["Player 4", "Player 3"]
+    assert first['next_cursor']
+
+    second = client.get(f"/api/players?per_page=2&cursor={first['next_cursor']}").get_json()
+    assert [p['name'] for p in second['players']] == ["Player 2", "Player 1"]
+
+    last = client.get(f"/api/players?per_page=2&cursor={second['next_cursor']}").get_json()
+    assert [p['name'] for p in last['players']] == ["Player 0"]
+    assert last['next_cursor'] is None
+
+def test_get_players_rejects_invalid_cursor(client):
+    response = client.get('/api/players?cursor=not-a-cursor')
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+def test_get_players_ndjson_stream(client, db):
+    player_data = {
+        "name": "Nikola Jokic",
+        "team": "Nuggets",
+        "position": "C",
+        "offense": {
+            "shooting": 85,
+            "ball_handling": 80,
+            "passing": 95,
+            "speed": 60,
+            "finishing": 90
+        },
+        "defense": {
+            "perimeter_defense": 60,
+            "interior_defense": 80,
+            "steal": 70,
+            "block": 70,
+            "rebounding": 95
+        }
+    }
+    client.post('/api/players', json=player_data)
+    client.post('/api/players', json=dict(player_data, name="Aaron Gordon", team="Nuggets"))
+
+    response = client.get('/api/players', headers={'Accept': 'application/x-ndjson'})
+    assert response.status_code == HTTPStatus.OK
+    assert response.mimetype == 'application/x-ndjson'
+
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert sorted(row['name'] for row in rows) == ["Aaron Gordon", "Nikola Jokic"]
+
+    response = client.get('/api/players?stream=1&name=jokic')
+    assert response.get_data(as_text=True).count('\n') == 1
+
+def test_bulk_create_players_reports_row_errors(client, db):
+    header = "name,team,position,shooting,ball_handling,passing,speed,finishing," \
+             "perimeter_defense,interior_defense,steal,block,rebounding"
+    body = "\n".join([
+        header,
+        "Jrue Holiday,Celtics,PG,75,80,80,75,75,90,75,85,50,60",
+        "Bad Position,Celtics,XX,75,80,80,75,75,90,75,85,50,60",
+        "Derrick White,Celtics,SG,78,75,75,75,70,88,70,80,65,55"
+    ])
+
+    response = client.post('/api/players/bulk', data=body, content_type='text/csv')
+    assert response.status_code == HTTPStatus.MULTI_STATUS
+
+    data = response.get_json()
+    assert data['inserted'] == 2
+    assert data['failed'] == 1
+    assert data['ids'][1] is None
+    assert data['errors'] == [{'index': 1, 'errors': {'position': 'Must be one of: PG, SG, SF, PF, C.'}}]
+    assert db.players.count_documents({}) == 2
+    assert db.players.find_one({'name': 'Jrue Holiday'})['overall_score'] == 74.5
+
+def test_rankings_follow_writes(client, db):
+    def player(name, stat):
+        return {
+            "name": name,
+            "team": "Celtics",
+            "position": "SF",
+            "offense": {field: stat for field in ("shooting", "ball_handling", "passing", "speed", "finishing")},
+            "defense": {field: stat for field in ("perimeter_defense", "interior_defense", "steal", "block", "rebounding")}
+        }
+
+    tatum = client.post('/api/players', json=player("Jayson Tatum", 90)).get_json()
+    brown = client.post('/api/players', json=player("Jaylen Brown", 85)).get_json()
+    client.post('/api/players', json=player("Sam Hauser", 60))
+
+    data = client.get('/api/rankings?limit=2').get_json()
+    assert data['total'] == 3
+    assert [(p['rank'], p['name']) for p in data['players']] == [(1, "Jayson Tatum"), (2, "Jaylen Brown")]
+
+    client.put(f"/api/players/{brown['id']}", json={"offense": {"shooting": 100, "ball_handling": 100,
+                                                               "passing": 100, "speed": 100, "finishing": 100}})
+    assert client.get(f"/api/players/{brown['id']}/rank").get_json()['rank'] == 1
+
+    client.delete(f"/api/players/{brown['id']}")
+    assert client.get(f"/api/players/{tatum['id']}/rank").get_json() == {
+        'id': tatum['id'], 'rank': 1, 'overall_score': 90.0, 'total': 2
+    }
+    assert client.get(f"/api/players/{brown['id']}/rank").status_code == HTTPStatus.NOT_FOUND
+
+def test_position_rankings_use_weighted_score(client, db):
+    def center(name, finishing, rebounding):
+        return {
+            "name": name,
+            "team": "Magic",
+            "position": "C",
+            "offense": {"shooting": 50, "ball_handling": 50, "passing": 50, "speed": 50, "finishing": finishing},
+            "defense": {"perimeter_defense": 50, "interior_defense": 50, "steal": 50, "block": 50,
+                        "rebounding": rebounding}
+        }
+
+    created = client.post('/api/players', json=center("Wendell Carter", 90, 90)).get_json()
+    assert created['position_weighted_score'] == 64.0
+    client.post('/api/players', json=center("Goga Bitadze", 60, 60))
+    client.post('/api/players', json=dict(center("Paolo Banchero", 99, 99), position="PF"))
+
+    data = client.get('/api/rankings/c').get_json()
+    assert data['position'] == 'C'
+    assert [(p['rank'], p['name']) for p in data['players']] == [(1, "Wendell Carter"), (2, "Goga Bitadze")]
+    assert client.get('/api/rankings/XX').status_code == HTTPStatus.BAD_REQUEST
+
+def test_get_player_etag_and_invalidation(client, db):
+    player_data = {
+        "name": "Anthony Edwards",
+        "team": "Timberwolves",
+        "position": "SG",
+        "offense": {"shooting": 85, "ball_handling": 85, "passing": 75, "speed": 90, "finishing": 90},
+        "defense": {"perimeter_defense": 80, "interior_defense": 65, "steal": 75, "block": 60, "rebounding": 65}
+    }
+    player_id = client.post('/api/players', json=player_data).get_json()['id']
+
+    first = client.get(f'/api/players/{player_id}')
+    assert first.headers['X-Cache'] == 'MISS'
+    etag = first.headers['ETag']
+    assert not etag.startswith('W/')
+
+    cached = client.get(f'/api/players/{player_id}', headers={'If-None-Match': etag})
+    assert cached.status_code == HTTPStatus.NOT_MODIFIED
+    assert cached.headers['X-Cache'] == 'HIT'
+
+    client.put(f'/api/players/{player_id}', json={"team": "Wolves"})
+    refreshed = client.get(f'/api/players/{player_id}', headers={'If-None-Match': etag})
+    assert refreshed.status_code == HTTPStatus.OK
+    assert refreshed.get_json()['team'] == "Wolves"
+    assert refreshed.headers['ETag'] != etag
+
+def test_similar_players(client, db):
+    def guard(name, shooting, position="PG"):
+        return {
+            "name": name,
+            "team": "Heat",
+            "position": position,
+            "offense": {"shooting": shooting, "ball_handling": 80, "passing": 80, "speed": 80, "finishing": 70},
+            "defense": {"perimeter_defense": 70, "interior_defense": 50, "steal": 70, "block": 40, "rebounding": 50}
+        }
+
+    target = client.post('/api/players', json=guard("Tyler Herro", 90)).get_json()
+    client.post('/api/players', json=guard("Terry Rozier", 85))
+    client.post('/api/players', json=guard("Duncan Robinson", 40))
+    client.post('/api/players', json=guard("Jimmy Butler", 86, position="SF"))
+
+    data = client.get(f"/api/players/{target['id']}/similar?k=2&metric=euclidean").get_json()
+    assert [p['name'] for p in data['players']] == ["Jimmy Butler", "Terry Rozier"]
+
+    data = client.get(f"/api/players/{target['id']}/similar?k=2&metric=euclidean&position=pg").get_json()
+    assert [p['name'] for p in data['players']] == ["Terry Rozier", "Duncan Robinson"]
+
+    assert client.get(f"/api/players/{target['id']}/similar?metric=manhattan").status_code == HTTPStatus.BAD_REQUEST
+
+def test_stats_follow_writes_and_match_rebuild(client, db):
+    from backend.services.stats_service import stats_service
+
+    def player(name, team, position, stat):
+        return {
+            "name": name,
+            "team": team,
+            "position": position,
+            "offense": {"shooting": stat, "ball_handling": 60, "passing": 60, "speed": 60, "finishing": 60},
+            "defense": {"perimeter_defense": 60, "interior_defense": 60, "steal": 60, "block": 60, "rebounding": stat}
+        }
+
+    client.post('/api/players', json=player("Kevin Durant", "Suns", "SF", 95))
+    booker = client.post('/api/players', json=player("Devin Booker", "Suns", "SG", 80)).get_json()
+    client.post('/api/players', json=player("Trae Young", "Hawks", "PG", 40))
+    client.put(f"/api/players/{booker['id']}", json={"team": "Hawks"})
+    young = client.get('/api/players?team=Hawks&sort_by=name&order=desc').get_json()['players'][0]
+    client.delete(f"/api/players/{young['id']}")
+
+    overview = client.get('/api/stats/overview').get_json()
+    assert overview['total_players'] == 2
+    assert overview['positions'] == {'PG': 0, 'SG': 1, 'SF': 1, 'PF': 0, 'C': 0}
+    assert overview['attributes']['shooting'] == {'mean': 87.5, 'min': 80, 'max': 95}
+
+    teams = client.get('/api/stats/teams').get_json()['teams']
+    assert [(t['team'], t['total_players']) for t in teams] == [("Hawks", 1), ("Suns", 1)]
+    assert teams[1]['attributes']['rebounding'] == {'mean': 95.0, 'min': 95, 'max': 95}
+
+    # Incremental aggregates must agree with a full rebuild
+    stats_service.rebuild()
+    assert client.get('/api/stats/overview').get_json() == overview
+    assert client.get('/api/stats/teams').get_json()['teams'] == teams
+
+def test_percentiles_and_distributions(client, db):
+    def player(name, position, shooting):
+        return {
+            "name": name,
+            "team": "Celtics",
+            "position": position,
+            "offense": {"shooting": shooting, "ball_handling": 60, "passing": 60, "speed": 60, "finishing": 60},
+            "defense": {"perimeter_defense": 60, "interior_defense": 60, "steal": 60, "block": 60, "rebounding": 60}
+        }
+
+    client.post('/api/players', json=player("Jrue Holiday", "PG", 70))
+    client.post('/api/players', json=player("Derrick White", "PG", 80))
+    tatum = client.post('/api/players', json=player("Jayson Tatum", "SF", 90)).get_json()
+    client.post('/api/players', json=player("Jaylen Brown", "SF", 70))
+
+    data = client.get(f"/api/players/{tatum['id']}/percentiles").get_json()
+    assert data['position'] == "SF"
+    assert data['percentiles']['shooting'] == {'value': 90, 'league': 87.5, 'position': 75.0}
+    assert data['percentiles']['passing'] == {'value': 60, 'league': 50.0, 'position': 50.0}
+
+    league = client.get('/api/stats/distributions').get_json()
+    assert league['total_players'] == 4
+    assert league['attributes']['shooting']['histogram'][70] == 2
+    assert league['attributes']['shooting']['percentiles'] == {'p10': 70, 'p25': 70, 'p50': 70, 'p75': 80, 'p90': 90}
+
+    guards = client.get('/api/stats/distributions?position=pg').get_json()
+    assert guards['total_players'] == 2
+    assert sum(guards['attributes']['shooting']['histogram']) == 2
+
+    assert client.get('/api/stats/distributions?position=XX').status_code == HTTPStatus.BAD_REQUEST
+    assert client.get('/api/players/000000000000000000000000/percentiles').status_code == HTTPStatus.NOT_FOUND
+
+def test_search_players(client, db):
+    def player(name, team, stat):
+        return {
+            "name": name,
+            "team": team,
+            "position": "SF",
+            "offense": {"shooting": stat, "ball_handling": stat, "passing": stat, "speed": stat, "finishing": stat},
+            "defense": {"perimeter_defense": stat, "interior_defense": stat, "steal": stat, "block": stat, "rebounding": stat}
+        }
+
+    client.post('/api/players', json=player("Kawhi Leonard", "Clippers", 90))
+    george = client.post('/api/players', json=player("Paul George", "Clippers", 85)).get_json()
+    client.post('/api/players', json=player("Chris Paul", "Warriors", 80))
+
+    data = client.get('/api/players/search?q=pau').get_json()
+    assert [(p['name'], p['match']) for p in data['players']] == [("Paul George", "prefix"), ("Chris Paul", "word")]
+
+    client.put(f"/api/players/{george['id']}", json={"team": "76ers"})
+    data = client.get('/api/players/search?q=clip').get_json()
+    assert [p['name'] for p in data['players']] == ["Kawhi Leonard"]
+
+    data = client.get('/api/players/search?q=kawi').get_json()
+    assert [(p['name'], p['match']) for p in data['players']] == [("Kawhi Leonard", "fuzzy")]
+
+    assert client.get('/api/players/search').status_code == HTTPStatus.BAD_REQUEST
+    assert client.get('/api/players/search?q=paul&mode=regex').status_code == HTTPStatus.BAD_REQUEST
+
+def test_batch_get_and_compare(client, db):
+    def player(name, position, shooting, rebounding):
+        return {
+            "name": name,
+            "team": "Celtics",
+            "position": position,
+            "offense": {"shooting": shooting, "ball_handling": 70, "passing": 70, "speed": 70, "finishing": 70},
+            "defense": {"perimeter_defense": 70, "interior_defense": 70, "steal": 70, "block": 70, "rebounding": rebounding}
+        }
+
+    ids = [
+        client.post('/api/players', json=player(*args)).get_json()['id']
+        for args in [("Jayson Tatum", "SF", 90, 80), ("Jrue Holiday", "PG", 80, 60), ("Al Horford", "C", 80, 90)]
+    ]
+    missing = '0' * 24
+
+    batch = client.get(f"/api/players?ids={ids[2]},{missing},{ids[0]},{ids[2]}")
+    assert batch.status_code == HTTPStatus.OK
+    data = batch.get_json()
+    assert [p['name'] for p in data['players']] == ["Al Horford", "Jayson Tatum"]
+    assert data['missing'] == [missing]
+    assert data['players'][1] == client.get(f"/api/players/{ids[0]}").get_json()
+    assert client.get('/api/players?ids=nope').status_code == HTTPStatus.BAD_REQUEST
+
+    response = client.post('/api/players/compare', json={'ids': ids})
+    assert response.status_code == HTTPStatus.OK
+    comparison = response.get_json()['comparison']
+    assert comparison['shooting']['values'] == [90, 80, 80]
+    assert comparison['shooting']['diffs'] == [0, -10, -10]
+    assert comparison['shooting']['ranks'] == [1, 2, 2]
+    assert comparison['rebounding']['ranks'] == [2, 3, 1]
+    assert comparison['rebounding']['max'] == 90 and comparison['rebounding']['mean'] == 76.67
+    players = response.get_json()['players']
+    assert comparison['overall_score']['values'] == [p['overall_score'] for p in players]
+    assert comparison['position_weighted_score']['values'] == [p['position_weighted_score'] for p in players]
+
+    assert client.post('/api/players/compare', json={'ids': [ids[0], ids[0]]}).status_code == HTTPStatus.BAD_REQUEST
+    assert client.post('/api/players/compare', json={'ids': ids[0]}).status_code == HTTPStatus.BAD_REQUEST
+    too_many = [str(ObjectId()) for _ in range(501)]
+    assert client.post('/api/players/compare', json={'ids': too_many}).status_code == HTTPStatus.BAD_REQUEST
+
+def _export_fixture(client, app):
+    def player(name, team, stat):
+        return {
+            "name": name,
+            "team": team,
+            "position": "PF",
+            "offense": {"shooting": stat, "ball_handling": 60, "passing": 60, "speed": 60, "finishing": 60},
+            "defense": {"perimeter_defense": 60, "interior_defense": 60, "steal": 60, "block": 60, "rebounding": stat}
+        }
+
+    # Three players over two batches
+    app.config['EXPORT_BATCH_SIZE'] = 2
+    return [
+        client.post('/api/players', json=player(name, team, stat)).get_json()
+        for name, team, stat in [("Giannis Antetokounmpo", "Bucks", 95), ("Pascal Siakam", "Pacers", 80), ("Julius Randle", "Knicks", 75)]
+    ]
+
+def test_export_csv(client, db, app):
+    created = _export_fixture(client, app)
+    response = client.get('/api/players/export?format=csv')
+    assert response.status_code == HTTPStatus.OK
+    assert response.mimetype == 'text/csv'
+    assert 'players.csv' in response.headers['Content-Disposition']
+
+    import csv
+    import io
+    rows = sorted(csv.DictReader(io.StringIO(response.get_data(as_text=True))), key=lambda row: row['name'])
+    assert [row['name'] for row in rows] == ["Giannis Antetokounmpo", "Julius Randle", "Pascal Siakam"]
+    giannis = next(p for p in created if p['name'] == "Giannis Antetokounmpo")
+    assert rows[0]['id'] == giannis['id']
+    assert rows[0]['shooting'] == '95' and rows[0]['rebounding'] == '95' and rows[0]['passing'] == '60'
+    assert float(rows[0]['overall_score']) == giannis['overall_score']
+
+    # The export is accepted back by the CSV bulk upload
+    from backend.utils.ingest import parse_players_payload
+    records, errors = parse_players_payload(response.get_data(as_text=True), 'text/csv')
+    assert len(records) == 3 and not errors
+
+    assert client.get('/api/players/export?format=xlsx').status_code == HTTPStatus.BAD_REQUEST
+
+@pytest.mark.parametrize('export_format', ['parquet', 'arrow'])
+def test_export_columnar(client, db, app, export_format):
+    pa = pytest.importorskip('pyarrow')
+    created = _export_fixture(client, app)
+    response = client.get(f'/api/players/export?format={export_format}')
+    assert response.status_code == HTTPStatus.OK
+
+    if export_format == 'parquet':
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(pa.BufferReader(response.get_data()))
+        assert parquet.metadata.num_row_groups == 2
+        table = parquet.read()
+    else:
+        table = pa.ipc.open_stream(response.get_data()).read_all()
+    assert table.num_rows == 3
+    assert table.schema.field('shooting').type == pa.uint8()
+    assert table.schema.field('created_at').type == pa.timestamp('ms')
+    rows = {row['id']: row for row in table.to_pylist()}
+    for player in created:
+        assert rows[player['id']]['name'] == player['name']
+        assert rows[player['id']]['shooting'] == player['offense']['shooting']
+        assert rows[player['id']]['overall_score'] == player['overall_score']
@@ -0,0 +1,43 @@
+import random
+from backend.services.ranking_service import RankingIndex
+
+def brute_force_rank(scores, player_id):
+    return sum(1 for score in scores.values() if score > scores[player_id]) + 1
+
+def test_rank_and_top_match_brute_force():
+    rng = random.Random(3)
+    scores = {f"p{i}": round(rng.uniform(40, 99), 2) for i in range(2000)}
+    index = RankingIndex()
+    index.build(scores.items())
+
+    # Apply a mix of updates, inserts and deletes after the bulk build
+    for i in range(500):
+        player_id = f"p{rng.randrange(2500)}"
+        if rng.random() < 0.2 and player_id in scores:
+            index.remove(player_id)
+            del scores[player_id]
+        else:
+            scores[player_id] = round(rng.uniform(40, 99), 2)
+            index.upsert(player_id, scores[player_id])
+
+    assert len(index) == len(scores)
+    for player_id in list(scores)[:200]:
+        assert index.rank(player_id) == (brute_force_rank(scores, player_id), scores[player_id])
+
+    expected = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:50]
+    top = index.top(50)
+    assert [(player_id, score) for _, player_id, score in top] == expected
+    assert [rank for rank, _, _ in top] == [brute_force_rank(scores, player_id) for player_id, _ in expected]
+
+def test_ties_share_rank():
+    index = RankingIndex()
+    for player_id, score in [('a', 80.0), ('b', 90.5), ('c', 80.0), ('d', 70.25)]:
+        index.upsert(player_id, score)
+
+    assert index.top(10) == [(1, 'b', 90.5), (2, 'a', 80.0), (2, 'c', 80.0), (4, 'd', 70.25)]
+    assert index.top(2) == [(1, 'b', 90.5), (2, 'a', 80.0)]
+    assert index.rank('d') == (4, 70.25)
+    assert index.rank('missing') is None
+
+    index.remove('b')
+    assert index.rank('a') == (1, 80.0)
@@ -0,0 +1,251 @@
+import pytest
+from datetime import datetime
+from http import HTTPStatus
+from bson import ObjectId
+from backend import create_app
+from backend.repositories import close_repositories
+from backend.repositories.base import Checkpoint
+from backend.repositories.memory import InMemoryPlayerRepository
+from backend.repositories.mongo import MongoPlayerRepository
+from backend.repositories.sqlite import SQLitePlayerRepository
+from backend.services.history_service import history_service
+from backend.services.ranking_service import ranking_service
+from backend.services.similarity_service import similarity_service
+from backend.services.search_service import search_service
+from backend.services.stats_service import StatsService, stats_service
+from backend.utils.cache import response_cache
+
+def _doc(name, team='Celtics', position='SF', score=50.0, shooting=70):
+    return {
+        'name': name,
+        'team': team,
+        'position': position,
+        'offense': {'shooting': shooting, 'ball_handling': 60, 'passing': 60, 'speed': 60, 'finishing': 60},
+        'defense': {'perimeter_defense': 60, 'interior_defense': 60, 'steal': 60, 'block': 60, 'rebounding': 60},
+        'overall_score': score,
+        'position_weighted_score': score,
+        'created_at': datetime(2024, 1, 2, 3, 4, 5),
+        'updated_at': datetime(2024, 1, 2, 3, 4, 5)
+    }
+
+@pytest.fixture(params=['mongodb', 'sqlite', 'memory'])
+def repository(request, tmp_path):
+    if request.param == 'mongodb':
+        db = request.getfixturevalue('db')
+        db.team_stats.delete_many({})
+        yield MongoPlayerRepository(db)
+        db.team_stats.delete_many({})
+    elif request.param == 'sqlite':
+        repository = SQLitePlayerRepository(str(tmp_path / 'players.sqlite3'))
+        yield repository
+        repository.close()
+    else:
+        yield InMemoryPlayerRepository()
+
+def test_insert_get_update_delete(repository):
+    doc = _doc('Jayson Tatum')
+    player_id = repository.insert(doc)
+    assert doc['_id'] == player_id
+
+    stored = repository.get(player_id)
+    assert stored == doc
+    assert repository.get(player_id, ('name', 'overall_score')) == {
+        '_id': player_id, 'name': 'Jayson Tatum', 'overall_score': 50.0
+    }
+    assert repository.get(ObjectId()) is None
+
+    # Returned documents are copies
+    stored['offense']['shooting'] = 0
+    assert repository.get(player_id)['offense']['shooting'] == 70
+
+    updated = repository.update(player_id, {'team': 'Lakers', 'overall_score': 61.5})
+    assert updated['team'] == 'Lakers' and updated['overall_score'] == 61.5 and updated['name'] == 'Jayson Tatum'
+    assert [d['_id'] for d in repository.find({'team': 'Lakers'})] == [player_id]
+    assert repository.update(ObjectId(), {'team': 'Lakers'}) is None
+
+    assert repository.delete(player_id)['team'] == 'Lakers'
+    assert repository.delete(player_id) is None
+    assert repository.count() == 0
+
+def test_insert_many_and_lookups(repository):
+    docs = [_doc(f'Player {index}', score=float(index)) for index in range(5)]
+    assert repository.insert_many(docs) == {}
+    assert all(isinstance(doc['_id'], ObjectId) for doc in docs)
+    assert repository.count() == 5
+
+    wanted = [docs[1]['_id'], docs[3]['_id'], ObjectId()]
+    found = repository.get_many(wanted, ('name',))
+    assert sorted(doc['name'] for doc in found) == ['Player 1', 'Player 3']
+    assert sorted(doc['overall_score'] for doc in repository.scan(('overall_score',))) == [0, 1, 2, 3, 4]
+
+def test_find_pages_by_keyset(repository):
+    docs = [
+        _doc('Al Horford', team='Celtics', position='C', score=60.0),
+        _doc('Jrue Holiday', team='Celtics', position='PG', score=70.0),
+        _doc('Derrick White', team='Celtics', position='PG', score=70.0),
+        _doc('LeBron James', team='Lakers', position='SF', score=90.0),
+        _doc('Anthony Davis', team='Lakers', position='PF', score=85.0)
+    ]
+    repository.insert_many(docs)
+
+    def names(**kwargs):
+        return [doc['name'] for doc in repository.find(**kwargs)]
+
+    # Ties on the sort field fall back to _id in the same direction
+    tied = sorted(docs[1:3], key=lambda doc: doc['_id'], reverse=True)
+    assert names() == ['LeBron James', 'Anthony Davis'] + [doc['name'] for doc in tied] + ['Al Horford']
+    assert names(sort_by='name', descending=False) == sorted(doc['name'] for doc in docs)
+
+    first = list(repository.find(limit=3))
+    last = first[-1]
+    rest = names(after=(last['overall_score'], last['_id']))
+    assert [doc['name'] for doc in first] + rest == names()
+
+    ascending = list(repository.find(sort_by='name', descending=False, limit=2))
+    assert names(sort_by='name', descending=False, after=(ascending[-1]['name'], ascending[-1]['_id'])) == [
+        'Derrick White', 'Jrue Holiday', 'LeBron James'
+    ]
+
+    assert names(filters={'team': 'Celtics', 'position': 'PG'}, sort_by='name', descending=False) == [
+        'Derrick White', 'Jrue Holiday'
+    ]
+    assert names(filters={'name': 'JAMES'}) == ['LeBron James']
+    assert names(filters={'name': '.*'}) == []
+
+def test_leaderboard_and_text_search(repository):
+    repository.insert_many([
+        _doc('Jayson Tatum', position='SF', score=88.0),
+        _doc('Jaylen Brown', position='SF', score=84.0),
+        _doc('LeBron James', team='Lakers', position='SF', score=90.0),
+        _doc('Al Horford', position='C', score=70.0)
+    ])
+
+    leaders = repository.position_leaderboard('SF', 2)
+    assert [(doc['name'], doc['position_weighted_score']) for doc in leaders] == [
+        ('LeBron James', 90.0), ('Jayson Tatum', 88.0)
+    ]
+
+    if isinstance(repository, MongoPlayerRepository):
+        pytest.skip("$text needs the text index of a real MongoDB server")
+    matches = [doc['name'] for doc in repository.text_search('celtics tatum', 10)]
+    assert matches[0] == 'Jayson Tatum'
+    assert set(matches) == {'Jayson Tatum', 'Jaylen Brown', 'Al Horford'}
+
+def test_aggregates(repository):
+    repository.replace_aggregates({
+        'league': {'team': None, 'count': 2, 'hist': {'shooting': {'70': 2}}, 'version': 2},
+        'team:Lakers': {'team': 'Lakers', 'count': 0},
+        'team:Celtics': {'team': 'Celtics', 'count': 2}
+    })
+    repository.increment_aggregates({
+        'league': {'count': 1, 'hist.shooting.70': -1, 'hist.shooting.90': 1},
+        'team:Bulls': {'count': 1}
+    })
+
+    aggregates = repository.get_aggregates(['league', 'position:SF'])
+    assert list(aggregates) == ['league']
+    assert aggregates['league']['count'] == 3
+    assert aggregates['league']['hist'] == {'shooting': {'70': 1, '90': 1}}
+    assert repository.get_aggregates(['league'], ('version',))['league'] == {'_id': 'league', 'version': 2}
+    assert [doc['team'] for doc in repository.team_aggregates()] == ['Bulls', 'Celtics']
+
+def test_stats_rebuild_matches_across_repositories(repository):
+    docs = [
+        _doc('Jayson Tatum', position='SF', score=88.0, shooting=90),
+        _doc('Jrue Holiday', position='PG', score=75.0, shooting=80),
+        _doc('LeBron James', team='Lakers', position='SF', score=90.0, shooting=85)
+    ]
+    repository.insert_many([dict(doc) for doc in docs])
+    service = StatsService(repository)
+    service.rebuild()
+
+    reference = StatsService(InMemoryPlayerRepository())
+    reference.repository.insert_many([dict(doc) for doc in docs])
+    reference.rebuild()
+
+    assert service.overview() == reference.overview()
+    assert service.teams() == reference.teams()
+    assert service.distributions('SF') == reference.distributions('SF')
+
+@pytest.fixture
+def sqlite_client(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'PLAYER_REPOSITORY': 'sqlite',
+        'SQLITE_PATH': str(tmp_path / 'players.sqlite3')
+    })
+    with app.app_context():
+        for service in (ranking_service, history_service, stats_service, similarity_service, search_service):
+            service.rebuild()
+        response_cache.clear()
+    yield app.test_client()
+    close_repositories()
+
+def test_api_on_sqlite(sqlite_client):
+    def player(name, position, shooting):
+        return {
+            'name': name,
+            'team': 'Celtics',
+            'position': position,
+            'offense': {'shooting': shooting, 'ball_handling': 60, 'passing': 60, 'speed': 60, 'finishing': 60},
+            'defense': {'perimeter_defense': 60, 'interior_defense': 60, 'steal': 60, 'block': 60, 'rebounding': 60}
+        }
+
+    tatum = sqlite_client.post('/api/players', json=player('Jayson Tatum', 'SF', 90)).get_json()
+    sqlite_client.post('/api/players', json=player('Jrue Holiday', 'PG', 70))
+    bulk = sqlite_client.post('/api/players/bulk', json=[player('Al Horford', 'C', 50), {'name': 'Bad'}])
+    assert bulk.status_code == HTTPStatus.MULTI_STATUS
+
+    assert sqlite_client.get(f"/api/players/{tatum['id']}").get_json() == tatum
+    page = sqlite_client.get('/api/players?per_page=2').get_json()
+    assert [p['name'] for p in page['players']] == ['Jayson Tatum', 'Jrue Holiday']
+    rest = sqlite_client.get(f"/api/players?per_page=2&cursor={page['next_cursor']}").get_json()
+    assert [p['name'] for p in rest['players']] == ['Al Horford'] and rest['next_cursor'] is None
+
+    updated = sqlite_client.put(f"/api/players/{tatum['id']}", json={'offense': {'shooting': 40}}).get_json()
+    assert updated['overall_score'] < tatum['overall_score']
+
+    assert sqlite_client.get('/api/rankings?limit=1').get_json()['players'][0]['name'] == 'Jrue Holiday'
+    assert sqlite_client.get('/api/rankings/sf').get_json()['players'][0]['name'] == 'Jayson Tatum'
+    assert sqlite_client.get('/api/stats/overview').get_json()['total_players'] == 3
+    assert sqlite_client.get('/api/players/search?q=horford&mode=full').get_json()['players'][0]['name'] == 'Al Horford'
+
+    assert sqlite_client.delete(f"/api/players/{tatum['id']}").status_code == HTTPStatus.NO_CONTENT
+    assert sqlite_client.get(f"/api/players/{tatum['id']}").status_code == HTTPStatus.NOT_FOUND
+    assert sqlite_client.get('/api/stats/overview').get_json()['total_players'] == 2
+
+def test_invalid_repository_setting():
+    with pytest.raises(ValueError):
+        create_app({'TESTING': True, 'PLAYER_REPOSITORY': 'postgres'})
+
+def test_history_log_and_checkpoints(repository):
+    first, second = ObjectId(), ObjectId()
+    t0 = datetime(2024, 1, 1, 12, 0, 0)
+    t1 = datetime(2024, 1, 1, 13, 0, 0)
+    start = repository.last_history_seq()
+
+    last = repository.append_history([(t0, first, 50.0, 2), (t0, second, 60.0, 1)])
+    assert last == start + 2
+    assert repository.append_history([(t1, first, None, None)]) == start + 3
+    assert repository.last_history_seq() == start + 3
+
+    events = list(repository.history_events(start))
+    assert [event.seq for event in events] == [start + 1, start + 2, start + 3]
+    assert events[0] == (start + 1, t0, first, 50.0, 2)
+    assert events[2].score is None and events[2].rank is None
+    assert [event.seq for event in repository.history_events(start, start + 2)] == [start + 1, start + 2]
+
+    assert [event.score for event in repository.player_history(first)] == [50.0, None]
+    assert [event.score for event in repository.player_history(first, since=t1)] == [None]
+    assert [event.score for event in repository.player_history(first, until=t0)] == [50.0]
+    assert repository.player_history(ObjectId()) == []
+
+    repository.save_checkpoint(Checkpoint(start + 2, t0, b'old'))
+    repository.save_checkpoint(Checkpoint(start + 3, t1, b'\x00' * 1000))
+    assert repository.latest_checkpoint() == Checkpoint(start + 3, t1, b'\x00' * 1000)
+    assert repository.latest_checkpoint(t0) == Checkpoint(start + 2, t0, b'old')
+    assert repository.latest_checkpoint(datetime(2023, 1, 1)) is None
+
+    # Saving a checkpoint again replaces it
+    repository.save_checkpoint(Checkpoint(start + 2, t0, b'new'))
+    assert repository.latest_checkpoint(t0).data == b'new'
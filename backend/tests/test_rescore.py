@@ -0,0 +1,86 @@
+from datetime import datetime
+import pytest
+from backend.repositories.mongo import MongoPlayerRepository
+from backend.scripts.rescore import JOB_ID, SCORE_PROJECTION, _rescore_batch, rescore
+from backend.services.scoring_service import ScoringService, OFFENSE_FIELDS, DEFENSE_FIELDS, POSITIONS
+from backend.services.stats_service import LEAGUE_ID
+
+def _docs(count):
+    docs = []
+    for index in range(count):
+        doc = ScoringService.score_player({
+            'name': f'Player {index}',
+            'team': 'Celtics' if index % 2 else 'Lakers',
+            'position': POSITIONS[index % len(POSITIONS)],
+            'offense': {stat: 40 + (index * 7 + offset) % 60 for offset, stat in enumerate(OFFENSE_FIELDS)},
+            'defense': {stat: 40 + (index * 3 + offset) % 60 for offset, stat in enumerate(DEFENSE_FIELDS)},
+            'updated_at': datetime(2024, 1, 1)
+        })
+        # Scores from an older formula
+        if index % 3:
+            doc['overall_score'] = 1.0
+            doc['position_weighted_score'] = 2.0
+        docs.append(doc)
+    return docs
+
+@pytest.fixture
+def jobs(db):
+    db.jobs.delete_many({})
+    yield db
+    db.jobs.delete_many({})
+
+def _expected(db):
+    docs = list(db.players.find({}).sort('_id', 1))
+    overall, weighted = ScoringService.score_batch(ScoringService.stats_matrix(docs), [doc['position'] for doc in docs])
+    return docs, overall.tolist(), weighted.tolist()
+
+def test_rescore_writes_every_stale_score(jobs):
+    db = jobs
+    db.players.insert_many(_docs(23))
+    lines = []
+    summary = rescore(db, workers=0, chunk_size=5, batch_size=2, report=lines.append)
+
+    assert summary['partitions'] == 5 and summary['scanned'] == 23
+    assert summary['changed'] >= 15
+    assert len(lines) == 5 and lines[-1].startswith('5/5 partitions, 23 players')
+    docs, overall, weighted = _expected(db)
+    assert [doc['overall_score'] for doc in docs] == overall
+    assert [doc['position_weighted_score'] for doc in docs] == weighted
+
+    # Aggregates and rank history follow the new scores
+    league = db.team_stats.find_one({'_id': LEAGUE_ID})
+    assert league['overall_score_sum'] == pytest.approx(sum(overall))
+    changed = MongoPlayerRepository(db).player_history(docs[1]['_id'])
+    assert [(event.score, event.rank) for event in changed] == [(overall[1], None)]
+
+    # A finished run starts over, and finds nothing left to change
+    assert rescore(db, workers=0, chunk_size=5, report=None)['changed'] == 0
+
+def test_rescore_resumes_after_interruption(jobs):
+    db = jobs
+    db.players.insert_many(_docs(12))
+
+    def interrupt(line):
+        raise KeyboardInterrupt
+    with pytest.raises(KeyboardInterrupt):
+        rescore(db, workers=0, chunk_size=4, report=interrupt)
+    job = db.jobs.find_one({'_id': JOB_ID})
+    assert job['done'] == [0] and job['finished_at'] is None
+
+    summary = rescore(db, workers=0, chunk_size=4, report=None)
+    assert summary['scanned'] == 8
+    docs, overall, _ = _expected(db)
+    assert [doc['overall_score'] for doc in docs] == overall
+    assert db.jobs.find_one({'_id': JOB_ID})['finished_at'] is not None
+
+def test_rescore_skips_players_edited_meanwhile(jobs):
+    db = jobs
+    db.players.insert_many(_docs(3))
+    docs = list(db.players.find({}, SCORE_PROJECTION).sort('_id', 1))
+    # Player 1 is saved with new scores after the batch was read
+    db.players.update_one({'_id': docs[1]['_id']}, {'$set': {'overall_score': 77.0, 'updated_at': datetime(2025, 1, 1)}})
+
+    assert _rescore_batch(db, docs) == 1
+    assert db.players.find_one({'_id': docs[1]['_id']})['overall_score'] == 77.0
+    assert MongoPlayerRepository(db).player_history(docs[1]['_id']) == []
+    assert len(MongoPlayerRepository(db).player_history(docs[2]['_id'])) == 1
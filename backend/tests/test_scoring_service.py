@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from backend.services.scoring_service import (
+    ScoringService, OFFENSE_FIELDS, DEFENSE_FIELDS, POSITIONS
+)
+
+def make_players(count, seed=7):
+    rng = np.random.default_rng(seed)
+    stats = rng.integers(0, 101, size=(count, 10))
+    positions = [POSITIONS[i] for i in rng.integers(0, len(POSITIONS), size=count)]
+    players = [
+        {
+            'position': position,
+            'offense': dict(zip(OFFENSE_FIELDS, map(int, row[:5]))),
+            'defense': dict(zip(DEFENSE_FIELDS, map(int, row[5:])))
+        }
+        for row, position in zip(stats, positions)
+    ]
+    return players
+
+def test_score_batch_matches_scalar_functions():
+    players = make_players(500)
+    matrix = ScoringService.stats_matrix(players)
+    overall, weighted = ScoringService.score_batch(matrix, [p['position'] for p in players])
+
+    for i, player in enumerate(players):
+        expected_overall = ScoringService.calculate_overall_score(player['offense'], player['defense'])
+        expected_weighted = ScoringService.calculate_position_weighted_score(
+            player['offense'], player['defense'], player['position']
+        )
+        assert overall[i] == pytest.approx(expected_overall, abs=0.011)
+        assert weighted[i] == pytest.approx(expected_weighted, abs=0.011)
+
+def test_score_batch_accepts_position_codes():
+    players = make_players(50)
+    matrix = ScoringService.stats_matrix(players)
+    names = [p['position'] for p in players]
+    codes = ScoringService.position_codes(names)
+
+    by_name = ScoringService.score_batch(matrix, names)
+    by_code = ScoringService.score_batch(matrix, codes)
+    assert np.array_equal(by_name[0], by_code[0])
+    assert np.array_equal(by_name[1], by_code[1])
+
+def test_score_batch_rejects_invalid_input():
+    with pytest.raises(ValueError):
+        ScoringService.score_batch(np.zeros((2, 9)), ['PG', 'C'])
+    with pytest.raises(ValueError):
+        ScoringService.score_batch(np.zeros((2, 10)), ['PG', 'XX'])
+    with pytest.raises(ValueError):
+        ScoringService.score_batch(np.zeros((2, 10)), ['PG'])
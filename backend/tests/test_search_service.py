@@ -0,0 +1,71 @@
+import random
+import pytest
+from backend.services.search_service import SearchIndex, tokenize
+
+def doc(name, team="Lakers", score=50.0, position="SF"):
+    return {"name": name, "team": team, "position": position, "overall_score": score}
+
+@pytest.fixture
+def index():
+    index = SearchIndex()
+    index.build([
+        ("p1", doc("LeBron James", score=90.0)),
+        ("p2", doc("James Harden", team="Clippers", score=85.0)),
+        ("p3", doc("Jamal Murray", team="Nuggets", score=80.0)),
+        ("p4", doc("Lebron Smith", team="Jazz", score=40.0)),
+        ("p5", doc("Nikola Jokić", team="Nuggets", score=95.0, position="C")),
+        ("p6", doc("D'Angelo Russell", score=70.0, position="PG")),
+    ])
+    return index
+
+def ids(results):
+    return [(player['id'], tier) for player, tier in results]
+
+def test_tokenize_folds_case_accents_and_apostrophes():
+    assert tokenize("Nikola Jokić") == ["nikola", "jokic"]
+    assert tokenize("D'Angelo Russell") == ["dangelo", "russell"]
+
+def test_results_ranked_by_match_quality_then_score(index):
+    assert ids(index.search("james")) == [("p2", "prefix"), ("p1", "word")]
+    assert ids(index.search("lebron james")) == [("p1", "exact")]
+    assert ids(index.search("jam")) == [("p2", "prefix"), ("p3", "prefix"), ("p1", "word")]
+    assert ids(index.search("lebron j")) == [("p1", "prefix")]
+    assert ids(index.search("le ja")) == [("p1", "word")]
+    assert ids(index.search("nugg")) == [("p5", "team"), ("p3", "team")]
+    assert ids(index.search("jokic")) == [("p5", "word")]
+    assert ids(index.search("jam", limit=1)) == [("p2", "prefix")]
+
+def test_typos_fall_back_to_fuzzy_matches(index):
+    assert ids(index.search("lebrn")) == [("p1", "fuzzy"), ("p4", "fuzzy")]
+    assert ids(index.search("nikola jokci")) == [("p5", "fuzzy")]
+    assert ids(index.search("zzz")) == []
+    assert ids(index.search("russel")) == [("p6", "word")]
+    assert ids(index.search("rusell")) == [("p6", "fuzzy")]
+
+def test_writes_keep_postings_in_sync(index):
+    index.upsert("p4", doc("Lebron Smith", team="Jazz", score=99.0))
+    assert ids(index.search("lebron")) == [("p4", "prefix"), ("p1", "prefix")]
+    index.upsert("p4", doc("Walker Kessler", team="Jazz", score=99.0))
+    assert ids(index.search("lebron")) == [("p1", "prefix")]
+    index.remove("p1")
+    assert ids(index.search("lebron")) == []
+    assert ids(index.search("jazz")) == [("p4", "team")]
+
+def test_incremental_writes_match_build():
+    rng = random.Random(3)
+    first = ["anthony", "andre", "alex", "bam", "ben", "chris"]
+    last = ["davis", "drummond", "adebayo", "simmons", "paul", "caruso"]
+    docs = {
+        f"p{i}": doc(f"{rng.choice(first)} {rng.choice(last)}", team=rng.choice(["Heat", "Hawks"]), score=float(rng.randint(0, 100)))
+        for i in range(200)
+    }
+    incremental = SearchIndex()
+    incremental.build([])
+    for player_id, player in docs.items():
+        incremental.upsert(player_id, doc("placeholder", score=1.0))
+        incremental.upsert(player_id, player)
+    built = SearchIndex()
+    built.build(docs.items())
+
+    for query in ("a", "an da", "ben", "heat", "chris paul", "drumond", "hawks b"):
+        assert ids(incremental.search(query, 20)) == ids(built.search(query, 20))
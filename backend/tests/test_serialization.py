@@ -0,0 +1,68 @@
+import json
+from datetime import date, datetime, timedelta, timezone
+import numpy as np
+import pytest
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date as werkzeug_http_date
+from backend.models.player import Player
+from backend.utils import serialization
+from backend.utils.serialization import FastJSONProvider, http_date, player_row
+
+DOC = {
+    '_id': ObjectId(),
+    'name': 'Nikola Jokic',
+    'team': 'Nuggets',
+    'position': 'C',
+    'offense': {'shooting': 85, 'ball_handling': 80, 'passing': 97, 'speed': 60, 'finishing': 90},
+    'defense': {'perimeter_defense': 55, 'interior_defense': 75, 'steal': 70, 'block': 60, 'rebounding': 95},
+    'overall_score': 76.7,
+    'position_weighted_score': 81.25,
+    'created_at': datetime(2024, 2, 29, 13, 5, 9, 123000),
+    'updated_at': datetime(2024, 3, 1, 0, 0, 0)
+}
+
+@pytest.mark.parametrize('value', [
+    datetime(2024, 2, 29, 13, 5, 9, 123000),
+    datetime(1999, 12, 31, 23, 59, 59),
+    datetime(2024, 6, 1, 2, 30, tzinfo=timezone(timedelta(hours=5))),
+    date(2023, 1, 7)
+])
+def test_http_date_matches_werkzeug(value):
+    assert http_date(value) == werkzeug_http_date(value)
+
+def test_player_row_matches_player_dict(app):
+    legacy = dict(DOC)
+    legacy['id'] = str(legacy.pop('_id'))
+    with app.app_context():
+        expected = json.loads(DefaultJSONProvider(app).dumps(Player(**legacy).dict()))
+        assert json.loads(app.json.dumps(player_row(DOC))) == expected
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_provider_matches_default_encoding(app, monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(serialization, 'orjson', None)
+    payload = {'player': dict(DOC), 'scores': np.array([1.5, 2.0])[0]}
+    provider = FastJSONProvider(app)
+    decoded = json.loads(provider.dumps(payload))
+    assert decoded['player']['_id'] == str(DOC['_id'])
+    assert decoded['player']['created_at'] == 'Thu, 29 Feb 2024 13:05:09 GMT'
+    assert decoded['scores'] == 1.5
+    with app.app_context():
+        response = provider.response(DOC)
+    assert response.mimetype == 'application/json'
+    assert json.loads(response.get_data())['name'] == 'Nikola Jokic'
+
+def test_read_endpoints_return_player_shape(client, db):
+    created = client.post('/api/players', json={
+        field: DOC[field] for field in ('name', 'team', 'position', 'offense', 'defense')
+    }).get_json()
+    fetched = client.get(f"/api/players/{created['id']}").get_json()
+    listed = client.get('/api/players').get_json()['players']
+    # Timestamps missing from the document render as the current time
+    for row in (fetched, *listed):
+        for field in ('created_at', 'updated_at'):
+            assert row.pop(field).endswith(' GMT')
+            created.pop(field, None)
+    assert fetched == created
+    assert listed == [created]
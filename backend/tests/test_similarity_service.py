@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from backend.services.similarity_service import SimilarityIndex
+
+def brute_force(vectors, positions, row, metric, position=None):
+    query = vectors[row]
+    results = []
+    for other, vector in enumerate(vectors):
+        if other == row or (position is not None and positions[other] != position):
+            continue
+        if metric == 'cosine':
+            distance = 1 - vector @ query / (np.linalg.norm(vector) * np.linalg.norm(query))
+        else:
+            distance = np.linalg.norm(vector - query)
+        results.append((f"p{other}", distance))
+    return sorted(results, key=lambda item: item[1])
+
+@pytest.mark.parametrize('metric', ['cosine', 'euclidean'])
+def test_nearest_matches_brute_force(metric):
+    rng = np.random.default_rng(5)
+    vectors = rng.integers(1, 101, size=(300, 10)).astype(np.float64)
+    positions = rng.choice(['PG', 'SG', 'SF', 'PF', 'C'], size=300)
+    index = SimilarityIndex(capacity=16)
+    for row, (vector, position) in enumerate(zip(vectors, positions)):
+        index.upsert(f"p{row}", vector, position)
+
+    for row in (0, 17, 299):
+        expected = brute_force(vectors, positions, row, metric)[:5]
+        result = index.nearest(f"p{row}", 5, metric)
+        assert [player_id for player_id, _ in result] == [player_id for player_id, _ in expected]
+        assert [d for _, d in result] == pytest.approx([d for _, d in expected], abs=1e-3)
+
+    expected = brute_force(vectors, positions, 3, metric, 'C')[:4]
+    assert [player_id for player_id, _ in index.nearest("p3", 4, metric, 'C')] == [p for p, _ in expected]
+
+def test_remove_keeps_rows_consistent():
+    index = SimilarityIndex(capacity=2)
+    index.upsert('a', [50] * 10, 'PG')
+    index.upsert('b', [90] * 10, 'PG')
+    index.upsert('c', [52] * 10, 'PG')
+    index.remove('a')
+
+    assert len(index) == 2
+    assert index.nearest('a', 3, 'euclidean') is None
+    assert index.nearest('c', 3, 'euclidean') == [('b', pytest.approx(np.sqrt(10) * 38))]
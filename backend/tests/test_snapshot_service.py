@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+from bson import ObjectId
+from backend.repositories.memory import InMemoryPlayerRepository
+from backend.services.history_service import HistoryService
+from backend.services.ranking_service import RankingService
+from backend.services.scoring_service import ScoringService, STAT_FIELDS, OFFENSE_FIELDS, DEFENSE_FIELDS, POSITIONS
+from backend.services.similarity_service import SimilarityService
+from backend.services.snapshot_service import SnapshotService, read_snapshot
+
+def _player(index, shooting=None):
+    return ScoringService.score_player({
+        'name': f'Player {index}',
+        'team': 'Celtics',
+        'position': POSITIONS[index % len(POSITIONS)],
+        'offense': {stat: shooting or 40 + (index * 7 + offset) % 60 for offset, stat in enumerate(OFFENSE_FIELDS)},
+        'defense': {stat: 40 + (index * 3 + offset) % 60 for offset, stat in enumerate(DEFENSE_FIELDS)}
+    })
+
+@pytest.fixture
+def roster(tmp_path):
+    repository = InMemoryPlayerRepository()
+    repository.insert_many([_player(index) for index in range(40)])
+    history = HistoryService(repository=repository)
+    snapshots = SnapshotService(path=str(tmp_path / 'roster.snapshot'), repository=repository)
+    return repository, history, snapshots
+
+def test_write_and_map_snapshot(roster):
+    repository, history, snapshots = roster
+    snapshot = snapshots.write()
+    docs = sorted(repository.scan(), key=lambda doc: doc['_id'].binary)
+
+    assert snapshot.seq == 0 and len(snapshot.ids) == 40
+    assert snapshot.id_strings() == [str(doc['_id']) for doc in docs]
+    assert snapshot.stats.shape == (len(STAT_FIELDS), 40) and snapshot.stats.dtype == np.uint8
+    assert np.array_equal(snapshot.stats.T, ScoringService.stats_matrix(docs))
+    assert snapshot.overall.tolist() == [round(doc['overall_score'] * 100) for doc in docs]
+    assert snapshot.weighted.tolist() == [round(doc['position_weighted_score'] * 100) for doc in docs]
+    assert snapshot.positions.tolist() == ScoringService.position_codes([doc['position'] for doc in docs]).tolist()
+
+    # Columns are read-only views over the mapped file
+    assert not snapshot.stats.flags.writeable
+    assert snapshots.snapshot() is snapshot
+    assert read_snapshot(snapshots.path).seq == snapshot.seq
+
+def test_invalid_snapshot_files(tmp_path, roster):
+    _, _, snapshots = roster
+    path = tmp_path / 'other'
+    path.write_bytes(b'\0' * 128)
+    with pytest.raises(ValueError):
+        read_snapshot(str(path))
+
+    snapshots.write()
+    data = open(snapshots.path, 'rb').read()
+    path.write_bytes(data[:-64])
+    with pytest.raises(ValueError):
+        read_snapshot(str(path))
+
+def _apply_changes(repository, history):
+    """Update, create and delete players through the history hooks"""
+    docs = sorted(repository.scan(), key=lambda doc: doc['name'])
+    previous = docs[0]
+    updated = repository.update(previous['_id'], _player(0, shooting=99))
+    history.on_player_saved(str(previous['_id']), updated, previous)
+    # A position change keeps the overall score, and is still replayed
+    previous = docs[1]
+    moved = repository.update(previous['_id'], ScoringService.score_player(dict(previous, position='C')))
+    history.on_player_saved(str(previous['_id']), moved, previous)
+
+    created = [_player(100), _player(101)]
+    repository.insert_many(created)
+    history.on_players_created([(str(doc['_id']), doc) for doc in created])
+    deleted = repository.delete(docs[2]['_id'])
+    history.on_player_deleted(str(deleted['_id']), deleted)
+
+def test_indexes_start_from_snapshot_plus_replay(roster):
+    repository, history, snapshots = roster
+    history.ensure_started()
+    snapshots.write()
+    _apply_changes(repository, history)
+
+    snapshot, changed, removed = snapshots.load(repository)
+    assert len(changed) == 4 and len(removed) == 1
+
+    ranking = RankingService(repository=repository, snapshots=snapshots)
+    ranking.rebuild()
+    reference = RankingService(repository=repository)
+    reference.rebuild()
+    assert len(ranking.index) == 41
+    assert ranking.index.top(41) == reference.index.top(41)
+
+    similarity = SimilarityService(repository=repository, snapshots=snapshots)
+    similarity.rebuild()
+    reference = SimilarityService(repository=repository)
+    reference.rebuild()
+    moved = next(doc for doc in repository.scan() if doc['name'] == 'Player 1')
+    for metric in ('cosine', 'euclidean'):
+        assert similarity.similar_players(str(moved['_id']), k=10, metric=metric) == \
+            reference.similar_players(str(moved['_id']), k=10, metric=metric)
+
+def test_unusable_snapshot_falls_back_to_scan(tmp_path, roster):
+    repository, history, snapshots = roster
+    assert SnapshotService(path=str(tmp_path / 'missing'), repository=repository).load(repository) is None
+
+    # A snapshot ahead of the log belongs to a log that was since reset
+    history.ensure_started()
+    _apply_changes(repository, history)
+    snapshots.write()
+    assert snapshots.load(InMemoryPlayerRepository()) is None
+    ranking = RankingService(repository=InMemoryPlayerRepository(), snapshots=snapshots)
+    ranking.rebuild()
+    assert len(ranking.index) == 0
@@ -0,0 +1,62 @@
+import copy
+import random
+import pytest
+from marshmallow import ValidationError
+from backend.utils.validators import (
+    PlayerSchema, validate_player_data, validate_players_batch, format_validation_errors
+)
+
+VALID_PLAYER = {
+    "name": "Luka Doncic",
+    "team": "Mavericks",
+    "position": "PG",
+    "offense": {"shooting": 88, "ball_handling": 95, "passing": 95, "speed": 75, "finishing": 88},
+    "defense": {"perimeter_defense": 65, "interior_defense": 60, "steal": 70, "block": 45, "rebounding": 85}
+}
+
+ODD_VALUES = [0, 100, -1, 101, 50.0, 50.5, '50', ' 50', '5x', True, None, [], {}, 'PG', 'pg', '', 'A', 'x' * 51, b'Bo']
+
+def mutations(rng, count):
+    """Yield random variants of VALID_PLAYER with odd values, missing and extra keys"""
+    paths = [('name',), ('team',), ('position',), ('offense',), ('defense',)]
+    paths += [(group, field) for group in ('offense', 'defense') for field in VALID_PLAYER[group]]
+    for _ in range(count):
+        player = copy.deepcopy(VALID_PLAYER)
+        for _ in range(rng.randint(0, 3)):
+            path = rng.choice(paths)
+            parent = player if len(path) == 1 else player.get(path[0])
+            if not isinstance(parent, dict):
+                continue
+            action = rng.random()
+            if action < 0.15:
+                parent.pop(path[-1], None)
+            elif action < 0.25:
+                parent['unexpected'] = 1
+            else:
+                parent[path[-1]] = rng.choice(ODD_VALUES)
+        yield player
+
+def reference(data):
+    try:
+        return PlayerSchema().load(data), None
+    except ValidationError as e:
+        return None, e.messages
+
+def test_matches_marshmallow_schema():
+    rng = random.Random(11)
+    for player in [VALID_PLAYER, None, [], 'player'] + list(mutations(rng, 2000)):
+        expected, expected_errors = reference(player)
+        try:
+            assert validate_player_data(player) == expected
+            assert expected_errors is None
+        except ValidationError as e:
+            assert e.messages == expected_errors
+
+def test_batch_keeps_row_indexes():
+    bad = dict(VALID_PLAYER, position='XX')
+    rows, errors = validate_players_batch([VALID_PLAYER, bad, 'junk', VALID_PLAYER])
+    assert rows[0] == rows[3] == VALID_PLAYER
+    assert rows[0] is not VALID_PLAYER
+    assert rows[1] is None and rows[2] is None
+    assert format_validation_errors(errors[1]) == {'position': 'Must be one of: PG, SG, SF, PF, C.'}
+    assert errors[2] == {'_schema': ['Invalid input type.']}
@@ -0,0 +1,178 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from http import HTTPStatus
+from typing import Callable, Dict, Iterable, NamedTuple, Optional
+from flask import current_app, request
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    mimetype: str
+    expires_at: float
+    tags: tuple
+
+class ResponseCache:
+    """
+    Bounded in-process cache of rendered GET responses
+    
+    Entries are evicted least-recently-used once max_entries is reached and
+    expire after ttl seconds. Each entry carries tags so writes can drop
+    exactly the responses they affect; a per-tag version makes sure a
+    response rendered while a write was in flight is never stored.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 60.0):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._tag_keys: Dict[str, set] = {}
+        self._tag_versions: Dict[str, int] = {}
+        self.configure(max_entries, ttl)
+        self.reset_stats()
+
+    def configure(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tag_keys.clear()
+
+    def versions(self, tags: Iterable[str]) -> tuple:
+        with self._lock:
+            return tuple(self._tag_versions.get(tag, 0) for tag in tags)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key: str, body: bytes, etag: str, mimetype: str, tags: tuple, versions: tuple):
+        """Store a response unless one of its tags was invalidated since versions was taken"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if tuple(self._tag_versions.get(tag, 0) for tag in tags) != versions:
+                return
+            self._remove(key)
+            self._entries[key] = CachedResponse(body, etag, mimetype, time.monotonic() + self.ttl, tags)
+            for tag in tags:
+                self._tag_keys.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, *tags: str):
+        """Drop every entry carrying any of the tags"""
+        with self._lock:
+            for tag in tags:
+                self._tag_versions[tag] = self._tag_versions.get(tag, 0) + 1
+                for key in self._tag_keys.pop(tag, ()):
+                    if self._remove(key):
+                        self.invalidations += 1
+
+    def _remove(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        for tag in entry.tags:
+            keys = self._tag_keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_keys[tag]
+        return True
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
+
+response_cache = ResponseCache()
+
+PLAYER_LIST_TAG = 'players:list'
+
+def player_tag(player_id: str) -> str:
+    return f'player:{player_id}'
+
+class PlayerCacheInvalidator:
+    """PlayerService listener that drops cached responses a write affects"""
+
+    def __init__(self, cache: ResponseCache):
+        self.cache = cache
+
+    def on_player_saved(self, player_id: str, doc: Dict, previous: Optional[Dict] = None):
+        self.cache.invalidate(player_tag(player_id), PLAYER_LIST_TAG)
+
+    def on_player_deleted(self, player_id: str, doc: Dict):
+        self.cache.invalidate(player_tag(player_id), PLAYER_LIST_TAG)
+
+def _etag(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+def cached(tags: Callable[..., Iterable[str]], cache: ResponseCache = response_cache):
+    """
+    Cache successful GET responses of a view and answer If-None-Match
+    
+    Args:
+        tags: Called with the view arguments; returns the tags writes use
+            to invalidate the response
+        cache: Cache to store responses in
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+            
+            key = request.full_path
+            entry = cache.get(key)
+            status = 'HIT'
+            if entry is None:
+                status = 'MISS'
+                entry_tags = tuple(tags(*args, **kwargs))
+                versions = cache.versions(entry_tags)
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != HTTPStatus.OK or response.is_streamed:
+                    return response
+                body = response.get_data()
+                entry = CachedResponse(body, _etag(body), response.mimetype, 0, entry_tags)
+                cache.set(key, body, entry.etag, entry.mimetype, entry_tags, versions)
+            
+            if request.if_none_match.contains(entry.etag):
+                response = current_app.response_class(status=HTTPStatus.NOT_MODIFIED)
+            else:
+                response = current_app.response_class(entry.body, mimetype=entry.mimetype)
+            response.set_etag(entry.etag)
+            response.headers['X-Cache'] = status
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,179 @@
+import re
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List
+from ..services.scoring_service import OFFENSE_FIELDS, DEFENSE_FIELDS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow is optional; CSV export works without it
+    pa = pq = None
+
+# Flat columns, the stats under the names the CSV bulk upload reads
+STAT_FIELDS = (*OFFENSE_FIELDS, *DEFENSE_FIELDS)
+EXPORT_COLUMNS = (
+    'id', 'name', 'team', 'position', *STAT_FIELDS,
+    'overall_score', 'position_weighted_score', 'created_at', 'updated_at'
+)
+EXPORT_FIELDS = ('name', 'team', 'position', 'offense', 'defense',
+                 'overall_score', 'position_weighted_score', 'created_at', 'updated_at')
+
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.stream'
+}
+# Formats written with pyarrow
+ARROW_FORMATS = ('parquet', 'arrow')
+
+def export_schema():
+    """Arrow schema of the exported columns"""
+    return pa.schema(
+        [('id', pa.string()), ('name', pa.string()), ('team', pa.string()), ('position', pa.string())]
+        + [(field, pa.uint8()) for field in STAT_FIELDS]
+        + [
+            ('overall_score', pa.float64()),
+            ('position_weighted_score', pa.float64()),
+            ('created_at', pa.timestamp('ms')),
+            ('updated_at', pa.timestamp('ms'))
+        ]
+    )
+
+def column_batches(docs: Iterable[Dict], batch_size: int) -> Iterator[Dict[str, List]]:
+    """Group player documents into batch_size rows of EXPORT_COLUMNS lists"""
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) == batch_size:
+            yield _columns(batch)
+            batch = []
+    if batch:
+        yield _columns(batch)
+
+def _columns(docs: List[Dict]) -> Dict[str, List]:
+    columns = {
+        'id': [str(doc['_id']) for doc in docs],
+        'name': [doc.get('name') for doc in docs],
+        'team': [doc.get('team') for doc in docs],
+        'position': [doc.get('position') for doc in docs]
+    }
+    offense = [doc.get('offense') or {} for doc in docs]
+    defense = [doc.get('defense') or {} for doc in docs]
+    for field in OFFENSE_FIELDS:
+        columns[field] = [stats.get(field) for stats in offense]
+    for field in DEFENSE_FIELDS:
+        columns[field] = [stats.get(field) for stats in defense]
+    for field in ('overall_score', 'position_weighted_score', 'created_at', 'updated_at'):
+        columns[field] = [doc.get(field) for doc in docs]
+    return columns
+
+def export_chunks(docs: Iterable[Dict], export_format: str, batch_size: int = 10000) -> Iterator[bytes]:
+    """
+    Encode player documents as a stream of byte chunks, one per batch
+    
+    Only one batch of documents and its encoded bytes are held at a time,
+    whatever the number of players.
+    
+    Args:
+        docs: Player documents, typically a database cursor
+        export_format: csv, parquet or arrow (an Arrow IPC stream)
+        batch_size: Rows per chunk, and per Parquet row group
+        
+    Raises:
+        ValueError: If the format is unknown
+        RuntimeError: If the format needs pyarrow and it is not installed
+    """
+    if export_format not in EXPORT_MIMETYPES:
+        raise ValueError(f"Invalid format: {export_format}. Must be one of {', '.join(EXPORT_MIMETYPES)}")
+    if export_format in ARROW_FORMATS and pa is None:
+        raise RuntimeError(f"{export_format} export needs pyarrow installed")
+    if export_format == 'csv':
+        return _csv_chunks(docs, batch_size)
+    return _arrow_chunks(column_batches(docs, batch_size), export_format)
+
+# Characters that make a CSV field need quotes
+_NEEDS_QUOTES = re.compile(r'[",\r\n]')
+
+def _text(value) -> str:
+    if value is None:
+        return ''
+    value = str(value)
+    if _NEEDS_QUOTES.search(value):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+def _csv_chunks(docs: Iterable[Dict], batch_size: int) -> Iterator[bytes]:
+    """
+    Rows formatted straight from the documents, as csv.writer would write them
+    
+    One format string per row is about twice as fast as csv.writer; only
+    the text columns can need quoting. Players written together share
+    their timestamps, so each distinct one is formatted once per batch.
+    """
+    offense = itemgetter(*OFFENSE_FIELDS)
+    defense = itemgetter(*DEFENSE_FIELDS)
+    row = ','.join(['%s'] * len(EXPORT_COLUMNS)) + '\r\n'
+    dates = {None: ''}
+
+    def date(value) -> str:
+        text = dates.get(value)
+        if text is None:
+            text = dates[value] = value.isoformat()
+        return text
+    
+    lines = [','.join(EXPORT_COLUMNS) + '\r\n']
+    for doc in docs:
+        overall, weighted = doc.get('overall_score'), doc.get('position_weighted_score')
+        lines.append(row % (
+            doc['_id'], _text(doc.get('name')), _text(doc.get('team')), _text(doc.get('position')),
+            *offense(doc['offense']), *defense(doc['defense']),
+            '' if overall is None else overall, '' if weighted is None else weighted,
+            date(doc.get('created_at')), date(doc.get('updated_at'))
+        ))
+        if len(lines) >= batch_size:
+            yield ''.join(lines).encode()
+            lines = []
+            dates = {None: ''}
+    yield ''.join(lines).encode()
+
+class _Drain:
+    """Write-only file object whose bytes are taken out after every batch"""
+
+    def __init__(self):
+        self.parts = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+def _arrow_chunks(batches: Iterator[Dict[str, List]], export_format: str) -> Iterator[bytes]:
+    schema = export_schema()
+    drain = _Drain()
+    sink = pa.PythonFile(drain, mode='w')
+    if export_format == 'parquet':
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    try:
+        for columns in batches:
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(columns[field.name], type=field.type) for field in schema],
+                schema=schema
+            ))
+            yield drain.take()
+    finally:
+        # Parquet's footer and the stream's end marker
+        writer.close()
+    yield drain.take()
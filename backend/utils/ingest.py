@@ -0,0 +1,71 @@
+import csv
+import io
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from ..services.scoring_service import OFFENSE_FIELDS, DEFENSE_FIELDS
+
+JSON_MIMETYPE = 'application/json'
+NDJSON_MIMETYPE = 'application/x-ndjson'
+CSV_MIMETYPE = 'text/csv'
+
+SUPPORTED_MIMETYPES = (JSON_MIMETYPE, NDJSON_MIMETYPE, CSV_MIMETYPE)
+
+def parse_players_payload(body: str, mimetype: str) -> Tuple[List[Optional[Any]], Dict[int, Dict]]:
+    """
+    Parse a bulk upload body into one raw record per player
+    
+    Args:
+        body: Request body text
+        mimetype: application/json (array), application/x-ndjson or text/csv
+        
+    Returns:
+        Tuple of (records, errors). Records that could not be parsed are
+        None and have an entry in errors keyed by their row index.
+        
+    Raises:
+        ValueError: If the body or mimetype is unusable as a whole
+    """
+    if mimetype == JSON_MIMETYPE:
+        try:
+            records = json.loads(body)
+        except ValueError:
+            raise ValueError("Body is not valid JSON")
+        if not isinstance(records, list):
+            raise ValueError("JSON body must be an array of players")
+        return records, {}
+    if mimetype == NDJSON_MIMETYPE:
+        return _parse_ndjson(body)
+    if mimetype == CSV_MIMETYPE:
+        return _parse_csv(body)
+    raise ValueError(f"Unsupported content type. Allowed: {SUPPORTED_MIMETYPES}")
+
+def _parse_ndjson(body: str) -> Tuple[List[Optional[Any]], Dict[int, Dict]]:
+    records, errors = [], {}
+    for line in body.splitlines():
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            errors[len(records)] = {'_schema': ['Invalid JSON.']}
+            records.append(None)
+    return records, errors
+
+def _parse_csv(body: str) -> Tuple[List[Optional[Any]], Dict[int, Dict]]:
+    """CSV rows carry name, team, position and the ten stats as flat columns"""
+    reader = csv.DictReader(io.StringIO(body))
+    missing = {'name', 'team', 'position', *OFFENSE_FIELDS, *DEFENSE_FIELDS} - set(reader.fieldnames or [])
+    if missing:
+        raise ValueError(f"CSV header is missing columns: {sorted(missing)}")
+
+    records = [
+        {
+            'name': row['name'],
+            'team': row['team'],
+            'position': row['position'],
+            'offense': {field: row[field] for field in OFFENSE_FIELDS},
+            'defense': {field: row[field] for field in DEFENSE_FIELDS}
+        }
+        for row in reader
+    ]
+    return records, {}
@@ -0,0 +1,202 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+from flask import g, has_app_context, request
+from pymongo import monitoring
+
+# Upper bounds in seconds; the +Inf bucket is implied
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+class Histogram:
+    """Fixed-bucket latency histogram; callers hold the registry lock"""
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Return (le, count) pairs as Prometheus expects them"""
+        pairs = []
+        total = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), self.counts):
+            total += count
+            pairs.append(('+Inf' if bound == float('inf') else repr(bound), total))
+        return pairs
+
+class MetricsRegistry:
+    """
+    In-process request, stage and MongoDB command latency histograms
+
+    Recording is a bucket lookup and three additions under a lock; the
+    Prometheus text is only rendered when /api/metrics is scraped.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests: Dict[tuple, Histogram] = {}
+            self.stages: Dict[tuple, Histogram] = {}
+            self.commands: Dict[tuple, Histogram] = {}
+
+    @staticmethod
+    def _observe(histograms: Dict[tuple, Histogram], labels: tuple, seconds: float):
+        histogram = histograms.get(labels)
+        if histogram is None:
+            histogram = histograms[labels] = Histogram()
+        histogram.observe(seconds)
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, stages: Dict[str, float]):
+        with self._lock:
+            self._observe(self.requests, (method, route, str(status)), seconds)
+            for name, stage_seconds in stages.items():
+                self._observe(self.stages, (route, name), stage_seconds)
+
+    def observe_command(self, command: str, outcome: str, seconds: float):
+        with self._lock:
+            self._observe(self.commands, (command, outcome), seconds)
+
+    def render(self, extra: Iterable[str] = ()) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        with self._lock:
+            families = [
+                ('http_request_duration_seconds', "HTTP request latency by route",
+                 ('method', 'route', 'status'), dict(self.requests)),
+                ('http_request_stage_duration_seconds', "Time spent per request stage by route",
+                 ('route', 'stage'), dict(self.stages)),
+                ('mongodb_command_duration_seconds', "MongoDB command latency by command",
+                 ('command', 'outcome'), dict(self.commands))
+            ]
+            lines = []
+            for name, help_text, label_names, histograms in families:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(histograms.items()):
+                    label_text = ','.join(
+                        f'{label}="{_escape(value)}"' for label, value in zip(label_names, labels)
+                    )
+                    for le, count in histogram.cumulative():
+                        lines.append(f'{name}_bucket{{{label_text},le="{le}"}} {count}')
+                    lines.append(f"{name}_sum{{{label_text}}} {histogram.sum!r}")
+                    lines.append(f"{name}_count{{{label_text}}} {histogram.count}")
+        lines.extend(extra)
+        return '\n'.join(lines) + '\n'
+
+metrics = MetricsRegistry()
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _stage_timings() -> Optional[Dict[str, float]]:
+    """Return the current request's stage timings, or None when not timing"""
+    if not has_app_context():
+        return None
+    # Resolve the proxy once; attribute access through it is comparatively slow
+    return getattr(g._get_current_object(), 'stage_timings', None)
+
+def add_stage_time(name: str, seconds: float):
+    """Charge seconds to a stage of the current request, if there is one"""
+    timings = _stage_timings()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+class _Stage:
+    __slots__ = ('name', 'timings', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.timings = _stage_timings()
+        if self.timings is not None:
+            self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        if self.timings is not None:
+            self.timings[self.name] = self.timings.get(self.name, 0.0) + time.perf_counter() - self.start
+
+def stage(name: str) -> _Stage:
+    """
+    Time a with block as one stage of the current request
+
+    Stages entered repeatedly within a request accumulate. Outside a
+    request, or with metrics disabled, the block just runs.
+    """
+    return _Stage(name)
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Record MongoDB command durations, globally and against the current request"""
+
+    def _record(self, event, outcome: str):
+        seconds = event.duration_micros / 1e6
+        metrics.observe_command(event.command_name, outcome, seconds)
+        add_stage_time('mongo', seconds)
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event, 'success')
+
+    def failed(self, event):
+        self._record(event, 'failure')
+
+command_metrics = CommandMetricsListener()
+
+def _server_timing(stages: Dict[str, float], total: float) -> str:
+    entries = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in stages.items()]
+    entries.append(f"total;dur={total * 1000:.3f}")
+    return ', '.join(entries)
+
+def init_app(app):
+    """
+    Time every request of app
+
+    Each response gets a Server-Timing header listing its stages, and the
+    request and stage durations are added to the histograms behind
+    /api/metrics. Routes are labelled by URL rule, never by raw path, to
+    keep the number of series bounded.
+    """
+    @app.before_request
+    def start_timer():
+        if app.config.get('METRICS_ENABLED', True):
+            g.request_started = time.perf_counter()
+            g.stage_timings = {}
+
+    @app.after_request
+    def record_timing(response):
+        started = g.get('request_started')
+        if started is None:
+            return response
+        total = time.perf_counter() - started
+        stages = g.stage_timings
+        g.stage_timings = None
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        metrics.observe_request(request.method, route, response.status_code, total, stages)
+        if app.config.get('SERVER_TIMING', True):
+            response.headers['Server-Timing'] = _server_timing(stages, total)
+        return response
+
+def render_gauges(values: Dict[str, Tuple[str, str, Optional[float]]]) -> List[str]:
+    """Render name -> (type, help, value) as Prometheus lines, skipping unknown values"""
+    lines = []
+    for name, (kind, help_text, value) in values.items():
+        if value is None:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {value!r}")
+    return lines
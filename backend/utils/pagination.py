@@ -0,0 +1,38 @@
+import base64
+import json
+from typing import Any, Dict
+
+def encode_cursor(payload: Dict[str, Any]) -> str:
+    """
+    Encode keyset pagination state into an opaque cursor string
+    
+    Args:
+        payload: JSON-serializable pagination state
+        
+    Returns:
+        URL-safe cursor token
+    """
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decode a cursor produced by encode_cursor
+    
+    Args:
+        cursor: Cursor token from a previous page
+        
+    Returns:
+        Pagination state
+        
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid cursor")
+    return payload
@@ -0,0 +1,131 @@
+import json
+from datetime import date, datetime, timezone
+from typing import Any, Dict
+import numpy as np
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider
+from .metrics import stage
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+# Fields returned by the read endpoints, in Player.dict() shape
+PLAYER_PROJECTION = {
+    '_id': 1, 'name': 1, 'team': 1, 'position': 1, 'offense': 1, 'defense': 1,
+    'overall_score': 1, 'position_weighted_score': 1, 'created_at': 1, 'updated_at': 1
+}
+
+_WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+def http_date(value: date) -> str:
+    """
+    Format a date or datetime the way Flask's JSON encoder does
+
+    Same output as werkzeug.http.http_date (naive datetimes are UTC), at a
+    fraction of the cost.
+    """
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        hour, minute, second = value.hour, value.minute, value.second
+    else:
+        hour = minute = second = 0
+    return "%s, %02d %s %04d %02d:%02d:%02d GMT" % (
+        _WEEKDAYS[value.weekday()], value.day, _MONTHS[value.month - 1], value.year, hour, minute, second
+    )
+
+def _default(o: Any) -> Any:
+    if isinstance(o, ObjectId):
+        return str(o)
+    if isinstance(o, date):
+        return http_date(o)
+    if isinstance(o, np.generic):
+        return o.item()
+    return DefaultJSONProvider.default(o)
+
+def _orjson_options(sort_keys: bool, pretty: bool = False) -> int:
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    if sort_keys:
+        options |= orjson.OPT_SORT_KEYS
+    if pretty:
+        options |= orjson.OPT_INDENT_2
+    return options
+
+def json_bytes(obj: Any, sort_keys: bool = True) -> bytes:
+    """
+    Encode obj as compact JSON, the same way the Flask app does
+    
+    For code that renders JSON outside a Flask app, such as the ASGI app.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_default, option=_orjson_options(sort_keys))
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(obj, default=_default, sort_keys=sort_keys, separators=(',', ':')).encode()
+
+def player_row(doc: Dict) -> Dict:
+    """
+    Build the JSON-ready Player.dict() shape straight from a stored document
+
+    For read-only responses: the stats were validated and the scores
+    computed when the document was written, so no Player is constructed.
+    """
+    created_at = doc.get('created_at')
+    updated_at = doc.get('updated_at')
+    if created_at is None or updated_at is None:
+        # Player fills missing timestamps with the current time
+        now = datetime.utcnow()
+        created_at = created_at or now
+        updated_at = updated_at or now
+    return {
+        'id': str(doc['_id']),
+        'name': doc['name'],
+        'team': doc['team'],
+        'position': doc['position'],
+        'offense': doc['offense'],
+        'defense': doc['defense'],
+        'overall_score': doc.get('overall_score', 0.0),
+        'position_weighted_score': doc.get('position_weighted_score'),
+        'created_at': http_date(created_at),
+        'updated_at': http_date(updated_at)
+    }
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes with orjson when it is installed
+
+    The output matches the default provider: sorted keys, HTTP dates,
+    plus ObjectIds as strings. Values orjson rejects fall back to the
+    stdlib encoder. Encoding time is charged to the serialize stage.
+    """
+
+    default = staticmethod(_default)
+
+    def _pretty(self) -> bool:
+        return self.compact is False or (self.compact is None and self._app.debug)
+
+    def _encode(self, obj: Any, pretty: bool) -> bytes:
+        if not pretty:
+            return json_bytes(obj, self.sort_keys)
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, default=_default, option=_orjson_options(self.sort_keys, pretty=True))
+            except orjson.JSONEncodeError:
+                pass
+        return super().dumps(obj, indent=2).encode()
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        with stage('serialize'):
+            if kwargs:
+                return super().dumps(obj, **kwargs)
+            return self._encode(obj, pretty=False).decode()
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        with stage('serialize'):
+            body = self._encode(obj, self._pretty())
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
@@ -1,5 +1,6 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from marshmallow import Schema, fields, validate, ValidationError
+from ..services.scoring_service import OFFENSE_FIELDS, DEFENSE_FIELDS, POSITIONS
 
 class StatSchema(Schema):
     min_value = 0
@@ -27,10 +28,85 @@ class DefenseSchema(Schema):
 class PlayerSchema(Schema):
     name = fields.String(required=True, validate=validate.Length(min=2, max=50))
     team = fields.String(required=True)
-    position = fields.String(required=True, validate=validate.OneOf(['PG', 'SG', 'SF', 'PF', 'C']))
+    position = fields.String(required=True, validate=validate.OneOf(POSITIONS))
     offense = fields.Nested(OffenseSchema, required=True)
     defense = fields.Nested(DefenseSchema, required=True)
 
+PLAYER_FIELDS = frozenset(('name', 'team', 'position', 'offense', 'defense'))
+STAT_GROUPS = (('offense', tuple(OFFENSE_FIELDS)), ('defense', tuple(DEFENSE_FIELDS)))
+STAT_GROUP_FIELDS = {group: frozenset(fields) for group, fields in STAT_GROUPS}
+
+class PlayerValidator:
+    """
+    Precompiled validator for the fixed PlayerSchema shape
+    
+    Well-formed input (exact keys, str name/team, known position, int
+    stats in range) is checked with plain comparisons. Anything else is
+    handed to a single cached PlayerSchema, so coercions and error
+    messages stay exactly those of marshmallow.
+    """
+
+    def __init__(self):
+        self.schema = PlayerSchema()
+        self._positions = frozenset(POSITIONS)
+
+    def _fast(self, data: Any) -> Optional[Dict[str, Any]]:
+        """Return cleaned data, or None if the input needs the full schema"""
+        if type(data) is not dict or data.keys() != PLAYER_FIELDS:
+            return None
+        name, team, position = data['name'], data['team'], data['position']
+        if (type(name) is not str or not 2 <= len(name) <= 50 or type(team) is not str
+                or type(position) is not str or position not in self._positions):
+            return None
+
+        cleaned = {'name': name, 'team': team, 'position': position}
+        for group, fields in STAT_GROUPS:
+            stats = data[group]
+            if type(stats) is not dict or stats.keys() != STAT_GROUP_FIELDS[group]:
+                return None
+            values = {}
+            for field in fields:
+                value = stats[field]
+                if type(value) is not int or not 0 <= value <= 100:
+                    return None
+                values[field] = value
+            cleaned[group] = values
+        return cleaned
+
+    def validate(self, data: Any) -> Dict[str, Any]:
+        """
+        Validate one player
+        
+        Raises:
+            ValidationError: If data fails validation
+        """
+        cleaned = self._fast(data)
+        if cleaned is None:
+            return self.schema.load(data)
+        return cleaned
+
+    def validate_many(self, data: List[Any]) -> Tuple[List[Optional[Dict[str, Any]]], Dict[int, Dict]]:
+        """
+        Validate a list of players without failing the whole batch
+        
+        Returns:
+            Tuple of (rows, errors) with PlayerSchema(many=True) semantics:
+            failed rows are None and their messages are keyed by row index
+        """
+        rows, errors = [], {}
+        fast = self._fast
+        for index, item in enumerate(data):
+            cleaned = fast(item)
+            if cleaned is None:
+                try:
+                    cleaned = self.schema.load(item)
+                except ValidationError as e:
+                    errors[index] = e.messages
+            rows.append(cleaned)
+        return rows, errors
+
+player_validator = PlayerValidator()
+
 def validate_player_data(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Validate player data against the schema
@@ -44,8 +120,20 @@ def validate_player_data(data: Dict[str, Any]) -> Dict[str, Any]:
     Raises:
         ValidationError: If data fails validation
     """
-    schema = PlayerSchema()
-    return schema.load(data)
+    return player_validator.validate(data)
+
+def validate_players_batch(data: List[Any]) -> Tuple[List[Optional[Dict[str, Any]]], Dict[int, Dict]]:
+    """
+    Validate a list of players in one pass without failing the whole batch
+    
+    Args:
+        data: List of player dictionaries
+        
+    Returns:
+        Tuple of (rows, errors). Rows that failed validation are None and
+        have their validation messages in errors, keyed by row index.
+    """
+    return player_validator.validate_many(data)
 
 def format_validation_errors(errors: Dict[str, List[str]]) -> Dict[str, str]:
     """
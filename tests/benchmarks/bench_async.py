@@ -0,0 +1,149 @@
+"""
+Load test the Flask app against the ASGI app at the same concurrency
+
+Requires a running mongod. Seeds a throwaway database with synthetic
+players, serves it from one process with each server in turn and drives
+it with --concurrency simultaneous clients for --duration seconds. The
+request mix is 60% filtered listings, 30% single-player reads and 10%
+stats overviews. The Flask app runs once with one request at a time (a
+sync worker) and once with a thread per request. Its response cache is
+disabled (TTL 0) so every request reaches MongoDB.
+
+Usage:
+    python -m tests.benchmarks.bench_async [--players 100000] [--concurrency 64]
+        [--duration 10] [--db-name bench_async]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import socket
+import statistics
+import time
+from typing import Dict, List
+from tests.benchmarks.players import TEAMS, seed_players
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def _serve_flask(port: int, threaded: bool):
+    from werkzeug.serving import run_simple
+    from backend import create_app
+    run_simple('127.0.0.1', port, create_app(), threaded=threaded)
+
+def _serve_asgi(port: int):
+    import uvicorn
+    uvicorn.run('backend.asgi:create_async_app', factory=True, host='127.0.0.1', port=port, log_level='warning')
+
+async def _wait_ready(client, base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get(f'{base_url}/api/stats/overview')).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start")
+
+async def _load(base_url: str, ids: List[str], concurrency: int, duration: float) -> Dict:
+    import httpx
+
+    latencies = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+        await _wait_ready(client, base_url)
+
+        async def worker(seed: int, stop_at: float, record: bool):
+            nonlocal errors
+            rng = random.Random(seed)
+            while time.monotonic() < stop_at:
+                roll = rng.random()
+                if roll < 0.6:
+                    path = f"/api/players?per_page=20&team={rng.choice(TEAMS)}"
+                elif roll < 0.9:
+                    path = f"/api/players/{rng.choice(ids)}"
+                else:
+                    path = '/api/stats/overview'
+                start = time.perf_counter()
+                try:
+                    ok = (await client.get(base_url + path)).status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if record:
+                    if ok:
+                        latencies.append(time.perf_counter() - start)
+                    else:
+                        errors += 1
+
+        # Warm up connections and the server, then measure
+        warm_until = time.monotonic() + 1.0
+        await asyncio.gather(*(worker(i, warm_until, False) for i in range(concurrency)))
+        started = time.monotonic()
+        await asyncio.gather(*(worker(i, started + duration, True) for i in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000 if latencies else None,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else None
+    }
+
+def run(label: str, target, target_args: tuple, ids: List[str], args) -> Dict:
+    port = _free_port()
+    server = multiprocessing.get_context('spawn').Process(target=target, args=(port, *target_args), daemon=True)
+    server.start()
+    try:
+        result = asyncio.run(_load(f'http://127.0.0.1:{port}', ids, args.concurrency, args.duration))
+    finally:
+        server.terminate()
+        server.join()
+    print(f"{label:<24} {result['rps']:>10,.0f} req/s  p50 {result['p50_ms']:>8.2f} ms  "
+          f"p99 {result['p99_ms']:>8.2f} ms  errors {result['errors']}")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--players', type=int, default=100_000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--db-name', default='bench_async')
+    args = parser.parse_args()
+
+    # Inherited by the server processes
+    os.environ.update({
+        'DB_NAME': args.db_name,
+        'WARM_INDEXES': 'false',
+        'RESPONSE_CACHE_TTL': '0',
+        'SERVER_TIMING': 'false'
+    })
+
+    from pymongo import MongoClient
+    from backend.scripts.init_db import init_db
+    from backend.services.stats_service import StatsService
+
+    client = MongoClient(os.getenv('DB_HOST', 'localhost'), int(os.getenv('DB_PORT', '27017')))
+    db = client[args.db_name]
+    seed_players(db, args.players)
+    init_db(db)
+    StatsService().rebuild(db)
+    ids = [str(doc['_id']) for doc in db.players.find({}, {'_id': 1}).limit(10_000)]
+
+    print(f"{args.players:,} players, {args.concurrency} concurrent clients, {args.duration:.0f}s per server\n")
+    try:
+        run('flask (sync worker)', _serve_flask, (False,), ids, args)
+        run('flask (threaded)', _serve_flask, (True,), ids, args)
+        run('asgi (uvicorn, motor)', _serve_asgi, (), ids, args)
+    finally:
+        client.drop_database(args.db_name)
+        client.close()
+
+if __name__ == "__main__":
+    main()
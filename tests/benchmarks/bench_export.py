@@ -0,0 +1,54 @@
+"""
+Time GET /api/players/export's encoders over a large roster
+
+Streams synthetic player documents through export_chunks in each format
+and reports rows per second, output size and the largest chunk, which
+bounds what one request holds in memory besides the current batch of
+documents. Parquet and Arrow need pyarrow and are skipped without it.
+
+Usage:
+    python -m tests.benchmarks.bench_export [--players 1000000] [--batch-size 10000]
+        [--formats csv,parquet,arrow]
+"""
+import argparse
+import time
+from bson import ObjectId
+from tests.benchmarks.players import synthetic_docs
+from backend.utils.export import ARROW_FORMATS, EXPORT_MIMETYPES, export_chunks, pa
+
+def run(docs, export_format: str, batch_size: int):
+    start = time.perf_counter()
+    size = largest = 0
+    for chunk in export_chunks(iter(docs), export_format, batch_size):
+        size += len(chunk)
+        largest = max(largest, len(chunk))
+    elapsed = time.perf_counter() - start
+    return len(docs) / elapsed, elapsed, size, largest
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--players', type=int, default=1_000_000)
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    parser.add_argument('--formats', default=','.join(EXPORT_MIMETYPES))
+    args = parser.parse_args()
+
+    formats = [export_format for export_format in args.formats.split(',') if export_format]
+    unknown = set(formats) - set(EXPORT_MIMETYPES)
+    if unknown:
+        parser.error(f"unknown formats: {', '.join(sorted(unknown))}")
+
+    docs = synthetic_docs(args.players)
+    for doc in docs:
+        doc.setdefault('_id', ObjectId())
+
+    print(f"{args.players:,} players, {args.batch_size:,} rows per batch\n")
+    print(f"{'format':<10}{'rows/s':>14}{'seconds':>10}{'MB':>10}{'largest chunk MB':>20}")
+    for export_format in formats:
+        if export_format in ARROW_FORMATS and pa is None:
+            print(f"{export_format:<10}  skipped, pyarrow is not installed")
+            continue
+        rate, elapsed, size, largest = run(docs, export_format, args.batch_size)
+        print(f"{export_format:<10}{rate:>14,.0f}{elapsed:>10.2f}{size / 1e6:>10.1f}{largest / 1e6:>20.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Time the rank history log on the SQLite and in-memory repositories
+
+Seeds each repository with synthetic players, records a stream of score
+changes through HistoryService (which takes a checkpoint every
+--interval events), then times leaderboards as of random past moments
+and single-player histories. The as_of figures are what matters: they
+should stay flat as --updates grows, since a query reads one checkpoint
+and replays at most --interval events.
+
+Usage:
+    python -m tests.benchmarks.bench_history [--players 100000] [--updates 1000000]
+        [--interval 10000] [--ops 200] [--backends sqlite,memory]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List
+from tests.benchmarks.players import synthetic_docs
+from backend.repositories.memory import InMemoryPlayerRepository
+from backend.repositories.sqlite import SQLitePlayerRepository
+from backend.services.history_service import HistoryService
+
+BACKENDS = ('sqlite', 'memory')
+
+def run(repository, docs: List[Dict], updates: int, interval: int, ops: int) -> Dict[str, str]:
+    rng = random.Random(42)
+    results = {}
+    repository.insert_many(docs)
+    ids = [str(doc['_id']) for doc in docs]
+    service = HistoryService(repository=repository, checkpoint_interval=interval)
+
+    start = time.perf_counter()
+    service.ensure_started()
+    results['first checkpoint (ms)'] = f"{(time.perf_counter() - start) * 1000:,.0f}"
+
+    start = time.perf_counter()
+    for i in range(updates):
+        player_id = ids[rng.randrange(len(ids))]
+        service.on_player_saved(player_id, {'overall_score': rng.randint(3000, 9500) / 100}, {'overall_score': None})
+    results['record (updates/s)'] = f"{updates / (time.perf_counter() - start):,.0f}"
+
+    last = repository.last_history_seq()
+    moments = [next(repository.history_events(rng.randrange(last), None)).timestamp for _ in range(ops)]
+
+    start = time.perf_counter()
+    for moment in moments:
+        service._decoded.clear()
+        service.leaderboard_as_of(moment, limit=50)
+    results['as_of cold (ms)'] = f"{(time.perf_counter() - start) / ops * 1000:.1f}"
+
+    moment = moments[0]
+    start = time.perf_counter()
+    for _ in range(ops):
+        service.leaderboard_as_of(moment, limit=50)
+    results['as_of cached (ms)'] = f"{(time.perf_counter() - start) / ops * 1000:.1f}"
+
+    sample = [rng.choice(ids) for _ in range(ops)]
+    start = time.perf_counter()
+    for player_id in sample:
+        service.player_history(player_id)
+    results['player history (us)'] = f"{(time.perf_counter() - start) / ops * 1e6:.0f}"
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--players', type=int, default=100_000)
+    parser.add_argument('--updates', type=int, default=1_000_000)
+    parser.add_argument('--interval', type=int, default=10_000)
+    parser.add_argument('--ops', type=int, default=200)
+    parser.add_argument('--backends', default=','.join(BACKENDS))
+    args = parser.parse_args()
+
+    backends = [backend for backend in args.backends.split(',') if backend]
+    unknown = set(backends) - set(BACKENDS)
+    if unknown:
+        parser.error(f"unknown backends: {', '.join(sorted(unknown))}")
+
+    docs = synthetic_docs(args.players)
+    columns = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in backends:
+            if backend == 'sqlite':
+                repository = SQLitePlayerRepository(os.path.join(tmp, 'players.sqlite3'))
+            else:
+                repository = InMemoryPlayerRepository()
+            for doc in docs:
+                doc.pop('_id', None)
+            try:
+                columns[backend] = run(repository, docs, args.updates, args.interval, args.ops)
+            finally:
+                repository.close()
+
+    print(f"{args.players:,} players, {args.updates:,} score changes, checkpoint every {args.interval:,}\n")
+    print(f"{'':<24}" + ''.join(f"{backend:>14}" for backend in columns))
+    for label in next(iter(columns.values()), {}):
+        print(f"{label:<24}" + ''.join(f"{column[label]:>14}" for column in columns.values()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Measure per-player memory of Player versus CompactPlayer
+
+Usage:
+    python -m tests.benchmarks.bench_player_memory [--players 100000]
+"""
+import argparse
+import gc
+import tracemalloc
+from datetime import datetime
+import numpy as np
+from backend.models.player import Player, CompactPlayer
+from backend.services.scoring_service import OFFENSE_FIELDS, DEFENSE_FIELDS, POSITIONS
+
+def synthetic_docs(count: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    stats = rng.integers(1, 101, size=(count, 10)).tolist()
+    codes = rng.integers(0, len(POSITIONS), size=count).tolist()
+    now = datetime.utcnow()
+    for i, (row, code) in enumerate(zip(stats, codes)):
+        yield {
+            'id': f"{i:024x}",
+            'name': f"Player {i}",
+            'team': f"Team {i % 30}",
+            'position': POSITIONS[code],
+            'offense': dict(zip(OFFENSE_FIELDS, row[:5])),
+            'defense': dict(zip(DEFENSE_FIELDS, row[5:])),
+            'overall_score': 70.5,
+            'position_weighted_score': 71.25,
+            'created_at': now,
+            'updated_at': now
+        }
+
+def measure(label, build, count):
+    gc.collect()
+    tracemalloc.start()
+    players = [build(doc) for doc in synthetic_docs(count)]
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Subtract the list holding the players, which both variants share
+    per_player = (current - 8 * len(players)) / count
+    print(f"{label:<14} {per_player:8.1f} bytes/player")
+    del players
+    return per_player
+
+def main(count: int):
+    full = measure('Player', lambda doc: Player(**doc), count)
+    compact = measure('CompactPlayer', CompactPlayer.from_doc, count)
+    print(f"saving         {full - compact:8.1f} bytes/player ({1 - compact / full:.0%})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--players', type=int, default=100_000)
+    main(parser.parse_args().players)
@@ -0,0 +1,42 @@
+"""
+Measure RankingIndex build time and lookup latency
+
+Usage:
+    python -m tests.benchmarks.bench_rankings [--players 1000000]
+"""
+import argparse
+import time
+import numpy as np
+from backend.services.ranking_service import RankingIndex
+
+def main(players: int, lookups: int = 10_000):
+    rng = np.random.default_rng(42)
+    scores = np.round(rng.normal(65, 10, size=players).clip(0, 100), 2).tolist()
+    ids = [f"{i:024x}" for i in range(players)]
+
+    index = RankingIndex()
+    start = time.perf_counter()
+    index.build(zip(ids, scores))
+    print(f"build {players} players: {time.perf_counter() - start:.3f}s")
+
+    sample = [ids[i] for i in rng.integers(0, players, size=lookups)]
+    start = time.perf_counter()
+    for player_id in sample:
+        index.rank(player_id)
+    print(f"rank:    {(time.perf_counter() - start) / lookups * 1e6:8.1f} us/lookup")
+
+    start = time.perf_counter()
+    for player_id in sample:
+        index.upsert(player_id, float(rng.integers(0, 10001)) / 100)
+    print(f"upsert:  {(time.perf_counter() - start) / lookups * 1e6:8.1f} us/update")
+
+    for limit in (50, 1000):
+        start = time.perf_counter()
+        for _ in range(100):
+            index.top(limit)
+        print(f"top {limit:<4} {(time.perf_counter() - start) / 100 * 1e6:8.1f} us/query")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--players', type=int, default=1_000_000)
+    main(parser.parse_args().players)
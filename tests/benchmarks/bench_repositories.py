@@ -0,0 +1,144 @@
+"""
+Compare the MongoDB, SQLite and in-memory player repositories
+
+Seeds each repository with the same synthetic players, then times the
+calls PlayerService and the index services make: batched inserts, reads
+by ID, listing pages (first, filtered, deep keyset and name search),
+single-player writes, the full scans behind the in-process indexes and a
+stats rebuild. The MongoDB column needs a mongod at DB_HOST/DB_PORT and
+is skipped when none answers; its database is dropped afterwards.
+
+Usage:
+    python -m tests.benchmarks.bench_repositories [--players 100000] [--ops 1000]
+        [--backends mongodb,sqlite,memory] [--db-name bench_repositories]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Callable, Dict, List
+from tests.benchmarks.players import TEAMS, synthetic_docs
+from backend.repositories.memory import InMemoryPlayerRepository
+from backend.repositories.mongo import MongoPlayerRepository
+from backend.repositories.sqlite import SQLitePlayerRepository
+from backend.scripts.init_db import init_db
+from backend.services.stats_service import StatsService
+from backend.utils.serialization import PLAYER_PROJECTION
+
+BACKENDS = ('mongodb', 'sqlite', 'memory')
+
+def _timed(fn: Callable, repeat: int) -> float:
+    """Mean microseconds per call of fn(i) over repeat calls"""
+    start = time.perf_counter()
+    for i in range(repeat):
+        fn(i)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+def run(repository, docs: List[Dict], ops: int, chunk: int = 5000) -> Dict[str, str]:
+    rng = random.Random(42)
+    results = {}
+
+    start = time.perf_counter()
+    for offset in range(0, len(docs), chunk):
+        repository.insert_many(docs[offset:offset + chunk])
+    results['insert_many (rows/s)'] = f"{len(docs) / (time.perf_counter() - start):,.0f}"
+
+    ids = [doc['_id'] for doc in docs]
+    sample = [rng.choice(ids) for _ in range(ops)]
+    results['get (us)'] = f"{_timed(lambda i: repository.get(sample[i], PLAYER_PROJECTION), ops):.1f}"
+
+    def page(**kwargs):
+        return list(repository.find(limit=21, fields=PLAYER_PROJECTION, **kwargs))
+
+    results['first page (us)'] = f"{_timed(lambda i: page(), ops):.1f}"
+    results['team page (us)'] = f"{_timed(lambda i: page(filters={'team': TEAMS[i % len(TEAMS)]}), ops):.1f}"
+
+    middle = list(repository.find(limit=len(docs) // 2, fields=('overall_score',)))[-1]
+    after = (middle['overall_score'], middle['_id'])
+    results['deep page (us)'] = f"{_timed(lambda i: page(after=after), ops):.1f}"
+
+    names = [rng.choice(docs)['name'].split()[-1][:4].lower() for _ in range(ops)]
+    results['name filter (us)'] = f"{_timed(lambda i: page(filters={'name': names[i]}), min(ops, 100)):.1f}"
+
+    new_docs = synthetic_docs(ops, seed=7)
+    results['insert (us)'] = f"{_timed(lambda i: repository.insert(new_docs[i]), ops):.1f}"
+    results['update (us)'] = f"{_timed(lambda i: repository.update(sample[i], {'overall_score': float(i % 100)}), ops):.1f}"
+    results['delete (us)'] = f"{_timed(lambda i: repository.delete(new_docs[i]['_id']), ops):.1f}"
+
+    start = time.perf_counter()
+    count = sum(1 for _ in repository.scan(('overall_score',)))
+    results['scan scores (rows/s)'] = f"{count / (time.perf_counter() - start):,.0f}"
+
+    start = time.perf_counter()
+    count = sum(1 for _ in repository.scan(('position', 'offense', 'defense')))
+    results['scan stats (rows/s)'] = f"{count / (time.perf_counter() - start):,.0f}"
+
+    start = time.perf_counter()
+    StatsService(repository).rebuild()
+    results['stats rebuild (ms)'] = f"{(time.perf_counter() - start) * 1000:,.0f}"
+    return results
+
+def _mongo_repository(db_name: str):
+    from pymongo import MongoClient
+    from pymongo.errors import PyMongoError
+
+    client = MongoClient(
+        os.getenv('DB_HOST', 'localhost'), int(os.getenv('DB_PORT', '27017')), serverSelectionTimeoutMS=2000
+    )
+    try:
+        client.admin.command('ping')
+    except PyMongoError:
+        client.close()
+        return None, None
+    client.drop_database(db_name)
+    db = client[db_name]
+    init_db(db)
+    return MongoPlayerRepository(db), client
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--players', type=int, default=100_000)
+    parser.add_argument('--ops', type=int, default=1000)
+    parser.add_argument('--backends', default=','.join(BACKENDS))
+    parser.add_argument('--db-name', default='bench_repositories')
+    args = parser.parse_args()
+
+    backends = [backend for backend in args.backends.split(',') if backend]
+    unknown = set(backends) - set(BACKENDS)
+    if unknown:
+        parser.error(f"unknown backends: {', '.join(sorted(unknown))}")
+
+    docs = synthetic_docs(args.players)
+    columns = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in backends:
+            client = None
+            if backend == 'mongodb':
+                repository, client = _mongo_repository(args.db_name)
+                if repository is None:
+                    print("mongodb: no server answered, skipped")
+                    continue
+            elif backend == 'sqlite':
+                repository = SQLitePlayerRepository(os.path.join(tmp, 'players.sqlite3'))
+            else:
+                repository = InMemoryPlayerRepository()
+
+            # insert_many assigns fresh IDs on every backend
+            for doc in docs:
+                doc.pop('_id', None)
+            try:
+                columns[backend] = run(repository, docs, args.ops)
+            finally:
+                repository.close()
+                if client is not None:
+                    client.drop_database(args.db_name)
+                    client.close()
+
+    print(f"{args.players:,} players, {args.ops:,} operations per measurement\n")
+    print(f"{'':<22}" + ''.join(f"{backend:>14}" for backend in columns))
+    for label in next(iter(columns.values()), {}):
+        print(f"{label:<22}" + ''.join(f"{column[label]:>14}" for column in columns.values()))
+
+if __name__ == "__main__":
+    main()
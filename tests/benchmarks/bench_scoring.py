@@ -0,0 +1,49 @@
+"""
+Benchmark the batch scorer against the per-player scoring functions
+
+Usage:
+    python -m tests.benchmarks.bench_scoring [--sizes 10000 100000 1000000]
+"""
+import argparse
+import time
+import numpy as np
+from backend.services.scoring_service import (
+    ScoringService, OFFENSE_FIELDS, DEFENSE_FIELDS, POSITIONS
+)
+
+def synthetic_roster(count: int, seed: int = 42):
+    """Build a random stat matrix and matching position codes"""
+    rng = np.random.default_rng(seed)
+    matrix = rng.integers(0, 101, size=(count, len(OFFENSE_FIELDS) + len(DEFENSE_FIELDS)))
+    codes = rng.integers(0, len(POSITIONS), size=count)
+    return matrix, codes
+
+def scalar_scores(matrix: np.ndarray, codes: np.ndarray):
+    """Score every row one player at a time, the way PlayerService does today"""
+    overall, weighted = [], []
+    for row, code in zip(matrix.tolist(), codes.tolist()):
+        offense = dict(zip(OFFENSE_FIELDS, row[:5]))
+        defense = dict(zip(DEFENSE_FIELDS, row[5:]))
+        overall.append(ScoringService.calculate_overall_score(offense, defense))
+        weighted.append(ScoringService.calculate_position_weighted_score(offense, defense, POSITIONS[code]))
+    return overall, weighted
+
+def run(sizes):
+    print(f"{'rows':>10} {'scalar (s)':>12} {'batch (s)':>12} {'speedup':>10}")
+    for size in sizes:
+        matrix, codes = synthetic_roster(size)
+
+        start = time.perf_counter()
+        scalar_scores(matrix, codes)
+        scalar_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ScoringService.score_batch(matrix, codes)
+        batch_time = time.perf_counter() - start
+
+        print(f"{size:>10} {scalar_time:>12.4f} {batch_time:>12.4f} {scalar_time / batch_time:>9.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    run(parser.parse_args().sizes)
@@ -0,0 +1,72 @@
+"""
+Measure typeahead latency percentiles on the in-process search index
+
+Usage:
+    python -m tests.benchmarks.bench_search [--players 1000000]
+"""
+import argparse
+import gc
+import random
+import time
+from backend.services.search_service import SearchIndex
+
+TEAMS = [
+    "Celtics", "Nets", "Knicks", "76ers", "Raptors", "Bulls", "Cavaliers", "Pistons", "Pacers", "Bucks",
+    "Hawks", "Hornets", "Heat", "Magic", "Wizards", "Nuggets", "Timberwolves", "Thunder", "Trail Blazers", "Jazz",
+    "Warriors", "Clippers", "Lakers", "Suns", "Kings", "Mavericks", "Rockets", "Grizzlies", "Pelicans", "Spurs"
+]
+
+def make_names(rng: random.Random, players: int, first_names: int = 5000, last_names: int = 100000):
+    """Names drawn from first and last name pools, about the vocabulary of real rosters"""
+    syllables = [a + b for a in "bcdfghjklmnprstvwz" for b in "aeiou"]
+    firsts = [''.join(rng.choice(syllables) for _ in range(rng.randint(2, 3))).title() for _ in range(first_names)]
+    lasts = [''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))).title() for _ in range(last_names)]
+    return [f"{rng.choice(firsts)} {rng.choice(lasts)}" for _ in range(players)]
+
+def percentile(samples, q):
+    return sorted(samples)[min(len(samples) - 1, int(q * len(samples)))]
+
+def main(players: int, queries: int = 2000):
+    rng = random.Random(42)
+    names = make_names(rng, players)
+    docs = (
+        (f"{i:024x}", {"name": name, "team": rng.choice(TEAMS), "position": "SF", "overall_score": rng.uniform(0, 100)})
+        for i, name in enumerate(names)
+    )
+    index = SearchIndex()
+    start = time.perf_counter()
+    index.build(docs)
+    print(f"build {players} players: {time.perf_counter() - start:.1f}s")
+    # As create_app() does after warming the indexes
+    gc.freeze()
+
+    # Queries as typed: prefixes of real names, some with a dropped character
+    samples = {'prefix': [], 'typo': [], 'team': []}
+    for _ in range(queries):
+        name = rng.choice(names).lower()
+        samples['prefix'].append(name[:rng.randint(1, len(name))])
+        cut = rng.randint(1, len(name) - 1)
+        samples['typo'].append(name[:cut] + name[cut + 1:])
+        samples['team'].append(rng.choice(TEAMS).lower()[:rng.randint(2, 6)])
+
+    for kind, typed in samples.items():
+        latencies = []
+        for query in typed:
+            start = time.perf_counter()
+            index.search(query, 10)
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(
+            f"{kind:<7} p50 {percentile(latencies, 0.5):6.2f} ms  p99 {percentile(latencies, 0.99):6.2f} ms"
+            f"  max {max(latencies):6.2f} ms"
+        )
+
+    writes = 1000
+    start = time.perf_counter()
+    for i in range(writes):
+        index.upsert(f"{i:024x}", {"name": rng.choice(names), "team": rng.choice(TEAMS), "overall_score": rng.uniform(0, 100)})
+    print(f"upsert  {(time.perf_counter() - start) * 1000 / writes:.3f} ms/write")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--players', type=int, default=1_000_000)
+    main(parser.parse_args().players)
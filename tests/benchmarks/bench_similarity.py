@@ -0,0 +1,32 @@
+"""
+Measure similar-player query latency on the in-memory k-NN index
+
+Usage:
+    python -m tests.benchmarks.bench_similarity [--players 1000000]
+"""
+import argparse
+import time
+import numpy as np
+from backend.services.similarity_service import SimilarityIndex
+
+def main(players: int, queries: int = 50):
+    rng = np.random.default_rng(42)
+    ids = [f"{i:024x}" for i in range(players)]
+    index = SimilarityIndex()
+    start = time.perf_counter()
+    index.build(ids, rng.integers(0, 101, size=(players, 10)), rng.integers(0, 5, size=players))
+    print(f"build {players} players: {time.perf_counter() - start:.3f}s")
+
+    sample = [ids[i] for i in rng.integers(0, players, size=queries)]
+    for metric in ('cosine', 'euclidean'):
+        for position in (None, 'C'):
+            start = time.perf_counter()
+            for player_id in sample:
+                index.nearest(player_id, 10, metric, position)
+            elapsed = (time.perf_counter() - start) / queries
+            print(f"{metric:<10} position={position or 'any':<4} {elapsed * 1000:8.2f} ms/query")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--players', type=int, default=1_000_000)
+    main(parser.parse_args().players)
@@ -0,0 +1,90 @@
+"""
+Compare cold starts of the in-process indexes from a scan and from a roster snapshot
+
+Seeds a repository with synthetic players, logs --changes score changes
+after writing a snapshot, then times building the ranking and similarity
+indexes the way a fresh worker does: once from a full scan of the
+players, once by mapping the snapshot and replaying the changes.
+
+Usage:
+    python -m tests.benchmarks.bench_snapshot [--players 100000] [--changes 1000]
+        [--backends sqlite,memory]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List
+from tests.benchmarks.players import synthetic_docs
+from backend.repositories.memory import InMemoryPlayerRepository
+from backend.repositories.sqlite import SQLitePlayerRepository
+from backend.services.history_service import HistoryService
+from backend.services.ranking_service import RankingService
+from backend.services.similarity_service import SimilarityService
+from backend.services.snapshot_service import SnapshotService
+
+BACKENDS = ('sqlite', 'memory')
+
+def _cold_start(repository, snapshots) -> float:
+    start = time.perf_counter()
+    RankingService(repository=repository, snapshots=snapshots).rebuild()
+    SimilarityService(repository=repository, snapshots=snapshots).rebuild()
+    return (time.perf_counter() - start) * 1000
+
+def run(repository, docs: List[Dict], changes: int, path: str) -> Dict[str, str]:
+    rng = random.Random(42)
+    results = {}
+    repository.insert_many(docs)
+    history = HistoryService(repository=repository)
+    history.ensure_started()
+    snapshots = SnapshotService(path=path, repository=repository)
+
+    start = time.perf_counter()
+    snapshots.write()
+    results['write snapshot (ms)'] = f"{(time.perf_counter() - start) * 1000:,.0f}"
+    results['snapshot size (MB)'] = f"{os.path.getsize(path) / 1e6:.1f}"
+
+    for _ in range(changes):
+        previous = docs[rng.randrange(len(docs))]
+        doc = repository.update(previous['_id'], {'overall_score': rng.randint(3000, 9500) / 100})
+        history.on_player_saved(str(previous['_id']), doc, previous)
+
+    results['cold start, scan (ms)'] = f"{_cold_start(repository, None):,.0f}"
+    results['cold start, snapshot (ms)'] = f"{_cold_start(repository, SnapshotService(path=path)):,.0f}"
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--players', type=int, default=100_000)
+    parser.add_argument('--changes', type=int, default=1000)
+    parser.add_argument('--backends', default=','.join(BACKENDS))
+    args = parser.parse_args()
+
+    backends = [backend for backend in args.backends.split(',') if backend]
+    unknown = set(backends) - set(BACKENDS)
+    if unknown:
+        parser.error(f"unknown backends: {', '.join(sorted(unknown))}")
+
+    docs = synthetic_docs(args.players)
+    columns = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in backends:
+            if backend == 'sqlite':
+                repository = SQLitePlayerRepository(os.path.join(tmp, 'players.sqlite3'))
+            else:
+                repository = InMemoryPlayerRepository()
+            for doc in docs:
+                doc.pop('_id', None)
+            try:
+                columns[backend] = run(repository, docs, args.changes, os.path.join(tmp, f'{backend}.snapshot'))
+            finally:
+                repository.close()
+
+    print(f"{args.players:,} players, {args.changes:,} changes since the snapshot\n")
+    print(f"{'':<28}" + ''.join(f"{backend:>14}" for backend in columns))
+    for label in next(iter(columns.values()), {}):
+        print(f"{label:<28}" + ''.join(f"{column[label]:>14}" for column in columns.values()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Compare the materialized player listing with the streamed NDJSON listing
+
+Requires a running mongod. Seeds a throwaway database with synthetic
+players, then reports time-to-first-byte, total time and peak Python heap
+for both paths.
+
+Usage:
+    python -m tests.benchmarks.bench_streaming [--players 500000] [--db-name bench_streaming]
+"""
+import argparse
+import os
+import time
+import tracemalloc
+import numpy as np
+
+def seed(db, count: int, chunk: int = 10_000):
+    """Insert count synthetic players into db.players"""
+    from backend.services.scoring_service import (
+        ScoringService, OFFENSE_FIELDS, DEFENSE_FIELDS, POSITIONS
+    )
+    rng = np.random.default_rng(42)
+    db.players.drop()
+    for start in range(0, count, chunk):
+        size = min(chunk, count - start)
+        stats = rng.integers(0, 101, size=(size, 10))
+        codes = rng.integers(0, len(POSITIONS), size=size)
+        overall, _ = ScoringService.score_batch(stats, codes)
+        db.players.insert_many([
+            {
+                'name': f"Player {start + i}",
+                'team': f"Team {i % 30}",
+                'position': POSITIONS[code],
+                'offense': dict(zip(OFFENSE_FIELDS, row[:5])),
+                'defense': dict(zip(DEFENSE_FIELDS, row[5:])),
+                'overall_score': score
+            }
+            for i, (row, code, score) in enumerate(zip(stats.tolist(), codes.tolist(), overall.tolist()))
+        ], ordered=False)
+    db.players.create_index([('overall_score', -1), ('_id', -1)])
+
+def measure(label, run):
+    tracemalloc.start()
+    start = time.perf_counter()
+    first_byte = run()
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<14} ttfb {first_byte - start:8.3f}s  total {total:8.3f}s  peak heap {peak / 2**20:9.1f} MiB")
+
+def main(players: int, db_name: str):
+    os.environ['DB_NAME'] = db_name
+    from flask import jsonify
+    from backend import create_app
+    from backend.db import get_db
+    from backend.routes.players import player_service
+
+    app = create_app({'TESTING': True})
+    client = app.test_client()
+
+    with app.app_context():
+        seed(get_db(), players)
+
+    def materialized():
+        # The pre-streaming path: build every Player and one JSON document
+        with app.test_request_context('/api/players'):
+            body = jsonify([p.dict() for p in player_service.iter_players()]).get_data()
+            return time.perf_counter() if body else None
+
+    def streamed():
+        response = client.get('/api/players?stream=1', buffered=False)
+        chunks = iter(response.response)
+        next(chunks)
+        first_byte = time.perf_counter()
+        for _ in chunks:
+            pass
+        response.close()
+        return first_byte
+
+    print(f"{players} players")
+    measure('materialized', materialized)
+    measure('ndjson stream', streamed)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--players', type=int, default=500_000)
+    parser.add_argument('--db-name', default='bench_streaming')
+    args = parser.parse_args()
+    main(args.players, args.db_name)
@@ -0,0 +1,46 @@
+"""
+Compare the precompiled player validator with per-call marshmallow schemas
+
+Usage:
+    python -m tests.benchmarks.bench_validation [--players 100000]
+"""
+import argparse
+import time
+import numpy as np
+from backend.utils.validators import PlayerSchema, validate_player_data, validate_players_batch
+from backend.services.scoring_service import OFFENSE_FIELDS, DEFENSE_FIELDS, POSITIONS
+
+def synthetic_payloads(count: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    stats = rng.integers(0, 101, size=(count, 10)).tolist()
+    codes = rng.integers(0, len(POSITIONS), size=count).tolist()
+    return [
+        {
+            'name': f"Player {i}",
+            'team': f"Team {i % 30}",
+            'position': POSITIONS[code],
+            'offense': dict(zip(OFFENSE_FIELDS, row[:5])),
+            'defense': dict(zip(DEFENSE_FIELDS, row[5:]))
+        }
+        for i, (row, code) in enumerate(zip(stats, codes))
+    ]
+
+def timed(label, count, run, baseline=None):
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    speedup = f"{baseline / elapsed:7.1f}x" if baseline else ''
+    print(f"{label:<28} {count / elapsed:12,.0f} players/s {speedup}")
+    return elapsed
+
+def main(players: int):
+    payloads = synthetic_payloads(players)
+    baseline = timed('marshmallow per call', players, lambda: [PlayerSchema().load(p) for p in payloads])
+    timed('marshmallow many=True', players, lambda: PlayerSchema(many=True).load(payloads), baseline)
+    timed('validate_player_data', players, lambda: [validate_player_data(p) for p in payloads], baseline)
+    timed('validate_players_batch', players, lambda: validate_players_batch(payloads), baseline)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--players', type=int, default=100_000)
+    main(parser.parse_args().players)
@@ -0,0 +1,70 @@
+"""
+Seeded synthetic players shared by the benchmarks
+
+The same seed always yields the same roster, so benchmark runs on
+different machines or commits measure identical inputs.
+"""
+from datetime import datetime
+from typing import Dict, List
+import numpy as np
+from backend.services.scoring_service import ScoringService, OFFENSE_FIELDS, DEFENSE_FIELDS, POSITIONS
+
+TEAMS = [
+    "Celtics", "Nets", "Knicks", "76ers", "Raptors", "Bulls", "Cavaliers", "Pistons", "Pacers", "Bucks",
+    "Hawks", "Hornets", "Heat", "Magic", "Wizards", "Nuggets", "Timberwolves", "Thunder", "Trail Blazers", "Jazz",
+    "Warriors", "Clippers", "Lakers", "Suns", "Kings", "Mavericks", "Rockets", "Grizzlies", "Pelicans", "Spurs"
+]
+
+_SYLLABLES = [a + b for a in "bcdfghjklmnprstvwz" for b in "aeiou"]
+
+def _name_pool(rng: np.random.Generator, size: int, min_syllables: int, max_syllables: int) -> List[str]:
+    lengths = rng.integers(min_syllables, max_syllables + 1, size=size)
+    picks = rng.integers(0, len(_SYLLABLES), size=(size, max_syllables))
+    return [''.join(_SYLLABLES[i] for i in row[:length]).title() for row, length in zip(picks.tolist(), lengths)]
+
+def synthetic_players(count: int, seed: int = 42) -> List[Dict]:
+    """
+    Generate valid player payloads, as accepted by POST /api/players
+
+    Names come from fixed first and last name pools, so common names repeat
+    the way they do on real rosters.
+    """
+    rng = np.random.default_rng(seed)
+    firsts = _name_pool(rng, 2000, 2, 3)
+    lasts = _name_pool(rng, 20000, 2, 4)
+    first_picks = rng.integers(0, len(firsts), size=count).tolist()
+    last_picks = rng.integers(0, len(lasts), size=count).tolist()
+    teams = rng.integers(0, len(TEAMS), size=count).tolist()
+    codes = rng.integers(0, len(POSITIONS), size=count).tolist()
+    stats = rng.integers(0, 101, size=(count, len(OFFENSE_FIELDS) + len(DEFENSE_FIELDS))).tolist()
+    return [
+        {
+            'name': f"{firsts[first]} {lasts[last]}",
+            'team': TEAMS[team],
+            'position': POSITIONS[code],
+            'offense': dict(zip(OFFENSE_FIELDS, row[:5])),
+            'defense': dict(zip(DEFENSE_FIELDS, row[5:]))
+        }
+        for first, last, team, code, row in zip(first_picks, last_picks, teams, codes, stats)
+    ]
+
+def synthetic_docs(count: int, seed: int = 42) -> List[Dict]:
+    """Generate scored players collection documents, ready for insert_many"""
+    players = synthetic_players(count, seed)
+    matrix = ScoringService.stats_matrix(players)
+    codes = ScoringService.position_codes([player['position'] for player in players])
+    overall, weighted = ScoringService.score_batch(matrix, codes)
+    now = datetime.utcnow()
+    for player, score, weighted_score in zip(players, overall.tolist(), weighted.tolist()):
+        player['overall_score'] = score
+        player['position_weighted_score'] = weighted_score
+        player['created_at'] = now
+        player['updated_at'] = now
+    return players
+
+def seed_players(db, count: int, seed: int = 42, chunk: int = 10_000):
+    """Replace db.players with count synthetic players"""
+    db.players.delete_many({})
+    docs = synthetic_docs(count, seed)
+    for start in range(0, count, chunk):
+        db.players.insert_many(docs[start:start + chunk], ordered=False)
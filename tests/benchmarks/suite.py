@@ -0,0 +1,391 @@
+"""
+Benchmark suite for the scoring, validation, serialization and route hot paths
+
+Micro-benchmarks call the hot functions directly on a seeded synthetic
+roster. Route benchmarks send requests through create_app().test_client()
+against a local mongod, or with --backend memory against an in-memory
+mongomock client (pip install mongomock; every query is a Python scan, so
+keep route sizes small there). Results are written as JSON. Given the
+JSON of an earlier run as --baseline, any benchmark whose median time per
+operation grew by more than --threshold fails the run.
+
+Usage:
+    python -m tests.benchmarks.suite [--players 1000 10000 100000 1000000]
+        [--backend mongod|memory] [--max-route-players 100000]
+        [--output results.json] [--baseline baseline.json] [--threshold 0.25]
+        [--filter scoring]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from bson import ObjectId
+from tests.benchmarks.players import synthetic_players, synthetic_docs, seed_players, TEAMS
+
+class Benchmark(NamedTuple):
+    name: str
+    route: bool
+    setup: Callable[['Context'], Tuple[Callable[[], None], int]]
+
+class Context(NamedTuple):
+    players: List[Dict]
+    docs: List[Dict]
+    app: object
+    client: object
+    ids: List[str]
+    requests: int
+
+BENCHMARKS: List[Benchmark] = []
+
+def benchmark(name: str, route: bool = False):
+    """
+    Register a benchmark
+
+    The decorated setup function receives a Context and returns (run, ops):
+    run() performs ops operations and is what gets timed.
+    """
+    def register(setup):
+        BENCHMARKS.append(Benchmark(name, route, setup))
+        return setup
+    return register
+
+# Micro-benchmarks
+
+@benchmark('scoring.calculate_overall_score')
+def _overall_score(ctx: Context):
+    from backend.services.scoring_service import ScoringService
+    players = ctx.players
+    def run():
+        for player in players:
+            ScoringService.calculate_overall_score(player['offense'], player['defense'])
+    return run, len(players)
+
+@benchmark('scoring.calculate_position_weighted_score')
+def _position_weighted_score(ctx: Context):
+    from backend.services.scoring_service import ScoringService
+    players = ctx.players
+    def run():
+        for player in players:
+            ScoringService.calculate_position_weighted_score(player['offense'], player['defense'], player['position'])
+    return run, len(players)
+
+@benchmark('scoring.score_batch')
+def _score_batch(ctx: Context):
+    from backend.services.scoring_service import ScoringService
+    players = ctx.players
+    def run():
+        matrix = ScoringService.stats_matrix(players)
+        codes = ScoringService.position_codes([player['position'] for player in players])
+        ScoringService.score_batch(matrix, codes)
+    return run, len(players)
+
+@benchmark('validation.validate_player_data')
+def _validate_player_data(ctx: Context):
+    from backend.utils.validators import validate_player_data
+    players = ctx.players
+    def run():
+        for player in players:
+            validate_player_data(player)
+    return run, len(players)
+
+@benchmark('validation.validate_players_batch')
+def _validate_players_batch(ctx: Context):
+    from backend.utils.validators import validate_players_batch
+    players = ctx.players
+    return (lambda: validate_players_batch(players)), len(players)
+
+@benchmark('serialization.player_dict')
+def _player_dict(ctx: Context):
+    from backend.models.player import Player
+    docs = ctx.docs
+    def run():
+        for doc in docs:
+            Player(**doc).dict()
+    return run, len(docs)
+
+@benchmark('serialization.compact_player_dict')
+def _compact_player_dict(ctx: Context):
+    from backend.models.player import CompactPlayer
+    docs = ctx.docs
+    def run():
+        for doc in docs:
+            CompactPlayer.from_doc(doc).dict()
+    return run, len(docs)
+
+@benchmark('serialization.json_dumps')
+def _json_dumps(ctx: Context):
+    from backend.models.player import Player
+    rows = [Player(**doc).dict() for doc in ctx.docs]
+    dumps = ctx.app.json.dumps
+    return (lambda: dumps(rows)), len(rows)
+
+@benchmark('serialization.json_dumps_stdlib')
+def _json_dumps_stdlib(ctx: Context):
+    from flask.json.provider import DefaultJSONProvider
+    from backend.models.player import Player
+    rows = [Player(**doc).dict() for doc in ctx.docs]
+    dumps = DefaultJSONProvider(ctx.app).dumps
+    return (lambda: dumps(rows)), len(rows)
+
+@benchmark('serialization.read_path_legacy')
+def _read_path_legacy(ctx: Context):
+    # Document to response body as list_players did before the row path
+    from flask.json.provider import DefaultJSONProvider
+    from backend.models.player import Player
+    docs = [{**doc, '_id': ObjectId()} for doc in ctx.docs]
+    dumps = DefaultJSONProvider(ctx.app).dumps
+    def run():
+        players = []
+        for doc in docs:
+            doc = dict(doc)
+            doc['id'] = str(doc.pop('_id'))
+            players.append(Player(**doc))
+        dumps([player.dict() for player in players])
+    return run, len(docs)
+
+@benchmark('serialization.read_path')
+def _read_path(ctx: Context):
+    from backend.utils.serialization import player_row
+    docs = [{**doc, '_id': ObjectId()} for doc in ctx.docs]
+    dumps = ctx.app.json.dumps
+    return (lambda: dumps([player_row(doc) for doc in docs])), len(docs)
+
+# Route benchmarks; each response cache is cleared per request unless the
+# benchmark measures cache hits
+
+def _requests(ctx: Context, make_request: Callable[[random.Random], object], clear_cache: bool = True):
+    from backend.utils.cache import response_cache
+    client = ctx.client
+
+    def run():
+        rng = random.Random(7)
+        for _ in range(ctx.requests):
+            if clear_cache:
+                response_cache.clear()
+            response = make_request(rng)(client)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{response.request.method} {response.request.path} returned {response.status_code}")
+    return run, ctx.requests
+
+@benchmark('route.list_players', route=True)
+def _list_players(ctx: Context):
+    return _requests(ctx, lambda rng: lambda client: client.get(
+        f"/api/players?per_page=20&team={rng.choice(TEAMS)}&sort_by={rng.choice(['overall_score', 'name'])}"
+    ))
+
+@benchmark('route.list_players_cached', route=True)
+def _list_players_cached(ctx: Context):
+    return _requests(ctx, lambda rng: lambda client: client.get('/api/players?per_page=20'), clear_cache=False)
+
+@benchmark('route.get_player', route=True)
+def _get_player(ctx: Context):
+    return _requests(ctx, lambda rng: lambda client: client.get(f"/api/players/{rng.choice(ctx.ids)}"))
+
+@benchmark('route.create_player', route=True)
+def _create_player(ctx: Context):
+    payloads = synthetic_players(ctx.requests, seed=7)
+    return _requests(ctx, lambda rng: lambda client: client.post('/api/players', json=rng.choice(payloads)))
+
+@benchmark('route.update_player', route=True)
+def _update_player(ctx: Context):
+    return _requests(ctx, lambda rng: lambda client: client.put(
+        f"/api/players/{rng.choice(ctx.ids)}",
+        json={'offense': {'shooting': rng.randint(0, 100)}}
+    ))
+
+@benchmark('route.rankings', route=True)
+def _rankings(ctx: Context):
+    return _requests(ctx, lambda rng: lambda client: client.get('/api/rankings?limit=50'))
+
+@benchmark('route.stats_overview', route=True)
+def _stats_overview(ctx: Context):
+    return _requests(ctx, lambda rng: lambda client: client.get('/api/stats/overview'))
+
+@benchmark('route.search', route=True)
+def _search(ctx: Context):
+    names = [player['name'] for player in ctx.players]
+    def make_request(rng):
+        name = rng.choice(names)
+        return lambda client: client.get(f"/api/players/search?q={name[:rng.randint(1, len(name))]}")
+    return _requests(ctx, make_request)
+
+# Runner
+
+def _use_backend(backend: str, db_name: str):
+    """Point the app at the chosen database, returning the app and its test client"""
+    from backend import create_app
+    from backend.db import use_client
+
+    if backend == 'memory':
+        try:
+            import mongomock
+        except ImportError:
+            sys.exit("--backend memory needs mongomock: pip install mongomock")
+        use_client(mongomock.MongoClient())
+    app = create_app({'TESTING': True, 'DB_NAME': db_name})
+    return app, app.test_client()
+
+def _prepare_database(app, backend: str, count: int) -> List[str]:
+    """Seed count players, build the indexes and return the player IDs"""
+    from backend.db import get_db
+    from backend.scripts.init_db import init_db
+    from backend.services.ranking_service import ranking_service
+    from backend.services.search_service import search_service
+    from backend.services.similarity_service import similarity_service
+    from backend.services.stats_service import stats_service
+    from backend.utils.cache import response_cache
+
+    with app.app_context():
+        db = get_db()
+        seed_players(db, count)
+        if backend == 'mongod':
+            init_db(db)
+        for service in (ranking_service, similarity_service, search_service, stats_service):
+            service.rebuild()
+        response_cache.clear()
+        return [str(doc['_id']) for doc in db.players.find({}, {'_id': 1})]
+
+def _time(run: Callable[[], None], ops: int, repeat: int) -> Dict:
+    run()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) / ops)
+    median = statistics.median(samples)
+    return {
+        'ops': ops,
+        'repeat': repeat,
+        'median_us': round(median * 1e6, 3),
+        'min_us': round(min(samples) * 1e6, 3),
+        'mean_us': round(statistics.fmean(samples) * 1e6, 3),
+        'ops_per_sec': round(1 / median, 1) if median else None
+    }
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(
+    sizes: List[int],
+    backend: str = 'memory',
+    db_name: str = 'bench_suite',
+    max_route_players: int = 100_000,
+    requests: int = 200,
+    repeat: int = 5,
+    name_filter: Optional[str] = None
+) -> Dict:
+    """Run every selected benchmark at every size and return the results document"""
+    app, client = _use_backend(backend, db_name)
+    selected = [bench for bench in BENCHMARKS if not name_filter or name_filter in bench.name]
+    results = []
+    for size in sizes:
+        players = synthetic_players(size)
+        docs = synthetic_docs(size)
+        routes = [bench for bench in selected if bench.route] if size <= max_route_players else []
+        ids = _prepare_database(app, backend, size) if routes else []
+        ctx = Context(players, docs, app, client, ids, requests)
+
+        for bench in selected:
+            if bench.route and bench not in routes:
+                continue
+            with app.app_context():
+                run, ops = bench.setup(ctx)
+                result = _time(run, ops, repeat)
+            result = {'name': bench.name, 'players': size, **result}
+            results.append(result)
+            print(f"{bench.name:<44} {size:>9,} {result['median_us']:>12,.2f} us/op {result['ops_per_sec']:>14,.0f} ops/s")
+
+    if backend == 'mongod':
+        from backend.db import get_client
+        get_client().drop_database(db_name)
+
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'backend': backend,
+            'sizes': sizes,
+            'requests': requests,
+            'repeat': repeat
+        },
+        'results': results
+    }
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """
+    Compare median time per operation with a baseline run
+
+    Returns:
+        One entry per benchmark present in both runs, with the relative
+        change and whether it exceeds the threshold
+    """
+    previous = {(result['name'], result['players']): result for result in baseline['results']}
+    changes = []
+    for result in current['results']:
+        before = previous.get((result['name'], result['players']))
+        if before is None or not before['median_us']:
+            continue
+        change = result['median_us'] / before['median_us'] - 1
+        changes.append({
+            'name': result['name'],
+            'players': result['players'],
+            'baseline_us': before['median_us'],
+            'current_us': result['median_us'],
+            'change': round(change, 4),
+            'regression': change > threshold
+        })
+    return changes
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--players', type=int, nargs='+', default=[1_000, 10_000])
+    parser.add_argument('--backend', choices=['mongod', 'memory'], default='memory')
+    parser.add_argument('--db-name', default='bench_suite')
+    parser.add_argument('--max-route-players', type=int, default=100_000,
+                        help="skip route benchmarks for larger rosters")
+    parser.add_argument('--requests', type=int, default=200, help="requests per route benchmark run")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--filter', help="only run benchmarks whose name contains this")
+    parser.add_argument('--output', help="write results JSON here")
+    parser.add_argument('--baseline', help="results JSON of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="fail when a median grows by more than this fraction of the baseline")
+    args = parser.parse_args(argv)
+
+    results = run_suite(
+        args.players, args.backend, args.db_name, args.max_route_players,
+        args.requests, args.repeat, args.filter
+    )
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as f:
+        changes = compare(results, json.load(f), args.threshold)
+    regressions = [change for change in changes if change['regression']]
+    print(f"\nCompared with {args.baseline} (threshold {args.threshold:+.0%})")
+    for change in changes:
+        flag = 'REGRESSION' if change['regression'] else ''
+        print(f"{change['name']:<44} {change['players']:>9,} {change['change']:>+8.1%} {flag}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())